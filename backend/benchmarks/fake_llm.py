@@ -0,0 +1,68 @@
+# fake_llm.py
+# A deterministic, offline LLM provider used in place of Gemini.
+# It answers slide prompts with a JSON slide list derived from the prompt text,
+# and summary prompts with the first lines of the section, after an optional
+# fixed delay that models network and generation latency.
+
+import json
+import re
+import time
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from pdf_to_presentation.llm import LLMClient, LLMProvider
+
+_IMAGE_LINE = re.compile(r"- Image: (\S+), Context:")
+_TEXT_SECTION = re.compile(r"---\n(.*)\n\s*---", re.DOTALL)
+
+
+class FakeProvider(LLMProvider):
+    """Answers like Gemini would for the app's slide and summary prompts."""
+
+    slide_count = 8
+
+    def __init__(self, latency_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+
+    def generate(self, prompt: str, timeout: float = 0.0) -> str:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        return self._answer(prompt)
+
+    def stream(self, prompt: str, timeout: float = 0.0) -> Iterator[str]:
+        text = self.generate(prompt, timeout)
+        # Stream in small pieces so incremental parsing is exercised
+        for i in range(0, len(text), 64):
+            yield text[i:i + 64]
+
+    def _answer(self, prompt: str) -> str:
+        section = _TEXT_SECTION.search(prompt)
+        source = section.group(1) if section else prompt
+        if "one section of a longer report" in prompt:
+            return "\n".join(source.strip().splitlines()[:5])
+        return json.dumps(self._slides(source, _IMAGE_LINE.findall(prompt)))
+
+    def _slides(self, text: str, images: List[str]) -> List[dict]:
+        words = text.split()
+        slides = []
+        for i in range(self.slide_count):
+            start = (i * 37) % max(1, len(words))
+            chunk = words[start:start + 30] or ["Empty"]
+            slide = {"title": " ".join(chunk[:5]).title(), "image_filename": images[i] if i < len(images) else None}
+            if i % 5 == 4:
+                slide["text_block"] = " ".join(chunk)
+            else:
+                slide["bullets"] = [" ".join(chunk[j:j + 8]) for j in range(0, len(chunk), 8)]
+            slides.append(slide)
+        return slides
+
+
+@contextmanager
+def fake_llm(client: LLMClient, latency_seconds: float = 0.0) -> Iterator[None]:
+    """Swaps `client`'s provider for the fake for the duration of the block."""
+    original = client.provider
+    client.provider = FakeProvider(latency_seconds)
+    try:
+        yield
+    finally:
+        client.provider = original
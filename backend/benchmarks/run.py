@@ -0,0 +1,322 @@
+# run.py
+# Benchmarks PDF extraction, deck rendering and the two main endpoints end to end
+# on synthetic PDFs, with a deterministic fake in place of Gemini, plus the cold
+# start cost of importing the API and creating the app. Results are
+# written as JSON and checked against regression thresholds, so a slowdown in
+# extraction or rendering fails the run before it reaches a deploy.
+#
+# Usage, from the backend directory:
+#   python -m benchmarks.run [--quick] [--repeat 5] [--output benchmark-results.json]
+#                            [--thresholds benchmarks/thresholds.json]
+#                            [--baseline previous-results.json] [--max-regression 0.25]
+#                            [--update-thresholds]
+
+import argparse
+import dataclasses
+import json
+import math
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+from fastapi.testclient import TestClient
+
+from pdf_to_presentation import image_prep, main, presentation
+from pdf_to_presentation.executors import BoundedStage, process_pool
+from pdf_to_presentation.image_store import LocalImageWriter, shard_path
+from pdf_to_presentation.models import Slide
+from pdf_to_presentation.pdf_extraction import extract_text_and_images_from_pdf
+from pdf_to_presentation.settings import Settings
+from pdf_to_presentation.warmup import warm_up
+
+from .fake_llm import FakeProvider, fake_llm
+from .synthetic_pdf import PdfSpec, build_pdf
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_THRESHOLDS = os.path.join(BENCHMARK_DIR, "thresholds.json")
+# The run the thresholds were set from, kept next to them
+RECORDED_RESULTS = os.path.join(BENCHMARK_DIR, "recorded-results.json")
+
+SUITE = [
+    PdfSpec(pages=5, images_per_page=1, masked_images_per_page=0, words_per_page=200),
+    PdfSpec(pages=40, images_per_page=2, masked_images_per_page=1, words_per_page=400),
+    PdfSpec(pages=100, images_per_page=0, masked_images_per_page=0, words_per_page=800),
+]
+QUICK_SUITE = SUITE[:1]
+
+# Differences smaller than this are treated as noise when comparing to a baseline
+NOISE_FLOOR_SECONDS = 0.01
+
+# Thresholds written by --update-thresholds are the measured median plus this fraction,
+# and at least THRESHOLD_MIN_HEADROOM_SECONDS above it so fast benchmarks are not flaky
+THRESHOLD_MARGIN = 0.5
+THRESHOLD_MIN_HEADROOM_SECONDS = 0.05
+
+# Run in a fresh interpreter, so nothing is already imported; prints two timings in seconds
+STARTUP_SCRIPT = """
+import time
+started = time.perf_counter()
+from pdf_to_presentation.main import create_app
+from pdf_to_presentation.settings import Settings
+imported = time.perf_counter()
+create_app(Settings(google_api_key="benchmark", cache_dir="", image_store_dir={image_dir!r}))
+print(imported - started, time.perf_counter() - imported)
+"""
+
+
+def time_runs(fn: Callable[[], None], repeat: int, setup: Optional[Callable[[], None]] = None) -> dict:
+    """Runs `fn` once to warm up and then `repeat` times, returning timing statistics in seconds."""
+    if setup:
+        setup()
+    fn()
+    runs = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - started)
+    return summarize_runs(runs)
+
+
+def summarize_runs(runs: List[float]) -> dict:
+    return {
+        "median_s": statistics.median(runs),
+        "min_s": min(runs),
+        "max_s": max(runs),
+        "runs": runs,
+    }
+
+
+def benchmark_startup(scratch_dir: str, repeat: int) -> Dict[str, dict]:
+    """Times importing the API module and creating the app, each in a new interpreter."""
+    script = STARTUP_SCRIPT.format(image_dir=os.path.join(scratch_dir, "startup-images"))
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    imports, creates = [], []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        import_s, create_s = (float(value) for value in output.split()[-2:])
+        imports.append(import_s)
+        creates.append(create_s)
+    return {"startup/import_main": summarize_runs(imports), "startup/create_app": summarize_runs(creates)}
+
+
+def clear_app_caches(state: main.AppState) -> None:
+    """Makes every run cold: no cached extraction, slides, summaries or rendered slides."""
+    for cache in (
+        state.extraction_cache, state.slides_cache, state.summaries_cache, state.thumbnail_cache,
+        state.rendered_slides_cache,
+    ):
+        cache.clear()
+    image_prep._prepared_images.clear()
+
+
+def restart_render_workers(state: main.AppState) -> None:
+    """
+    Replaces the render worker processes, which keep their own cache of prepared
+    images, with new ones. The new workers are warmed up before they are timed, so
+    a cold render still excludes imports and building the theme templates.
+    """
+    settings = state.settings
+    state.render_stage.shutdown()
+    state.render_stage = BoundedStage(
+        "render", process_pool(settings.render_concurrency),
+        max_concurrency=settings.render_concurrency,
+        max_queue=settings.stage_max_queue, queue_timeout=settings.stage_queue_timeout,
+    )
+    warm_ups = [state.render_stage.executor.submit(warm_up, True) for _ in range(settings.render_concurrency)]
+    for future in warm_ups:
+        future.result()
+
+
+def benchmark_spec(spec: PdfSpec, client: TestClient, scratch_dir: str, repeat: int) -> Dict[str, dict]:
+    pdf_bytes = build_pdf(spec)
+    results = {}
+    state: main.AppState = client.app.state.services
+
+    def fresh_image_dir() -> str:
+        # Images are stored by content, so each run writes into an empty directory
+        return tempfile.mkdtemp(dir=scratch_dir, prefix="extract-")
+
+    def clear_caches():
+        clear_app_caches(state)
+
+    # --- Extraction, serial and in this process ---
+    def extract():
+        extract_text_and_images_from_pdf(pdf_bytes, image_writer=LocalImageWriter(fresh_image_dir()))
+
+    results[f"extract/{spec.name}"] = time_runs(extract, repeat)
+
+    # --- Rendering, from slides the fake model writes for this document ---
+    image_dir = fresh_image_dir()
+    text, images = extract_text_and_images_from_pdf(pdf_bytes, image_writer=LocalImageWriter(image_dir))
+    slides = [Slide(**slide) for slide in json.loads(
+        FakeProvider().generate(main.build_slides_prompt(text, images))
+    )]
+    image_paths = {image["filename"]: shard_path(image_dir, image["filename"]) for image in images}
+
+    def render():
+        presentation.create_presentation(slides, "background", "blue_gradient", image_paths=image_paths)
+
+    results[f"render/{spec.name}"] = time_runs(render, repeat, setup=clear_caches)
+
+    # --- Endpoints, end to end through the app ---
+    def generate_slide_content():
+        response = client.post(
+            "/api/generate-slide-content",
+            files={"file": ("benchmark.pdf", pdf_bytes, "application/pdf")},
+        )
+        response.raise_for_status()
+
+    results[f"endpoint_slide_content/{spec.name}"] = time_runs(generate_slide_content, repeat, setup=clear_caches)
+
+    slide_content = client.post(
+        "/api/generate-slide-content", files={"file": ("benchmark.pdf", pdf_bytes, "application/pdf")}
+    ).json()
+
+    def generate_presentation():
+        response = client.post("/api/generate-presentation", json={
+            "slides": slide_content["slides"], "theme_type": "background", "theme_name": "blue_gradient",
+        })
+        response.raise_for_status()
+
+    def clear_render_caches():
+        # The extraction cache is kept, as clearing it releases the images the deck shows
+        state.rendered_slides_cache.clear()
+        restart_render_workers(state)
+
+    # Cold: every slide is laid out and every image prepared again
+    results[f"endpoint_presentation/{spec.name}"] = time_runs(
+        generate_presentation, repeat, setup=clear_render_caches
+    )
+    # Warm: re-exporting the same deck, as the editor does after each download
+    results[f"endpoint_presentation_warm/{spec.name}"] = time_runs(generate_presentation, repeat)
+    return results
+
+
+def check_thresholds(results: Dict[str, dict], thresholds: Dict[str, float]) -> List[str]:
+    """Returns a message for every benchmark whose median exceeds its threshold in seconds."""
+    failures = []
+    for name, limit in thresholds.items():
+        result = results.get(name)
+        if result is not None and result["median_s"] > limit:
+            failures.append(f"{name}: median {result['median_s']:.3f}s exceeds the {limit:.3f}s threshold")
+    return failures
+
+
+def thresholds_from_results(results: Dict[str, dict]) -> Dict[str, float]:
+    """Returns a threshold per benchmark: its median plus the margin, rounded up to the millisecond."""
+    return {
+        name: math.ceil(max(
+            result["median_s"] * (1 + THRESHOLD_MARGIN), result["median_s"] + THRESHOLD_MIN_HEADROOM_SECONDS,
+        ) * 1000) / 1000
+        for name, result in results.items()
+    }
+
+
+def check_baseline(results: Dict[str, dict], baseline: Dict[str, dict], max_regression: float) -> List[str]:
+    """Returns a message for every benchmark more than `max_regression` slower than the baseline."""
+    failures = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        allowed = previous["median_s"] * (1 + max_regression)
+        if result["median_s"] > allowed and result["median_s"] - previous["median_s"] > NOISE_FLOOR_SECONDS:
+            failures.append(
+                f"{name}: median {result['median_s']:.3f}s is more than {max_regression:.0%} slower "
+                f"than the baseline {previous['median_s']:.3f}s"
+            )
+    return failures
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark extraction, rendering and the API endpoints.")
+    parser.add_argument("--quick", action="store_true", help="Only run the smallest document.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark.")
+    parser.add_argument("--output", default="benchmark-results.json", help="Where to write the JSON results.")
+    parser.add_argument("--thresholds", default=DEFAULT_THRESHOLDS,
+                        help="JSON file of maximum median seconds per benchmark. Pass '' to skip.")
+    parser.add_argument("--update-thresholds", action="store_true",
+                        help="Set the thresholds from this run instead of checking them, and record "
+                             "its results in benchmarks/recorded-results.json.")
+    parser.add_argument("--baseline", help="Results of an earlier run to compare against.")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="Allowed slowdown relative to the baseline, as a fraction.")
+    parser.add_argument("--llm-latency", type=float, default=0.0,
+                        help="Seconds the fake model waits before each answer.")
+    return parser.parse_args(argv)
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    suite = QUICK_SUITE if args.quick else SUITE
+
+    # A scratch image store, memory-only caches and a dummy API key
+    scratch_dir = tempfile.mkdtemp(prefix="pdf2ppt-bench-")
+    settings = dataclasses.replace(
+        Settings.from_env(), google_api_key="benchmark", cache_dir="",
+        image_store_dir=os.path.join(scratch_dir, "images"),
+    )
+
+    results: Dict[str, dict] = {}
+    try:
+        print("Benchmarking startup...")
+        results.update(benchmark_startup(scratch_dir, args.repeat))
+        app = main.create_app(settings)
+        with fake_llm(app.state.services.llm_client, latency_seconds=args.llm_latency), TestClient(app) as client:
+            for spec in suite:
+                print(f"Benchmarking {spec.name}...")
+                results.update(benchmark_spec(spec, client, scratch_dir, args.repeat))
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "llm_latency_s": args.llm_latency,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for name, result in results.items():
+        print(f"{name:<60} {result['median_s'] * 1000:>10.1f} ms")
+    print(f"Results written to {args.output}")
+
+    if args.update_thresholds:
+        with open(args.thresholds or DEFAULT_THRESHOLDS, "w") as f:
+            json.dump(thresholds_from_results(results), f, indent=2)
+            f.write("\n")
+        with open(RECORDED_RESULTS, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"Thresholds updated from this run; results recorded in {RECORDED_RESULTS}")
+        return 0
+
+    failures = []
+    if args.thresholds:
+        with open(args.thresholds) as f:
+            failures += check_thresholds(results, json.load(f))
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures += check_baseline(results, json.load(f)["results"], args.max_regression)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
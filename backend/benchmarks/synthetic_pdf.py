@@ -0,0 +1,83 @@
+# synthetic_pdf.py
+# Generates PDFs with a known shape for the benchmarks: a chosen number of pages,
+# text density, and images per page, some of which have a transparency mask.
+# The same parameters and seed always produce the same document.
+
+import io
+import random
+from dataclasses import dataclass
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+WORDS = (
+    "revenue growth market customer product quarter strategy operating margin cost "
+    "analysis forecast region team launch risk capital investment supply demand data "
+    "platform service retention pricing segment channel performance target outlook"
+).split()
+
+
+@dataclass(frozen=True)
+class PdfSpec:
+    """The shape of a synthetic document."""
+    pages: int = 10
+    images_per_page: int = 1
+    masked_images_per_page: int = 0
+    words_per_page: int = 300
+    image_size: int = 600
+    seed: int = 0
+
+    @property
+    def name(self) -> str:
+        return (f"{self.pages}p_{self.images_per_page}img_{self.masked_images_per_page}mask_"
+                f"{self.words_per_page}w")
+
+
+def _image_bytes(rng: random.Random, size: int, masked: bool) -> bytes:
+    """A noisy image (so it does not compress to nothing) in a random tint, as PNG."""
+    mode = "RGBA" if masked else "RGB"
+    noise = Image.effect_noise((size, size), 40).convert("L")
+    tint = tuple(rng.randrange(256) for _ in range(3))
+    img = Image.merge("RGB", [noise.point(lambda v, c=c: (v + c) % 256) for c in tint])
+    if masked:
+        img = img.convert(mode)
+        img.putalpha(Image.linear_gradient("L").resize((size, size)))
+    output = io.BytesIO()
+    img.save(output, format="PNG")
+    return output.getvalue()
+
+
+def _paragraphs(rng: random.Random, word_count: int) -> str:
+    sentences = []
+    remaining = word_count
+    while remaining > 0:
+        length = min(remaining, rng.randint(8, 20))
+        words = [rng.choice(WORDS) for _ in range(length)]
+        sentences.append(" ".join(words).capitalize() + ".")
+        remaining -= length
+    return " ".join(sentences)
+
+
+def build_pdf(spec: PdfSpec) -> bytes:
+    """Builds the document described by `spec` and returns it as bytes."""
+    rng = random.Random(spec.seed)
+    with fitz.open() as doc:
+        for page_number in range(spec.pages):
+            page = doc.new_page()  # A4 portrait
+            page.insert_text((72, 40), "Synthetic Benchmark Report", fontsize=9)
+            # insert_textbox writes nothing if the text overflows, so shrink it until it fits
+            paragraphs = _paragraphs(rng, spec.words_per_page)
+            fontsize = 7.0
+            while page.insert_textbox(fitz.Rect(72, 60, 300, 780), paragraphs, fontsize=fontsize) < 0:
+                fontsize -= 0.5
+
+            image_count = spec.images_per_page + spec.masked_images_per_page
+            for index in range(image_count):
+                masked = index >= spec.images_per_page
+                top = 60 + index * (700 / max(1, image_count))
+                rect = fitz.Rect(320, top, 520, top + 150)
+                page.insert_image(rect, stream=_image_bytes(rng, spec.image_size, masked))
+                page.insert_text((320, top + 162), f"Figure {page_number + 1}.{index + 1}", fontsize=7)
+
+            page.insert_text((280, 820), f"Page {page_number + 1} of {spec.pages}", fontsize=8)
+        return doc.tobytes()
@@ -0,0 +1,89 @@
+# batch.py
+# Helpers for batch conversions: selecting the themes a batch is rendered in, and
+# writing a ZIP archive incrementally so each finished deck can be streamed to the
+# client as soon as it is ready, without keeping the whole archive in memory.
+
+import json
+import zipfile
+from typing import Iterable, List, Tuple
+
+Theme = Tuple[str, str]  # (theme_type, theme_name)
+
+
+class _ChunkSink:
+    """A write-only, unseekable file that collects written bytes until they are taken."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ZipStream:
+    """
+    Builds a ZIP archive one member at a time. `add` and `close` return the bytes
+    of the archive written so far, which the caller sends on and forgets.
+
+    Members are stored rather than deflated, as .pptx files are already compressed.
+    """
+
+    def __init__(self):
+        self._sink = _ChunkSink()
+        # An unseekable file makes zipfile write sizes after each member's data
+        self._zip = zipfile.ZipFile(self._sink, mode="w", compression=zipfile.ZIP_STORED)
+
+    def add(self, name: str, data: bytes) -> bytes:
+        self._zip.writestr(name, data)
+        return self._sink.take()
+
+    def close(self) -> bytes:
+        self._zip.close()
+        return self._sink.take()
+
+
+def parse_themes(selection: str, available: Iterable[Theme]) -> List[Theme]:
+    """
+    Parses a comma-separated list of "type:name" themes, or "all" for every
+    available theme. Raises ValueError naming the first unknown theme.
+    """
+    available = list(available)
+    if selection.strip().lower() == "all":
+        return available
+
+    themes = []
+    for entry in selection.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        theme_type, _, theme_name = entry.partition(":")
+        theme = (theme_type.strip(), theme_name.strip())
+        if theme not in available:
+            raise ValueError(f"Unknown theme '{entry}'. Use 'type:name', e.g. 'color:corporate_blue'.")
+        if theme not in themes:
+            themes.append(theme)
+    if not themes:
+        raise ValueError("At least one theme is required.")
+    return themes
+
+
+def deck_filename(document_name: str, theme: Theme, index: int) -> str:
+    """Names a deck in the archive after its source document and theme, keeping names unique."""
+    stem = document_name.rsplit(".", 1)[0] if document_name else "document"
+    stem = "".join(c if c.isalnum() or c in "-_ " else "_" for c in stem).strip() or "document"
+    return f"{index + 1:03d}_{stem}_{theme[1]}.pptx"
+
+
+def manifest_json(items: List[dict]) -> bytes:
+    succeeded = sum(1 for item in items if item["status"] == "completed")
+    manifest = {"total": len(items), "succeeded": succeeded, "failed": len(items) - succeeded, "items": items}
+    return json.dumps(manifest, indent=2).encode("utf-8")
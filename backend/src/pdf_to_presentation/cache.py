@@ -0,0 +1,264 @@
+# cache.py
+# A small, size-bounded LRU cache used to memoize the expensive stages of the
+# pipeline (PDF extraction and LLM slide generation). Entries live in memory and
+# can optionally be persisted to disk so they survive a server restart.
+
+import hashlib
+import os
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+
+def content_hash(data: bytes) -> str:
+    """Returns the SHA-256 hex digest used to key content-addressed entries."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache with hit/miss counters.
+
+    The in-memory layer holds at most `max_entries` items and, if `max_bytes` is
+    given, at most that many bytes of values (measured with len() for bytes and
+    sys.getsizeof() otherwise). When `directory` is
+    given, every entry is also pickled to disk, and the on-disk layer is kept
+    under `max_disk_bytes` by deleting the least recently used files first.
+
+    `on_evict`, if given, is called with the key of every entry that is evicted,
+    deleted or cleared, once it is held by neither layer. It runs after the cache's
+    lock is released. Keys of files left on disk by an earlier process are only
+    known once the entry has been read or written again.
+    """
+
+    def __init__(self, max_entries: int = 128, directory: Optional[str] = None,
+                 max_disk_bytes: Optional[int] = None, max_bytes: Optional[int] = None,
+                 on_evict: Optional[Callable[[str], None]] = None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: dict = {}  # key -> size in bytes, only tracked when max_bytes is set
+        self._memory_bytes = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()  # file path -> size in bytes
+        self._disk_bytes = 0
+        self._disk_keys: Dict[str, str] = {}  # file path -> key, for entries read or written by this process
+        self._evicted: List[str] = []  # keys waiting to be passed to on_evict
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            self._load_disk_index()
+
+    # --- Public API ---
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            with self._lock:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return self._memory[key]
+
+                value = self._read_from_disk(key)
+                if value is None:
+                    self.misses += 1
+                    return default
+
+                self.hits += 1
+                self._store_in_memory(key, value)
+                return value
+        finally:
+            self._notify_evicted()
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._store_in_memory(key, value)
+            self._write_to_disk(key, value)
+        self._notify_evicted()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            present = key in self._memory
+            self._memory.pop(key, None)
+            self._memory_bytes -= self._sizes.pop(key, 0)
+            if self.directory:
+                path = self._path_for(key)
+                present = present or path in self._disk
+                self._remove_disk_file(path)
+            if present:
+                self._evicted.append(key)
+        self._notify_evicted()
+
+    def clear(self) -> None:
+        with self._lock:
+            keys = set(self._memory) | set(self._disk_keys.values())
+            self._memory.clear()
+            self._sizes.clear()
+            self._memory_bytes = 0
+            for path in list(self._disk):
+                self._remove_disk_file(path)
+            self._evicted.extend(keys)
+        self._notify_evicted()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "bytes": self._memory_bytes,
+                "max_bytes": self.max_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+                "max_disk_bytes": self.max_disk_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._memory or (
+                bool(self.directory) and self._path_for(key) in self._disk
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._memory)
+
+    # --- In-memory layer ---
+
+    def _store_in_memory(self, key: str, value: Any) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        if self.max_bytes is not None:
+            self._memory_bytes -= self._sizes.pop(key, 0)
+            size = len(value) if isinstance(value, (bytes, bytearray)) else sys.getsizeof(value)
+            self._sizes[key] = size
+            self._memory_bytes += size
+
+        while len(self._memory) > self.max_entries or (
+            self.max_bytes is not None and self._memory_bytes > self.max_bytes and len(self._memory) > 1
+        ):
+            evicted_key, _ = self._memory.popitem(last=False)
+            self._memory_bytes -= self._sizes.pop(evicted_key, 0)
+            self.evictions += 1
+            if not self.directory or self._path_for(evicted_key) not in self._disk:
+                self._evicted.append(evicted_key)
+
+    def _notify_evicted(self) -> None:
+        """Passes evicted keys to on_evict. Call without the lock held."""
+        if self.on_evict is None:
+            return
+        with self._lock:
+            evicted, self._evicted = self._evicted, []
+        for key in evicted:
+            try:
+                self.on_evict(key)
+            except Exception as e:
+                print(f"Warning: Eviction callback failed for '{key}': {e}")
+
+    # --- On-disk layer ---
+
+    def _path_for(self, key: str) -> str:
+        return os.path.join(self.directory, f"{content_hash(key.encode('utf-8'))}.pkl")
+
+    def _load_disk_index(self) -> None:
+        """Rebuilds the LRU order of persisted entries from file modification times."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".pkl"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path, stat.st_size))
+
+        for _, path, size in sorted(entries):
+            self._disk[path] = size
+            self._disk_bytes += size
+        self._evict_disk()
+
+    def _read_from_disk(self, key: str) -> Any:
+        if not self.directory:
+            return None
+        path = self._path_for(key)
+        if path not in self._disk:
+            return None
+        try:
+            with open(path, "rb") as f:
+                stored_key, value = pickle.load(f)
+        except Exception as e:
+            print(f"Warning: Discarding unreadable cache entry {path}: {e}")
+            self._remove_disk_file(path)
+            self._evicted.append(key)
+            return None
+        if stored_key != key:
+            return None
+        self._disk_keys[path] = key
+
+        # Touch the file so the LRU order survives a restart
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._disk.move_to_end(path)
+        return value
+
+    def _write_to_disk(self, key: str, value: Any) -> None:
+        if not self.directory:
+            return
+        path = self._path_for(key)
+        try:
+            payload = pickle.dumps((key, value), protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            print(f"Warning: Cache entry for '{key}' is not picklable, keeping it in memory only: {e}")
+            return
+
+        # Write to a temporary file first so readers never see a partial entry
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: Failed to persist cache entry {path}: {e}")
+            return
+
+        self._disk_bytes -= self._disk.pop(path, 0)
+        self._disk[path] = len(payload)
+        self._disk_bytes += len(payload)
+        self._disk_keys[path] = key
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        if self.max_disk_bytes is None:
+            return
+        while self._disk and self._disk_bytes > self.max_disk_bytes:
+            oldest_path = next(iter(self._disk))
+            key = self._disk_keys.get(oldest_path)
+            self._remove_disk_file(oldest_path)
+            self.evictions += 1
+            if key is not None and key not in self._memory:
+                self._evicted.append(key)
+
+    def _remove_disk_file(self, path: str) -> None:
+        self._disk_bytes -= self._disk.pop(path, 0)
+        self._disk_keys.pop(path, None)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,137 @@
+# condensation.py
+# Shrinks extracted text before it is sent to the LLM. Running headers, footers
+# and page numbers are removed, whitespace and line-break hyphenation are
+# normalized, and if the text is still over a token budget the most
+# representative sentences are kept, ranked by TF-IDF. NumPy is imported on first use.
+
+import math
+import re
+from collections import Counter
+from typing import TYPE_CHECKING, List
+
+if TYPE_CHECKING:
+    import numpy as np
+
+from .summarization import CHARS_PER_TOKEN
+
+# Only the first and last few lines of a page are considered as headers or footers
+EDGE_LINES = 2
+# A line is a header or footer if it appears at the edge of at least this share of pages
+REPEATED_LINE_MIN_SHARE = 0.5
+# ...and of at least this many pages, so short documents keep their repeated headings
+REPEATED_LINE_MIN_PAGES = 3
+# Headers and footers are short; longer lines are always treated as body text
+MAX_HEADER_CHARS = 120
+
+_DIGITS = re.compile(r"\d+")
+_PAGE_NUMBER = re.compile(r"^(page\s*)?(\d+|[ivx]{1,4})(\s*(of|/)\s*\d+)?$", re.IGNORECASE)
+_SPACES = re.compile(r"[ \t\u00a0]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+# A word broken across lines with a hyphen, continued in lower case on the next line
+_LINE_HYPHEN = re.compile(r"(\w)-\n(?=[a-z])")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(\[])|\n+")
+_WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+
+def _line_signature(line: str) -> str:
+    # Numbers vary between pages ("Page 3 of 10"), so they are ignored when comparing lines
+    return _DIGITS.sub("#", line.strip().lower())
+
+
+def _edge_indexes(lines: List[str]) -> List[int]:
+    content = [i for i, line in enumerate(lines) if line.strip()]
+    return sorted(set(content[:EDGE_LINES] + content[-EDGE_LINES:]))
+
+
+def remove_headers_and_footers(pages: List[str]) -> List[str]:
+    """
+    Drops lines at the top or bottom of pages that repeat across many pages, as
+    well as bare page numbers there. Lines in the body of a page are never removed.
+    """
+    split_pages = [page.split("\n") for page in pages]
+    counts: Counter = Counter()
+    for lines in split_pages:
+        counts.update({
+            _line_signature(lines[i]) for i in _edge_indexes(lines) if len(lines[i].strip()) <= MAX_HEADER_CHARS
+        })
+
+    min_pages = max(REPEATED_LINE_MIN_PAGES, math.ceil(len(pages) * REPEATED_LINE_MIN_SHARE))
+    repeated = {signature for signature, count in counts.items() if count >= min_pages}
+
+    cleaned = []
+    for lines in split_pages:
+        drop = {
+            i for i in _edge_indexes(lines)
+            if _line_signature(lines[i]) in repeated or _PAGE_NUMBER.match(lines[i].strip())
+        }
+        cleaned.append("\n".join(line for i, line in enumerate(lines) if i not in drop))
+    return cleaned
+
+
+def normalize_text(text: str) -> str:
+    """Rejoins hyphenated line breaks, strips soft hyphens and collapses runs of whitespace."""
+    text = text.replace("\u00ad", "").replace("\r\n", "\n").replace("\r", "\n")
+    text = _LINE_HYPHEN.sub(r"\1", text)
+    text = _SPACES.sub(" ", text)
+    text = "\n".join(line.strip() for line in text.split("\n"))
+    return _BLANK_LINES.sub("\n\n", text).strip()
+
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence.strip() for sentence in _SENTENCE_END.split(text) if sentence.strip()]
+
+
+def score_sentences(sentences: List[str]) -> "np.ndarray":
+    """
+    Scores each sentence by how well it represents the whole document: the mean
+    TF-IDF weight, over the document's term frequencies, of the words it contains.
+    """
+    import numpy as np
+
+    vocabulary = {}
+    term_ids = []
+    sentence_ids = []
+    for index, sentence in enumerate(sentences):
+        for word in _WORD.findall(sentence.lower()):
+            term_ids.append(vocabulary.setdefault(word, len(vocabulary)))
+            sentence_ids.append(index)
+    if not term_ids:
+        return np.zeros(len(sentences))
+
+    terms = np.asarray(term_ids)
+    owners = np.asarray(sentence_ids)
+    sentence_count = len(sentences)
+
+    # Document frequency: the number of distinct sentences each term occurs in
+    pairs = np.unique(owners * len(vocabulary) + terms)
+    df = np.bincount(pairs % len(vocabulary), minlength=len(vocabulary))
+    idf = np.log((1 + sentence_count) / (1 + df)) + 1.0
+    tf = np.bincount(terms, minlength=len(vocabulary))
+    weights = tf * idf
+    weights = weights / weights.max()
+
+    totals = np.bincount(owners, weights=weights[terms], minlength=sentence_count)
+    lengths = np.bincount(owners, minlength=sentence_count)
+    return np.divide(totals, lengths, out=np.zeros(sentence_count), where=lengths > 0)
+
+
+def select_sentences(text: str, token_budget: int) -> str:
+    """Keeps the highest-scoring sentences that fit in `token_budget`, in their original order."""
+    sentences = split_sentences(text)
+    scores = score_sentences(sentences)
+    max_chars = token_budget * CHARS_PER_TOKEN
+
+    selected = []
+    used = 0
+    for index in (-scores).argsort(kind="stable"):
+        length = len(sentences[index]) + 1  # Plus the separator
+        if used + length > max_chars:
+            continue
+        selected.append(index)
+        used += length
+    return "\n".join(sentences[index] for index in sorted(selected))
+
+
+def clean_pages(pages: List[str]) -> List[str]:
+    """Removes headers and footers and normalizes each page's text."""
+    return [normalize_text(page) + "\n" for page in remove_headers_and_footers(pages)]
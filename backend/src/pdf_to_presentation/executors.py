@@ -0,0 +1,112 @@
+# executors.py
+# Bounded executors for the blocking stages of the pipeline (PDF extraction,
+# LLM calls and pptx rendering), so that they never run on the event loop.
+# Each stage admits a limited number of calls and rejects the rest straight
+# away, keeping latency predictable under load.
+
+import asyncio
+import functools
+import itertools
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+from .metrics import EXECUTOR_QUEUE_SECONDS, EXECUTOR_REJECTIONS, profile_prefix, run_profiled
+
+
+class StageOverloaded(Exception):
+    """Raised when a stage already has as many calls running and waiting as it allows."""
+
+    def __init__(self, stage: str, retry_after: int = 5):
+        super().__init__(f"The server is busy ({stage}). Please try again shortly.")
+        self.stage = stage
+        self.retry_after = retry_after
+
+
+def process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """
+    A process pool whose workers are not forked from this process, which runs thread
+    pools by the time they start and could hand a child a lock held by another thread.
+    """
+    start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context(start_method))
+
+
+class BoundedStage:
+    """
+    Runs blocking callables on `executor`, at most `max_concurrency` at a time.
+
+    Up to `max_queue` further calls may wait for a slot, for no longer than
+    `queue_timeout` seconds; beyond that, `run` raises StageOverloaded.
+
+    Calls made while a request is being profiled run under cProfile in the worker.
+    """
+
+    def __init__(self, name: str, executor: Executor, max_concurrency: int,
+                 max_queue: int = 0, queue_timeout: Optional[float] = None):
+        self.name = name
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._in_flight = 0
+        self._profile_ids = itertools.count(1)
+        self.rejected = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        if self._in_flight >= self.max_concurrency + self.max_queue:
+            self._reject()
+
+        semaphore = self._get_semaphore()
+        self._in_flight += 1
+        try:
+            queued_at = time.perf_counter()
+            try:
+                await asyncio.wait_for(semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._reject()
+            EXECUTOR_QUEUE_SECONDS.observe(time.perf_counter() - queued_at, executor=self.name)
+            try:
+                call = functools.partial(fn, *args, **kwargs)
+                prefix = profile_prefix.get()
+                if prefix is not None:
+                    dump_path = f"{prefix}-{self.name}-{next(self._profile_ids)}.prof"
+                    call = functools.partial(run_profiled, dump_path, call)
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self.executor, call)
+            finally:
+                semaphore.release()
+        finally:
+            self._in_flight -= 1
+
+    def _reject(self) -> None:
+        self.rejected += 1
+        EXECUTOR_REJECTIONS.inc(executor=self.name)
+        raise StageOverloaded(self.name)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Semaphores are bound to the loop they are first used on
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
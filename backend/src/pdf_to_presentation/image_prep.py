@@ -0,0 +1,111 @@
+# image_prep.py
+# Prepares extracted images for embedding in a deck: each image is downsampled to
+# the size it is displayed at (for a target DPI) and recompressed, so decks do not
+# carry full-resolution scans. Results are memoized per process in an LRU cache.
+# The same downsampling produces the thumbnails served to the slide editor.
+# Pillow is imported on first use.
+
+import io
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+from .cache import LRUCache, content_hash
+
+DEFAULT_TARGET_DPI = 150
+JPEG_QUALITY = 85
+
+# Images with more distinct colors than this are treated as photos and stored as JPEG
+MAX_PALETTE_COLORS = 256
+# Single-channel images have few levels to begin with ("L" has at most 256), so
+# grayscale photos and scans are told apart from line art by a lower count
+MAX_GRAYSCALE_LEVELS = 64
+GRAYSCALE_MODES = ("L", "I", "I;16", "F")
+
+# Thumbnail requests are rounded up to one of these widths, bounding the number of variants per image
+THUMBNAIL_WIDTHS = (64, 128, 256, 512, 1024)
+
+# Keyed by (image hash, target width); the size bound keeps render workers' memory in check
+_prepared_images = LRUCache(max_entries=512, max_bytes=128 * 1024 * 1024)
+
+
+def _has_transparency(img: "Image.Image") -> bool:
+    if img.mode in ("RGBA", "LA", "PA"):
+        return True
+    return img.mode == "P" and "transparency" in img.info
+
+
+def _is_photo(img: "Image.Image") -> bool:
+    if img.mode in ("1", "P"):
+        return False
+    if img.mode in GRAYSCALE_MODES:
+        return img.getcolors(maxcolors=MAX_GRAYSCALE_LEVELS) is None
+    return img.getcolors(maxcolors=MAX_PALETTE_COLORS) is None
+
+
+def downsample_image(data: bytes, target_width: int) -> bytes:
+    """Resizes an image to at most `target_width` pixels wide and re-encodes it."""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as img:
+        img.load()
+        # Classified before resizing, which smooths away the colors a photo is told apart by
+        keep_png = _has_transparency(img) or not _is_photo(img)
+        needs_resize = img.width > target_width
+        if needs_resize:
+            target_height = max(1, round(img.height * target_width / img.width))
+            img = img.resize((target_width, target_height), Image.LANCZOS)
+
+        output = io.BytesIO()
+        if keep_png:
+            # Keep PNG for transparency and for diagrams or line art, which JPEG blurs
+            img.save(output, format="PNG", optimize=True)
+        elif img.mode in GRAYSCALE_MODES:
+            img.convert("L").save(output, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+        else:
+            img.convert("RGB").save(output, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+
+    prepared = output.getvalue()
+    # An image that is already small enough is only replaced if recompression helps
+    if not needs_resize and len(prepared) >= len(data):
+        return data
+    return prepared
+
+
+def prepare_image(image_path: str, display_width_inches: float,
+                  dpi: int = DEFAULT_TARGET_DPI) -> Optional[bytes]:
+    """
+    Returns the bytes of the image at `image_path`, downsampled for display at
+    `display_width_inches` wide and `dpi`, or None if it cannot be read.
+    """
+    try:
+        with open(image_path, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        print(f"Warning: Could not read image {image_path}: {e}")
+        return None
+
+    target_width = max(1, round(display_width_inches * dpi))
+    cache_key = f"{content_hash(data)}:{target_width}"
+    prepared = _prepared_images.get(cache_key)
+    if prepared is None:
+        try:
+            prepared = downsample_image(data, target_width)
+        except Exception as e:
+            print(f"Warning: Could not downsample {image_path}, embedding it unchanged: {e}")
+            prepared = data
+        _prepared_images.set(cache_key, prepared)
+    return prepared
+
+
+def snap_thumbnail_width(requested: int) -> int:
+    """Rounds a requested thumbnail width up to the nearest supported width."""
+    for width in THUMBNAIL_WIDTHS:
+        if requested <= width:
+            return width
+    return THUMBNAIL_WIDTHS[-1]
+
+
+def image_media_type(data: bytes) -> str:
+    return "image/png" if data.startswith(b"\x89PNG") else "image/jpeg"
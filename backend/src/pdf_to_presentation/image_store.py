@@ -0,0 +1,280 @@
+# image_store.py
+# Storage for images extracted from PDFs. Images are content-addressed (named by
+# their SHA-256), so the same image extracted from two documents, or by two
+# extraction shards, is stored once. The store records which documents own each
+# image, enforces a byte quota by evicting the least recently used images, and
+# expires images that have not been used within a TTL.
+#
+# Extraction runs in worker processes, which cannot update the store's in-memory
+# metadata. They write through an ImageWriter instead, and the parent process
+# registers the results with the store afterwards.
+
+import os
+import re
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Set
+
+DEFAULT_IMAGE_DIR = "extracted_images"
+
+# Names are "<sha256>.<ext>"; anything else is rejected before touching the filesystem
+_FILENAME_PATTERN = re.compile(r"^([0-9a-f]{64})\.(png|jpg)$")
+
+
+def is_valid_filename(filename: str) -> bool:
+    return _FILENAME_PATTERN.match(filename) is not None
+
+
+def shard_path(root: str, filename: str) -> str:
+    """Returns where `filename` lives under `root`, e.g. root/ab/cd/abcd....png."""
+    return os.path.join(root, filename[0:2], filename[2:4], filename)
+
+
+class ImageWriter(ABC):
+    """Writes image bytes to storage. Implementations must be picklable for worker processes."""
+
+    @abstractmethod
+    def write(self, data: bytes, sha256: str, ext: str) -> str:
+        """Stores an image and returns its filename."""
+
+
+@dataclass
+class LocalImageWriter(ImageWriter):
+    """Writes images into the sharded directory layout of a LocalImageStore."""
+    root: str = DEFAULT_IMAGE_DIR
+
+    def write(self, data: bytes, sha256: str, ext: str) -> str:
+        filename = f"{sha256}.{ext}"
+        path = shard_path(self.root, filename)
+        if os.path.exists(path):
+            return filename
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file and rename it, so concurrent writers of the
+        # same image never expose a partially written file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        return filename
+
+
+class ImageStore(ABC):
+    """The interface behind /images and the extractor."""
+
+    @abstractmethod
+    def writer(self) -> ImageWriter:
+        """Returns a picklable writer that stores images where this store can find them."""
+
+    @abstractmethod
+    def register(self, filenames: Iterable[str], owner: str) -> None:
+        """Records images written through `writer()` as belonging to the document `owner`."""
+
+    @abstractmethod
+    def local_path(self, filename: str) -> Optional[str]:
+        """Returns a local file path for an image, or None if it is not stored."""
+
+    @abstractmethod
+    def touch(self, filenames: Iterable[str]) -> None:
+        """Marks images as recently used, protecting them from eviction and expiry."""
+
+    @abstractmethod
+    def release(self, owner: str) -> int:
+        """Removes the images that no other document owns. Returns how many were removed."""
+
+    @abstractmethod
+    def sweep(self) -> int:
+        """Removes expired images. Returns how many were removed."""
+
+    @abstractmethod
+    def stats(self) -> dict:
+        pass
+
+    def exists(self, filenames: Iterable[str]) -> bool:
+        return all(self.local_path(filename) is not None for filename in filenames)
+
+
+@dataclass
+class _Entry:
+    size: int
+    last_used: float
+    owners: Set[str] = field(default_factory=set)
+
+
+class LocalImageStore(ImageStore):
+    """
+    An ImageStore on the local filesystem.
+
+    Images are kept in two levels of subdirectories taken from their hash, so no
+    single directory grows large. Metadata is held in memory, ordered from least
+    to most recently used; on startup it is rebuilt from the files on disk, using
+    their modification times (which `touch` keeps current) as the last use.
+    Ownership is not persisted across restarts.
+    """
+
+    def __init__(self, root: str = DEFAULT_IMAGE_DIR, max_bytes: Optional[int] = None,
+                 ttl_seconds: Optional[float] = None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._total_bytes = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._releases = 0
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._load()
+
+    def writer(self) -> ImageWriter:
+        return LocalImageWriter(self.root)
+
+    def register(self, filenames: Iterable[str], owner: str) -> None:
+        now = time.time()
+        registered = set()
+        with self._lock:
+            for filename in filenames:
+                entry = self._entries.get(filename)
+                if entry is None:
+                    try:
+                        size = os.path.getsize(shard_path(self.root, filename))
+                    except OSError:
+                        print(f"Warning: Image {filename} was registered but is not on disk.")
+                        continue
+                    entry = _Entry(size=size, last_used=now)
+                    self._entries[filename] = entry
+                    self._total_bytes += size
+                else:
+                    entry.last_used = now
+                    self._entries.move_to_end(filename)
+                entry.owners.add(owner)
+                registered.add(filename)
+            # The document that was just extracted must keep its own images
+            self._enforce_quota(protected=registered)
+
+    def local_path(self, filename: str) -> Optional[str]:
+        if not is_valid_filename(filename):
+            return None
+        with self._lock:
+            if filename not in self._entries:
+                return None
+        return shard_path(self.root, filename)
+
+    def touch(self, filenames: Iterable[str]) -> None:
+        now = time.time()
+        touched = []
+        with self._lock:
+            for filename in filenames:
+                entry = self._entries.get(filename)
+                if entry is not None:
+                    entry.last_used = now
+                    self._entries.move_to_end(filename)
+                    touched.append(filename)
+        for filename in touched:
+            try:
+                os.utime(shard_path(self.root, filename), (now, now))
+            except OSError:
+                pass
+
+    def release(self, owner: str) -> int:
+        with self._lock:
+            # Images loaded from disk at startup have no owners and are left to the TTL
+            orphaned = []
+            for filename, entry in self._entries.items():
+                if owner in entry.owners:
+                    entry.owners.discard(owner)
+                    if not entry.owners:
+                        orphaned.append(filename)
+            for filename in orphaned:
+                self._remove(filename)
+            self._releases += len(orphaned)
+        return len(orphaned)
+
+    def sweep(self) -> int:
+        if self.ttl_seconds is None:
+            return 0
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            # Entries are in LRU order, so the expired ones are all at the front
+            expired = []
+            for filename, entry in self._entries.items():
+                if entry.last_used > cutoff:
+                    break
+                expired.append(filename)
+            for filename in expired:
+                self._remove(filename)
+            self._expirations += len(expired)
+        if expired:
+            print(f"Image store expired {len(expired)} unused images.")
+        return len(expired)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "images": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "releases": self._releases,
+            }
+
+    def owners(self, filename: str) -> List[str]:
+        with self._lock:
+            entry = self._entries.get(filename)
+            return sorted(entry.owners) if entry else []
+
+    # --- Internal helpers (call with the lock held) ---
+
+    def _enforce_quota(self, protected: Set[str]) -> None:
+        if self.max_bytes is None:
+            return
+        for filename in list(self._entries):
+            if self._total_bytes <= self.max_bytes:
+                break
+            if filename in protected:
+                continue
+            self._remove(filename)
+            self._evictions += 1
+
+    def _remove(self, filename: str) -> None:
+        entry = self._entries.pop(filename, None)
+        if entry is None:
+            return
+        self._total_bytes -= entry.size
+        try:
+            os.remove(shard_path(self.root, filename))
+        except OSError:
+            pass
+
+    def _load(self) -> None:
+        """Rebuilds the metadata from the sharded directories on disk."""
+        found = []
+        for dirpath, _, files in os.walk(self.root):
+            for name in files:
+                if not is_valid_filename(name):
+                    continue
+                path = os.path.join(dirpath, name)
+                if path != shard_path(self.root, name):
+                    continue
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                found.append((stat.st_mtime, name, stat.st_size))
+        for mtime, name, size in sorted(found):
+            self._entries[name] = _Entry(size=size, last_used=mtime)
+            self._total_bytes += size
+        with self._lock:
+            self._enforce_quota(protected=set())
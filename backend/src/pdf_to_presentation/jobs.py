@@ -0,0 +1,173 @@
+# jobs.py
+# A small in-process job system for long-running conversions. Jobs are queued,
+# executed by a bounded pool of asyncio workers, and publish per-stage progress
+# to any number of subscribers (used for the server-sent events stream).
+
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+FINISHED_STATUSES = (COMPLETED, FAILED)
+
+# A pipeline receives a `report(stage, progress)` callback and returns the job result
+ProgressCallback = Callable[[str, int], None]
+Pipeline = Callable[[ProgressCallback], Awaitable[Any]]
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+@dataclass
+class Job:
+    id: str
+    pipeline: Pipeline
+    status: str = QUEUED
+    stage: Optional[str] = None
+    progress: int = 0
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    subscribers: List[asyncio.Queue] = field(default_factory=list)
+
+    def snapshot(self) -> dict:
+        """The public, JSON-serializable view of the job."""
+        return {
+            "id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """
+    Runs submitted pipelines on `workers` concurrent asyncio tasks.
+
+    At most `max_pending` jobs may wait in the queue; finished jobs (and their
+    results) are kept for `result_ttl` seconds so clients can fetch them later.
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 32, result_ttl: float = 3600):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+
+        self._jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # --- Public API ---
+
+    def submit(self, pipeline: Pipeline) -> Job:
+        """Queues a pipeline and returns its job. Must be called from the event loop."""
+        self._ensure_started()
+        self._prune_finished()
+        if self._queue.qsize() >= self.max_pending:
+            raise JobQueueFull("Too many conversions are queued. Please try again shortly.")
+
+        job = Job(id=uuid.uuid4().hex, pipeline=pipeline)
+        self._jobs[job.id] = job
+        self._queue.put_nowait(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._prune_finished()
+        return self._jobs.get(job_id)
+
+    async def events(self, job: Job) -> AsyncIterator[dict]:
+        """Yields the job's snapshot now and after every change until it finishes."""
+        queue: asyncio.Queue = asyncio.Queue()
+        job.subscribers.append(queue)
+        try:
+            snapshot = job.snapshot()
+            yield snapshot
+            while snapshot["status"] not in FINISHED_STATUSES:
+                snapshot = await queue.get()
+                yield snapshot
+        finally:
+            job.subscribers.remove(queue)
+
+    async def shutdown(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    # --- Workers ---
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._tasks:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        job.status = RUNNING
+        self._publish(job)
+
+        def report(stage: str, progress: int) -> None:
+            # Stages running in executor threads report through the event loop
+            try:
+                running_loop = asyncio.get_running_loop()
+            except RuntimeError:
+                running_loop = None
+            if running_loop is self._loop:
+                self._set_progress(job, stage, progress)
+            else:
+                self._loop.call_soon_threadsafe(self._set_progress, job, stage, progress)
+
+        try:
+            job.result = await job.pipeline(report)
+            job.status = COMPLETED
+            job.stage = COMPLETED
+            job.progress = 100
+        except Exception as e:
+            print(f"Job {job.id} failed: {e}")
+            job.status = FAILED
+            job.error = getattr(e, "detail", None) or str(e)
+        finally:
+            job.pipeline = None  # Release the uploaded document held by the pipeline
+            job.finished_at = time.time()
+            self._publish(job)
+
+    def _set_progress(self, job: Job, stage: str, progress: int) -> None:
+        if job.status in FINISHED_STATUSES:
+            return
+        job.stage = stage
+        job.progress = max(job.progress, min(progress, 99))
+        self._publish(job)
+
+    def _publish(self, job: Job) -> None:
+        snapshot = job.snapshot()
+        for queue in job.subscribers:
+            queue.put_nowait(snapshot)
+
+    def _prune_finished(self) -> None:
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
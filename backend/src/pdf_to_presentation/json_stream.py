@@ -0,0 +1,100 @@
+# json_stream.py
+# An incremental parser for the LLM's slide output. The model is asked for a JSON
+# array of slide objects; this parser is fed the response text as it streams in
+# and returns each top-level object as soon as its closing brace arrives, so
+# slides can be validated and sent to the client one at a time.
+
+import json
+import re
+from typing import List, Union
+
+_BEFORE_ARRAY = 0
+_IN_ARRAY = 1
+_DONE = 2
+
+# Trailing commas are the most common way models break otherwise valid JSON
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+
+class MalformedItem(ValueError):
+    """A complete array item that could not be parsed as a JSON object."""
+
+    def __init__(self, raw: str, reason: str):
+        super().__init__(reason)
+        self.raw = raw
+
+
+def parse_object(raw: str) -> dict:
+    """Parses one object, repairing trailing commas if needed. Raises MalformedItem."""
+    for candidate in (raw, _TRAILING_COMMA.sub(r"\1", raw)):
+        try:
+            value = json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(value, dict):
+            return value
+        raise MalformedItem(raw, "Array item is not a JSON object.")
+    raise MalformedItem(raw, "Array item is not valid JSON.")
+
+
+class SlideArrayParser:
+    """
+    Extracts the objects of the first top-level JSON array in a stream of text.
+
+    Anything before the opening `[` (such as a ```json fence) and after the closing
+    `]` is ignored. Braces inside strings are handled, including escaped quotes.
+    """
+
+    def __init__(self):
+        self._state = _BEFORE_ARRAY
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._buffer: List[str] = []
+
+    @property
+    def finished(self) -> bool:
+        return self._state == _DONE
+
+    def feed(self, text: str) -> List[Union[dict, MalformedItem]]:
+        """Consumes more text and returns the objects (or parse errors) it completed."""
+        items: List[Union[dict, MalformedItem]] = []
+        for char in text:
+            if self._state == _BEFORE_ARRAY:
+                if char == "[":
+                    self._state = _IN_ARRAY
+                continue
+            if self._state == _DONE:
+                break
+
+            if self._depth == 0:
+                # Between items: only the start of an object or the end of the array matter
+                if char == "{":
+                    self._depth = 1
+                    self._buffer = [char]
+                elif char == "]":
+                    self._state = _DONE
+                continue
+
+            self._buffer.append(char)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    raw = "".join(self._buffer)
+                    self._buffer = []
+                    try:
+                        items.append(parse_object(raw))
+                    except MalformedItem as e:
+                        items.append(e)
+        return items
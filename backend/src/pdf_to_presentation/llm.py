@@ -0,0 +1,330 @@
+# llm.py
+# The client used for every LLM call. Calls go through a provider interface
+# (Gemini in production, a stub in tests) and the client adds what the raw SDK
+# does not: a shared model instance, request and token rate limits, timeouts,
+# retries with jittered backoff, optional hedged requests, and coalescing of
+# identical prompts that are already in flight.
+#
+# The client is synchronous: it is called from the LLM stage's worker threads.
+
+import hashlib
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterator, Optional
+
+from .metrics import REGISTRY
+from .summarization import estimate_tokens
+
+DEFAULT_MODEL = "gemini-1.5-flash"
+
+LLM_CALLS = REGISTRY.counter("pdf2ppt_llm_calls_total", "Requests sent to the LLM provider.", ["kind"])
+LLM_RETRIES = REGISTRY.counter(
+    "pdf2ppt_llm_retries_total", "LLM requests retried after a transient error, by error type.", ["error"]
+)
+LLM_HEDGES = REGISTRY.counter("pdf2ppt_llm_hedges_total", "Hedged LLM requests sent, and how many won.", ["outcome"])
+LLM_COALESCED = REGISTRY.counter("pdf2ppt_llm_coalesced_total", "LLM calls served by an identical in-flight call.")
+LLM_RATE_WAIT_SECONDS = REGISTRY.histogram(
+    "pdf2ppt_llm_rate_limit_wait_seconds", "Time spent waiting for the LLM rate limiter."
+)
+
+
+class LLMError(Exception):
+    """An LLM call failed and will not be retried."""
+
+
+class LLMRateLimited(LLMError):
+    """The local rate limit could not admit a call within the allowed wait."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("The AI service is at its request limit. Please try again shortly.")
+        self.retry_after = retry_after
+
+
+# --- Providers ---
+class LLMProvider(ABC):
+    """A source of completions. Implementations must be safe to call from several threads."""
+
+    @abstractmethod
+    def generate(self, prompt: str, timeout: float) -> str:
+        """Returns the full completion for `prompt`."""
+
+    @abstractmethod
+    def stream(self, prompt: str, timeout: float) -> Iterator[str]:
+        """Yields the completion for `prompt` in pieces as they are produced."""
+
+    def is_retryable(self, error: Exception) -> bool:
+        """Whether `error` is transient, so the same request may succeed if sent again."""
+        return isinstance(error, (TimeoutError, ConnectionError))
+
+
+# google.api_core exceptions that indicate quota, overload or network trouble.
+# Matched by name so this module does not need google.api_core at import time.
+_GEMINI_RETRYABLE = {
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "DeadlineExceeded",
+    "InternalServerError", "GatewayTimeout", "RetryError",
+}
+
+
+class GeminiProvider(LLMProvider):
+    """Gemini through google.generativeai, reusing one model (and its connections) for every call."""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, api_key: Optional[str] = None):
+        self.model_name = model_name
+        self.api_key = api_key
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _get_model(self):
+        # The SDK is imported and configured on first use, keeping it out of the app's import time
+        with self._lock:
+            if self._model is None:
+                import google.generativeai as genai
+                if self.api_key:
+                    genai.configure(api_key=self.api_key)
+                self._model = genai.GenerativeModel(self.model_name)
+            return self._model
+
+    def generate(self, prompt: str, timeout: float) -> str:
+        response = self._get_model().generate_content(prompt, request_options={"timeout": timeout})
+        return response.text
+
+    def stream(self, prompt: str, timeout: float) -> Iterator[str]:
+        response = self._get_model().generate_content(prompt, stream=True, request_options={"timeout": timeout})
+        for chunk in response:
+            yield chunk.text
+
+    def is_retryable(self, error: Exception) -> bool:
+        return super().is_retryable(error) or type(error).__name__ in _GEMINI_RETRYABLE
+
+
+class StubProvider(LLMProvider):
+    """
+    A local provider for tests: answers with `respond(prompt)` after `latency`
+    seconds. The first `failures` calls raise `error` instead.
+    """
+
+    def __init__(self, respond: Callable[[str], str], latency: float = 0.0, failures: int = 0,
+                 error: Exception = ConnectionError("stub failure"), chunk_size: int = 64):
+        self.respond = respond
+        self.latency = latency
+        self.failures = failures
+        self.error = error
+        self.chunk_size = chunk_size
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _next_call(self) -> int:
+        with self._lock:
+            self.calls += 1
+            return self.calls
+
+    def generate(self, prompt: str, timeout: float) -> str:
+        call = self._next_call()
+        if self.latency:
+            time.sleep(self.latency)
+        if call <= self.failures:
+            raise self.error
+        return self.respond(prompt)
+
+    def stream(self, prompt: str, timeout: float) -> Iterator[str]:
+        text = self.generate(prompt, timeout)
+        for i in range(0, len(text), self.chunk_size):
+            yield text[i:i + self.chunk_size]
+
+
+# --- Rate Limiting ---
+class TokenBucket:
+    """
+    A thread-safe token bucket refilled at `per_minute` tokens per minute, holding
+    at most one minute's worth. Requests larger than the capacity are clamped to it.
+    """
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._tokens = self.capacity
+        self._clock = clock
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, amount: float = 1.0) -> float:
+        """Takes `amount` tokens if available and returns 0, or returns the seconds until they will be."""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return 0.0
+            return (amount - self._tokens) / self.rate
+
+    def refund(self, amount: float = 1.0) -> None:
+        """Returns tokens taken for a call that did not go out."""
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+
+# --- Client ---
+class LLMClient:
+    """
+    Sends prompts to a provider with rate limiting, retries and coalescing.
+
+    - `requests_per_minute` / `tokens_per_minute` bound the request rate and the
+      estimated prompt tokens sent; a call waits up to `max_rate_wait` seconds for
+      capacity before raising LLMRateLimited.
+    - Each attempt has a `timeout`; transient errors are retried up to `max_retries`
+      times, sleeping a random time up to `backoff_base * 2**attempt` (capped at `backoff_max`).
+    - With `hedge_after` set, a second identical request is sent if the first has
+      not answered within that many seconds, and the first answer wins. Requests
+      then run on a pool with room for a request and its hedge for each of the
+      `concurrency` calls the client is expected to make at once.
+    - Concurrent `generate` calls with the same prompt share a single request.
+    """
+
+    def __init__(self, provider: LLMProvider, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None, timeout: float = 120.0,
+                 max_retries: int = 3, backoff_base: float = 1.0, backoff_max: float = 20.0,
+                 hedge_after: Optional[float] = None, max_rate_wait: float = 30.0,
+                 concurrency: int = 8, sleep: Callable[[float], None] = time.sleep):
+        self.provider = provider
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_after = hedge_after
+        self.max_rate_wait = max_rate_wait
+        self._sleep = sleep
+        self._request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self._token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._hedge_pool = None
+        if hedge_after:
+            # A hedge must never wait behind other requests for a thread
+            self._hedge_pool = ThreadPoolExecutor(max_workers=2 * max(1, concurrency), thread_name_prefix="llm-hedge")
+
+    def generate(self, prompt: str) -> str:
+        """Returns the completion for `prompt`, joining an identical request if one is in flight."""
+        key = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        with self._lock:
+            shared = self._in_flight.get(key)
+            if shared is None:
+                future: Future = Future()
+                self._in_flight[key] = future
+        if shared is not None:
+            LLM_COALESCED.inc()
+            return shared.result()
+
+        try:
+            result = self._with_retries(lambda: self._generate_once(prompt), prompt)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """
+        Yields the completion for `prompt` in pieces. Failures before the first piece
+        are retried; once output has been yielded, an error is raised to the caller.
+        """
+        def first_chunk():
+            LLM_CALLS.inc(kind="stream")
+            iterator = iter(self.provider.stream(prompt, self.timeout))
+            try:
+                return iterator, next(iterator)
+            except StopIteration:
+                return iterator, None
+
+        iterator, first = self._with_retries(first_chunk, prompt)
+        if first is None:
+            return
+        yield first
+        yield from iterator
+
+    def shutdown(self) -> None:
+        if self._hedge_pool is not None:
+            self._hedge_pool.shutdown(wait=False, cancel_futures=True)
+
+    # --- Internal helpers ---
+
+    def _with_retries(self, attempt_call: Callable, prompt: str):
+        for attempt in range(self.max_retries + 1):
+            self._acquire(prompt)
+            try:
+                return attempt_call()
+            except Exception as e:
+                if attempt == self.max_retries or not self.provider.is_retryable(e):
+                    raise
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                print(f"LLM call failed ({type(e).__name__}: {e}); retrying in {delay:.1f}s.")
+                LLM_RETRIES.inc(error=type(e).__name__)
+                self._sleep(delay)
+
+    def _acquire(self, prompt: str, max_wait: Optional[float] = None) -> bool:
+        """
+        Waits for rate limit capacity for one request. If it will not come within
+        `max_wait` seconds, returns False, or raises LLMRateLimited when no
+        `max_wait` was given and the client's `max_rate_wait` applies.
+        """
+        must_admit = max_wait is None
+        max_wait = self.max_rate_wait if must_admit else max_wait
+        tokens = estimate_tokens(prompt)
+        started = time.monotonic()
+        waited = 0.0
+        while True:
+            wait_for = 0.0
+            if self._request_bucket is not None:
+                wait_for = self._request_bucket.try_acquire(1)
+            if wait_for == 0.0 and self._token_bucket is not None:
+                wait_for = self._token_bucket.try_acquire(tokens)
+                if wait_for and self._request_bucket is not None:
+                    # Return the request slot taken above, as the call is not going out yet
+                    self._request_bucket.refund(1)
+            if wait_for == 0.0:
+                LLM_RATE_WAIT_SECONDS.observe(time.monotonic() - started)
+                return True
+            if waited + wait_for > max_wait:
+                if must_admit:
+                    raise LLMRateLimited(retry_after=max(1, int(wait_for + 0.5)))
+                return False
+            self._sleep(wait_for)
+            waited += wait_for
+
+    def _generate_once(self, prompt: str) -> str:
+        LLM_CALLS.inc(kind="generate")
+        if self._hedge_pool is None:
+            return self.provider.generate(prompt, self.timeout)
+
+        primary = self._hedge_pool.submit(self.provider.generate, prompt, self.timeout)
+        done, _ = wait([primary], timeout=self.hedge_after)
+        if done:
+            return primary.result()
+        # The hedge must not push past the rate limit, so it is skipped if there is no capacity now
+        if not self._acquire(prompt, max_wait=0.0):
+            return primary.result()
+
+        LLM_CALLS.inc(kind="hedge")
+        LLM_HEDGES.inc(outcome="sent")
+        hedge = self._hedge_pool.submit(self.provider.generate, prompt, self.timeout)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for finished in done:
+                if finished.exception() is None:
+                    if finished is hedge:
+                        LLM_HEDGES.inc(outcome="won")
+                    return finished.result()
+                error = finished.exception()
+        raise error
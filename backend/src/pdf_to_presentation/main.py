@@ -1,153 +1,250 @@
 # main.py
 # Import necessary libraries
-import io
+import asyncio
 import json
 import os
+import time
 import uuid
-from typing import List, Literal, Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
 
-import fitz  # PyMuPDF
-import google.generativeai as genai
-from dotenv import load_dotenv
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import APIRouter, Depends, FastAPI, UploadFile, File, Form, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, FileResponse
-from fastapi.staticfiles import StaticFiles
-from pptx import Presentation
-from pptx.dml.color import RGBColor
-from pptx.enum.text import MSO_AUTO_SIZE
-from pptx.util import Inches, Pt
-from pydantic import BaseModel, Field
-
-# Import theme_config using a relative import
-from .theme_config import THEME_CONFIG
-
-
-# --- Models ---
-class Slide(BaseModel):
-    title: str = Field(..., description="The title of the slide (maximum 10 words)")
-    bullets: Optional[List[str]] = Field(None, description="List of bullet points for the slide")
-    text_block: Optional[str] = Field(None, description="A block of text for the slide instead of bullet points")
-    image_filename: Optional[str] = Field(None, description="The filename of the image to be included in the slide")
-
-
-class SlideContent(BaseModel):
-    slides: List[Slide] = Field(..., description="List of slides for the presentation")
-
+from fastapi.responses import StreamingResponse, FileResponse, PlainTextResponse, Response
+
+# Import local modules using relative imports. PyMuPDF, Pillow, NumPy, python-pptx
+# and the Gemini SDK are imported on first use, so importing this module is fast.
+from .models import Slide, SlideContent, PresentationContent
+from .settings import Settings
+from .cache import LRUCache, content_hash
+from .pdf_extraction import extract_pages_and_images_from_pdf
+from .page_selection import PageSelectionError
+from .summarization import chunk_pages, estimate_tokens, map_chunks
+from .condensation import clean_pages, select_sentences
+from .json_stream import MalformedItem, SlideArrayParser
+from .theme_config import THEMES
+from .jobs import COMPLETED, FAILED, JobManager, JobQueueFull
+from .executors import BoundedStage, StageOverloaded, process_pool
+from .uploads import StoredUpload, UploadTooLarge, save_upload
+from .image_store import LocalImageStore
+from .image_prep import downsample_image, image_media_type, snap_thumbnail_width
+from .batch import ZipStream, deck_filename, manifest_json, parse_themes
+from .llm import GeminiProvider, LLMClient, LLMRateLimited
+from .warmup import warm_up
+from . import metrics
+from .metrics import span
+
+
+# --- Application State ---
+class AppState:
+    """
+    The executors, caches, stores and clients the endpoints share. Built from one
+    Settings by create_app and kept on `app.state.services`.
+    """
 
-class PresentationContent(BaseModel):
-    slides: List[Slide] = Field(..., description="List of slides for the presentation")
-    theme_type: Literal["color", "background"] = Field(..., description="The type of theme to apply.")
-    theme_name: str = Field(..., description="The name of the theme to apply (e.g., 'classic_dark', 'blue_gradient').")
+    def __init__(self, settings: Settings):
+        self.settings = settings
+
+        # --- Executors ---
+        # Blocking work never runs on the event loop. PyMuPDF and python-pptx run in
+        # process pools and Gemini calls in a thread pool; each stage admits a bounded
+        # number of requests and rejects the rest with a 503. With more than one
+        # extraction worker, large PDFs are split into page ranges extracted in parallel.
+        self.extraction_workers = max(settings.extraction_concurrency, settings.pdf_extraction_workers)
+        self.extraction_pool = process_pool(self.extraction_workers)
+        # The extraction stage's threads only coordinate the cache and wait on the process pool
+        self.extraction_stage = self._stage(
+            "extraction", ThreadPoolExecutor(max_workers=settings.extraction_concurrency, thread_name_prefix="extraction"),
+            settings.extraction_concurrency,
+        )
+        self.llm_stage = self._stage(
+            "llm", ThreadPoolExecutor(max_workers=settings.llm_concurrency, thread_name_prefix="llm"),
+            settings.llm_concurrency,
+        )
+        self.render_stage = self._stage(
+            "render", process_pool(settings.render_concurrency), settings.render_concurrency,
+        )
+        # Thumbnails are small, so they are resized on threads rather than the render processes
+        self.thumbnail_stage = self._stage(
+            "thumbnails", ThreadPoolExecutor(max_workers=settings.thumbnail_concurrency, thread_name_prefix="thumbnails"),
+            settings.thumbnail_concurrency,
+        )
 
+        # --- LLM Client ---
+        # Every Gemini call goes through one shared client that reuses the model, keeps
+        # under the provider's quotas, and retries transient failures with backoff.
+        self.llm_client = LLMClient(
+            GeminiProvider(settings.llm_model, api_key=settings.google_api_key),
+            requests_per_minute=settings.llm_requests_per_minute,
+            tokens_per_minute=settings.llm_tokens_per_minute,
+            timeout=settings.llm_timeout,
+            max_retries=settings.llm_max_retries,
+            hedge_after=settings.llm_hedge_after,
+            max_rate_wait=settings.llm_max_rate_wait,
+            concurrency=settings.llm_concurrency,
+        )
 
-# --- Configuration ---
-load_dotenv()
-app = FastAPI(title="PDF to Presentation API")
+        # --- Caching ---
+        # Repeat uploads of the same PDF are served from these caches. Extraction results
+        # are keyed by the PDF's content hash; generated slides additionally by detail level.
+        # An extraction leaving the cache releases the images only it used.
+        self.extraction_cache = self._cache(
+            "extraction", settings.cache_max_entries, on_evict=lambda key: self.image_store.release(key),
+        )
+        self.slides_cache = self._cache("slides", settings.cache_max_entries)
+        self.summaries_cache = self._cache("summaries", settings.cache_max_entries * 8)
+        # Resized variants served by /images?w=, keyed by image name and width
+        self.thumbnail_cache = LRUCache(
+            max_entries=settings.thumbnail_cache_entries, max_bytes=settings.thumbnail_cache_max_bytes,
+        )
+        # The shape XML of rendered slides, keyed by content, theme and image settings, and
+        # their downsampled images, keyed by image name and DPI. It is kept here rather than
+        # in the render workers, as a deck may be rendered by any of them.
+        self.rendered_slides_cache = LRUCache(max_entries=4096, max_bytes=64 * 1024 * 1024)
+
+        # --- Image Store ---
+        # Extracted images are stored by content hash, owned by the cached extractions they
+        # came from, and evicted least-recently-used first once the quota is exceeded. A
+        # background sweeper removes images that have not been served or rendered within the TTL.
+        self.image_store = LocalImageStore(
+            settings.image_store_dir, max_bytes=settings.image_store_max_bytes, ttl_seconds=settings.image_ttl_seconds,
+        )
+        self.image_sweeper: Optional[asyncio.Task] = None
 
-if not os.path.exists("extracted_images"):
-    os.makedirs("extracted_images")
+        # --- Background Jobs ---
+        # Conversions submitted through /api/jobs run on a bounded pool of workers
+        # instead of holding the HTTP request open for the whole pipeline.
+        self.job_manager = JobManager(
+            workers=settings.job_workers, max_pending=settings.job_max_pending, result_ttl=settings.job_result_ttl,
+        )
 
-app.mount("/images", StaticFiles(directory="extracted_images"), name="images")
+    def _stage(self, name: str, executor, concurrency: int) -> BoundedStage:
+        return BoundedStage(
+            name, executor, max_concurrency=concurrency,
+            max_queue=self.settings.stage_max_queue, queue_timeout=self.settings.stage_queue_timeout,
+        )
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+    def _cache(self, name: str, max_entries: int, on_evict: Optional[Callable[[str], None]] = None) -> LRUCache:
+        cache_dir = self.settings.cache_dir
+        return LRUCache(
+            max_entries=max_entries,
+            directory=os.path.join(cache_dir, name) if cache_dir else None,
+            max_disk_bytes=self.settings.cache_max_disk_bytes,
+            on_evict=on_evict,
+        )
 
-try:
-    api_key = os.getenv("GOOGLE_API_KEY")
-    if not api_key:
-        raise ValueError("GOOGLE_API_KEY environment variable not set.")
-    genai.configure(api_key=api_key)
-except ValueError as e:
-    print(f"ERROR: {e}")
+    @property
+    def stages(self) -> tuple:
+        return (self.extraction_stage, self.llm_stage, self.render_stage, self.thumbnail_stage)
+
+    def start(self) -> None:
+        self.image_sweeper = asyncio.create_task(self.sweep_images_periodically())
+
+    async def sweep_images_periodically(self):
+        while True:
+            await asyncio.sleep(self.settings.image_sweep_interval_seconds)
+            try:
+                await asyncio.to_thread(self.image_store.sweep)
+            except Exception as e:
+                print(f"Image sweep failed: {e}")
+
+    async def warm_up(self) -> None:
+        """
+        Imports the heavy libraries in this process and every worker process, and
+        builds the theme templates in the render workers.
+        """
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        # Submitting one call per worker at once makes each pool start all of its processes
+        calls = [asyncio.to_thread(warm_up)]
+        calls += [
+            loop.run_in_executor(self.render_stage.executor, warm_up, True)
+            for _ in range(self.settings.render_concurrency)
+        ]
+        calls += [loop.run_in_executor(self.extraction_pool, warm_up) for _ in range(self.extraction_workers)]
+        await asyncio.gather(*calls)
+        print(f"Warm-up finished in {time.perf_counter() - started:.2f}s.")
+
+    async def shutdown(self) -> None:
+        if self.image_sweeper is not None:
+            self.image_sweeper.cancel()
+        await self.job_manager.shutdown()
+        for stage in self.stages:
+            stage.shutdown()
+        self.llm_client.shutdown()
+        self.extraction_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def get_state(request: Request) -> AppState:
+    return request.app.state.services
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    state: AppState = app.state.services
+    # With WARM_UP set, startup completes (and traffic is accepted) only once warm
+    if state.settings.warm_up:
+        await state.warm_up()
+    state.start()
+    try:
+        yield
+    finally:
+        await state.shutdown()
+
+
+# --- Instrumentation ---
+# Stage timings and counters are exported on /metrics. With PROFILING_ENABLED set,
+# a request carrying an `X-Profile: 1` header has the blocking work it triggers run
+# under cProfile; the stats are written to PROFILE_DIR as <profile id>-<stage>-<n>.prof
+# and the id is returned in the X-Profile-Id response header.
+async def instrument_requests(request: Request, call_next):
+    settings: Settings = request.app.state.services.settings
+    started = time.perf_counter()
+    profile_id = None
+    profile_token = None
+    if settings.profiling_enabled and request.headers.get("x-profile") == "1":
+        profile_id = uuid.uuid4().hex
+        profile_token = metrics.profile_prefix.set(os.path.join(settings.profile_dir, profile_id))
+    try:
+        response = await call_next(request)
+    finally:
+        if profile_token is not None:
+            metrics.profile_prefix.reset(profile_token)
+
+    # Label by route template rather than path, so image names do not create new series
+    route = request.scope.get("route")
+    metrics.HTTP_REQUEST_SECONDS.observe(
+        time.perf_counter() - started,
+        method=request.method, route=getattr(route, "path", "unmatched"), status=response.status_code,
+    )
+    if profile_id is not None:
+        response.headers["X-Profile-Id"] = profile_id
+    return response
 
 
 # --- Helper Functions ---
 
-def extract_text_and_images_from_pdf(pdf_content: bytes) -> tuple[str, List[dict]]:
-    full_text = ""
-    images = []
-    with fitz.open(stream=pdf_content, filetype="pdf") as doc:
-        for page_num, page in enumerate(doc):
-            full_text += page.get_text()
-            for img_index, img_info in enumerate(page.get_images(full=True)):
-
-                # --- START: Definitive Image Processing Logic ---
-                xref = img_info[0]
-                smask_xref = img_info[1]  # XREF for the soft mask image
-
-                # If there's a soft mask, we need to recombine it with the base image
-                if smask_xref > 0:
-                    try:
-                        print(f"Recombining transparent image on page {page_num + 1} with its mask.")
-                        # Get the base image pixmap
-                        base_pix = fitz.Pixmap(doc, xref)
-                        # Get the mask pixmap
-                        mask_pix = fitz.Pixmap(doc, smask_xref)
-
-                        # Create a new pixmap by combining the base and the mask
-                        final_pix = fitz.Pixmap(base_pix, mask_pix)
-
-                        # If the base was not RGBA, convert it before cleaning up
-                        if base_pix.alpha == 0:
-                            base_pix = fitz.Pixmap(fitz.csRGB, base_pix)
-
-                        # Clean up intermediate pixmaps
-                        base_pix = None
-                        mask_pix = None
-
-                    except Exception as e:
-                        print(f"Error combining pixmaps: {e}, falling back to base image.")
-                        final_pix = fitz.Pixmap(doc, xref)  # Fallback
-                else:
-                    # No mask, just get the image directly
-                    final_pix = fitz.Pixmap(doc, xref)
-
-                # Now, convert the final pixmap (which has correct transparency) to bytes
-                image_bytes = final_pix.tobytes("png")
-                final_pix = None  # Clean up
-                image_ext = "png"
-                # --- END: Definitive Image Processing Logic ---
+DETAIL_DESCRIPTIONS = {
+    0: "very concise", 1: "concise", 2: "normal",
+    3: "detailed", 4: "very detailed"
+}
+BULLET_COUNTS = {
+    0: "1-2", 1: "2-3", 2: "3-4", 3: "4-5", 4: "5-6"
+}
 
-                image_filename = f"image_{page_num + 1}_{img_index + 1}_{uuid.uuid4()}.{image_ext}"
-                image_path = os.path.join("extracted_images", image_filename)
 
-                with open(image_path, "wb") as img_file:
-                    img_file.write(image_bytes)
-
-                words = page.get_text("words")
-                img_bbox = page.get_image_bbox(img_info)
-                context_text = " ".join([w[4] for w in words if fitz.Rect(w[:4]).intersects(img_bbox)])
-
-                images.append({"filename": image_filename, "context": context_text})
-
-    print(f"Successfully extracted {len(full_text)} characters and {len(images)} images.")
-    return full_text, images
-
-
-def generate_slides_content_with_gemini(text: str, images: List[dict], detail_level: int = 2) -> List[Slide]:
-    print(f"Generating slide content with Gemini at detail level {detail_level}...")
-    model = genai.GenerativeModel('gemini-1.5-flash')
-    detail_descriptions = {
-        0: "very concise", 1: "concise", 2: "normal",
-        3: "detailed", 4: "very detailed"
-    }
-    bullet_counts = {
-        0: "1-2", 1: "2-3", 2: "3-4", 3: "4-5", 4: "5-6"
-    }
-    detail_description = detail_descriptions.get(detail_level, "normal")
-    bullet_count = bullet_counts.get(detail_level, "3-4")
+def build_slides_prompt(text: str, images: List[dict], detail_level: int = 2) -> str:
+    detail_description = DETAIL_DESCRIPTIONS.get(detail_level, "normal")
+    bullet_count = BULLET_COUNTS.get(detail_level, "3-4")
     image_prompts = ""
     if images:
         image_prompts = "\n\nThe following images were extracted from the PDF. Please incorporate them into the slides where they are most relevant, using their context to guide placement. Use each image no more than once:\n"
         for image in images:
             image_prompts += f"- Image: {image['filename']}, Context: {image['context']}\n"
-    prompt = f"""
+    return f"""
     Based on the following text and images from a report, please generate a {detail_description} summary presentation.
     The output should be a valid JSON object.
     The JSON object must be a single list `[]` containing multiple slide objects {{}}.
@@ -168,232 +265,752 @@ def generate_slides_content_with_gemini(text: str, images: List[dict], detail_le
     {text}
     ---
     """
+
+
+def rate_limited_error(e: LLMRateLimited) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+
+def generate_slides_content_with_gemini(llm_client: LLMClient, text: str, images: List[dict],
+                                        detail_level: int = 2) -> List[Slide]:
+    print(f"Generating slide content with Gemini at detail level {detail_level}...")
+    prompt = build_slides_prompt(text, images, detail_level)
     try:
-        response = model.generate_content(prompt)
-        response_text = response.text.strip().replace("```json", "").replace("```", "")
-        raw_slide_data = json.loads(response_text)
-        if not isinstance(raw_slide_data, list):
-            raise ValueError("AI response is not a list.")
-        slide_data = [Slide(**slide) for slide in raw_slide_data]
+        with span("llm_generate"):
+            response_text = llm_client.generate(prompt)
+        with span("json_parse"):
+            response_text = response_text.strip().replace("```json", "").replace("```", "")
+            raw_slide_data = json.loads(response_text)
+            if not isinstance(raw_slide_data, list):
+                raise ValueError("AI response is not a list.")
+            slide_data = [Slide(**slide) for slide in raw_slide_data]
+        metrics.SLIDES_GENERATED.inc(len(slide_data))
         print("Successfully generated and parsed slide data from Gemini.")
         return slide_data
+    except LLMRateLimited as e:
+        raise rate_limited_error(e)
     except Exception as e:
         print(f"An error occurred during Gemini content generation: {e}")
         raise HTTPException(status_code=500, detail="Failed to generate or parse content from AI.")
 
 
-def set_slide_background_image(prs, slide, image_path):
-    left = top = 0
-    width = prs.slide_width
-    height = prs.slide_height
-    pic = slide.shapes.add_picture(image_path, left, top, width, height)
-    slide.shapes._spTree.remove(pic._element)
-    slide.shapes._spTree.insert(2, pic._element)
+def repair_slide(raw_slide: dict, image_filenames: set) -> Slide:
+    """
+    Validates one slide object from the model, fixing common mistakes on the way:
+    a bare string for `bullets`, and image filenames that were never extracted.
+    """
+    raw_slide = dict(raw_slide)
+    if isinstance(raw_slide.get("bullets"), str):
+        raw_slide["bullets"] = [raw_slide["bullets"]]
+    if raw_slide.get("image_filename") and raw_slide["image_filename"] not in image_filenames:
+        raw_slide["image_filename"] = None
+    return Slide(**raw_slide)
+
 
+def stream_slides_with_gemini(llm_client: LLMClient, text: str, images: List[dict], detail_level: int, emit) -> None:
+    """
+    Streams the Gemini response and calls `emit` with each slide as soon as it is
+    complete and valid, or with a MalformedItem/exception for a slide that is not.
+    A bad slide is reported and skipped instead of failing the whole response.
+    """
+    print(f"Streaming slide content from Gemini at detail level {detail_level}...")
+    prompt = build_slides_prompt(text, images, detail_level)
+    image_filenames = {image["filename"] for image in images}
+    parser = SlideArrayParser()
+
+    with span("llm_stream"):
+        for chunk in llm_client.stream(prompt):
+            for item in parser.feed(chunk):
+                if isinstance(item, MalformedItem):
+                    metrics.MALFORMED_SLIDES.inc()
+                    emit(item)
+                    continue
+                try:
+                    slide = repair_slide(item, image_filenames)
+                except Exception as e:
+                    metrics.MALFORMED_SLIDES.inc()
+                    emit(MalformedItem(json.dumps(item), f"Invalid slide: {e}"))
+                    continue
+                metrics.SLIDES_GENERATED.inc()
+                emit(slide)
+            if parser.finished:
+                break
+
+
+def summarize_chunk_with_gemini(llm_client: LLMClient, chunk: str, detail_level: int = 2) -> str:
+    """The map step of chunked summarization: condenses one section of a long report."""
+    detail_description = DETAIL_DESCRIPTIONS.get(detail_level, "normal")
+    prompt = f"""
+    The following text is one section of a longer report.
+    Write a {detail_description} summary of it in plain prose, keeping its headings,
+    key figures, names and conclusions, so that it can later be turned into presentation slides.
+    Do not add information that is not in the text.
+    ---
+    {chunk}
+    ---
+    """
+    try:
+        with span("llm_summarize"):
+            response_text = llm_client.generate(prompt)
+        return response_text.strip()
+    except LLMRateLimited as e:
+        raise rate_limited_error(e)
+    except Exception as e:
+        print(f"An error occurred during Gemini chunk summarization: {e}")
+        raise HTTPException(status_code=500, detail="Failed to summarize the document with AI.")
 
-def calculate_font_size(text_length: int, min_font=14, max_font=28, min_chars=100, max_chars=500) -> int:
-    """Calculates a dynamic font size based on text length."""
-    if text_length < min_chars:
-        return max_font
-    if text_length > max_chars:
-        return min_font
 
-    # Linear interpolation between max and min font size
-    slope = (min_font - max_font) / (max_chars - min_chars)
-    font_size = max_font + slope * (text_length - min_chars)
+async def summarize_chunk(state: AppState, chunk: str, detail_level: int) -> str:
+    cache_key = f"chunk:{content_hash(chunk.encode('utf-8'))}:{detail_level}"
+    summary = state.summaries_cache.get(cache_key)
+    if summary is None:
+        metrics.PROMPT_TOKENS.inc(estimate_tokens(chunk), call="summary")
+        summary = await state.llm_stage.run(summarize_chunk_with_gemini, state.llm_client, chunk, detail_level)
+        state.summaries_cache.set(cache_key, summary)
+    return summary
 
-    return int(font_size)
 
-def create_presentation(slide_data: List[Slide], theme_type: str, theme_name: str) -> io.BytesIO:
+async def prepare_slides_text(state: AppState, pages: List[str], detail_level: int) -> str:
+    """
+    Returns the text the slides are generated from. Pages are first cleaned of
+    running headers, footers and whitespace noise. Short documents are then used
+    as-is, and those over the condense token budget are cut down to their highest-ranked
+    sentences. Long ones are split into chunks under the chunk token budget that are
+    summarized concurrently (map), and the summaries are combined for the final call (reduce).
     """
-    Creates a PowerPoint presentation from structured data using a predefined theme.
-    This version uses specific layouts for bullets vs. text_blocks and dynamically
-    resizes content placeholders to prevent overlap with images.
+    settings = state.settings
+    with span("condensation"):
+        pages = await asyncio.to_thread(clean_pages, pages)
+        text = "".join(pages)
+        tokens = estimate_tokens(text)
+        if tokens <= settings.chunked_summary_threshold_tokens and 0 < settings.condense_token_budget < tokens:
+            text = await asyncio.to_thread(select_sentences, text, settings.condense_token_budget)
+            print(f"Condensed text from {tokens} to {estimate_tokens(text)} estimated tokens.")
+    if tokens <= settings.chunked_summary_threshold_tokens:
+        metrics.PROMPT_TOKENS.inc(estimate_tokens(text), call="slides")
+        return text
+
+    chunks = chunk_pages(pages, settings.chunk_token_budget)
+    print(f"Summarizing {len(chunks)} chunks with up to {settings.chunk_parallelism} concurrent calls...")
+    summaries = await map_chunks(
+        chunks, lambda chunk: summarize_chunk(state, chunk, detail_level), max_parallel=settings.chunk_parallelism
+    )
+    text = "\n\n".join(summaries)
+    metrics.PROMPT_TOKENS.inc(estimate_tokens(text), call="slides")
+    return text
+
+
+async def generate_slides(state: AppState, pages: List[str], images: List[dict], detail_level: int) -> List[Slide]:
+    """Generates slides for an extracted document, summarizing it in chunks first if it is long."""
+    text = await prepare_slides_text(state, pages, detail_level)
+    return await state.llm_stage.run(generate_slides_content_with_gemini, state.llm_client, text, images, detail_level)
+
+
+@dataclass(frozen=True)
+class ExtractionOptions:
     """
-    print(f"Creating presentation with new plan: '{theme_name}' (type: {theme_type})")
-
-    prs = Presentation()
-    prs.slide_width = Inches(16)
-    prs.slide_height = Inches(9)
-
-    # --- Define Slide Layouts ---
-    title_and_content_layout = prs.slide_layouts[1]  # For bullet points
-    title_only_layout = prs.slide_layouts[5]  # For text blocks
-
-    # --- Get Theme Configuration ---
-    theme = None
-    if theme_type == "color":
-        theme = next((t for t in THEME_CONFIG["colors"] if t["name"] == theme_name), None)
-    elif theme_type == "background":
-        theme = next((t for t in THEME_CONFIG["backgrounds"] if t["name"] == theme_name), None)
-
-    if not theme:
-        print(f"Warning: Theme '{theme_name}' not found.")
-
-    # (Master slide theme application remains the same)
-    master = prs.slide_master
-    if theme:
-        if theme_type == "color":
-            fill = master.background.fill
-            fill.solid()
-            fill.fore_color.rgb = RGBColor.from_string(theme["primaryColor"])
-            for shape in master.placeholders:
-                if shape.has_text_frame:
-                    shape.text_frame.paragraphs[0].font.color.rgb = RGBColor.from_string(theme["textColor"])
-        elif theme_type == "background":
-            for shape in master.placeholders:
-                if shape.has_text_frame:
-                    shape.text_frame.paragraphs[0].font.color.rgb = RGBColor.from_string(theme["textColor"])
-
-    # --- Create Slides ---
-    for slide_info in slide_data:
-        has_image = bool(slide_info.image_filename)
-
-        if slide_info.bullets:
-            slide = prs.slides.add_slide(title_and_content_layout)
-            title_shape = slide.shapes.title
-            body_shape = slide.placeholders[1]
-
-            # Resize body placeholder if there is an image
-            if has_image:
-                body_shape.width = Inches(7.5)
-                body_shape.top = Inches(1.5)
-                body_shape.left = Inches(0.5)
-
-
-            # Populate bullets
-            tf = body_shape.text_frame
-            tf.clear()
-
-            total_chars = sum(len(s) for s in slide_info.bullets)
-            font_size = calculate_font_size(total_chars)
-
-            for bullet_text in slide_info.bullets:
-                p = tf.add_paragraph()
-                p.text = bullet_text
-                p.font.size = Pt(font_size)
-                p.level = 0
-            tf.auto_size = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
-
-        elif slide_info.text_block:
-            slide = prs.slides.add_slide(title_only_layout)
-            title_shape = slide.shapes.title
-
-            # Define dimensions for the text box
-            left = Inches(0.5)
-            top = Inches(1.5)
-            height = Inches(7.0)
-            # Adjust width if there is an image
-            width = Inches(7.5) if has_image else Inches(15)
-
-            # Add and populate the text box
-            txBox = slide.shapes.add_textbox(left, top, width, height)
-            tf = txBox.text_frame
-            p = tf.paragraphs[0]
-            p.text = slide_info.text_block
-
-            font_size = calculate_font_size(len(slide_info.text_block))
-            p.font.size = Pt(font_size)
-
-            tf.auto_size = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
-            tf.word_wrap = True
-
-        else:  # Title only slide
-            slide = prs.slides.add_slide(title_only_layout)
-            title_shape = slide.shapes.title
-
-        # --- Set Title ---
-        if title_shape:
-            title_shape.text = slide_info.title
-            if theme:
-                if theme_type == "color":
-                    title_shape.text_frame.paragraphs[0].font.color.rgb = RGBColor.from_string(theme["secondaryColor"])
-                elif theme_type == "background":
-                    title_shape.text_frame.paragraphs[0].font.color.rgb = RGBColor.from_string(theme["titleColor"])
-
-        # --- Add Image (if it exists) ---
-        if has_image:
-            image_path = os.path.join("extracted_images", slide_info.image_filename)
-            if os.path.exists(image_path):
-                # Place image on the right side of the slide
-                slide.shapes.add_picture(image_path, Inches(8.25), Inches(1.5), width=Inches(7.25))
-
-        # --- Set Slide Background (for image themes) ---
-        if theme and theme_type == "background":
-            image_path = os.path.join(os.path.dirname(__file__), "backgrounds", theme["image_filename"])
-            if os.path.exists(image_path):
-                set_slide_background_image(prs, slide, image_path)
-            else:
-                print(f"Warning: Background image not found at {image_path}")
-
-    pptx_stream = io.BytesIO()
-    prs.save(pptx_stream)
-    pptx_stream.seek(0)
-    return pptx_stream
+    Which part of an uploaded PDF to convert: a page selection ("1-5,8" or
+    "toc:<section title>"), whether to skip images, and a character budget.
+    """
+    pages: Optional[str] = None
+    text_only: bool = False
+    max_chars: Optional[int] = None
 
+    def cache_suffix(self) -> str:
+        # Empty for the whole document, so those entries keep their original keys
+        if self == FULL_DOCUMENT:
+            return ""
+        options = json.dumps([self.pages, self.text_only, self.max_chars])
+        return ":" + content_hash(options.encode("utf-8"))[:16]
 
-# --- API Endpoints ---
-@app.post("/api/generate-slide-content", response_model=SlideContent)
-async def generate_slide_content(file: UploadFile = File(...), detail_level: int = 2):
+
+FULL_DOCUMENT = ExtractionOptions()
+
+
+def slides_cache_key(pdf_hash: str, detail_level: int, options: ExtractionOptions) -> str:
+    return f"slides:{pdf_hash}:{detail_level}{options.cache_suffix()}"
+
+
+def get_or_extract_pdf(state: AppState, pdf_path: str, pdf_hash: str,
+                       options: ExtractionOptions = FULL_DOCUMENT) -> tuple[List[str], List[dict]]:
+    """
+    Returns the extracted page texts and images for a PDF, reusing a cached result
+    when the same document has been processed before and its images are still on disk.
+    """
+    image_store = state.image_store
+    cache_key = f"pages:{pdf_hash}{options.cache_suffix()}"
+    cached = state.extraction_cache.get(cache_key)
+    if cached is not None:
+        pages, images = cached
+        image_filenames = [image["filename"] for image in images]
+        if image_store.exists(image_filenames):
+            print(f"Extraction cache hit for {pdf_hash[:12]}.")
+            image_store.register(image_filenames, owner=cache_key)
+            return pages, images
+        # Images were evicted since this entry was written, so it is stale
+        state.extraction_cache.delete(cache_key)
+
+    timings: Dict[str, float] = {}
+    with span("extraction"):
+        pages, images = extract_pages_and_images_from_pdf(
+            pdf_path, workers=state.settings.pdf_extraction_workers, executor=state.extraction_pool,
+            image_writer=image_store.writer(), context_margin=state.settings.image_context_margin, timings=timings,
+            page_selection=options.pages, include_images=not options.text_only, max_chars=options.max_chars,
+        )
+    # CPU time in the workers, split between PyMuPDF text extraction and image encoding
+    metrics.STAGE_SECONDS.observe(timings.get("text", 0.0), stage="extraction_text")
+    metrics.STAGE_SECONDS.observe(timings.get("images", 0.0), stage="extraction_images")
+    metrics.PAGES_EXTRACTED.inc(len(pages))
+    metrics.IMAGES_EXTRACTED.inc(len(images))
+    image_store.register([image["filename"] for image in images], owner=cache_key)
+    state.extraction_cache.set(cache_key, (pages, images))
+    return pages, images
+
+
+def overloaded_error(e: StageOverloaded) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+
+async def receive_pdf(state: AppState, file: UploadFile) -> StoredUpload:
+    """Validates an uploaded PDF and streams it to a temporary file."""
     if file.content_type != "application/pdf":
         raise HTTPException(status_code=400, detail="Invalid file type. Please upload a PDF.")
     try:
-        pdf_contents = await file.read()
-        text_content, images = extract_text_and_images_from_pdf(pdf_contents)
-        slides = generate_slides_content_with_gemini(text_content, images, detail_level)
-        return SlideContent(slides=slides)
+        with span("upload"):
+            upload = await save_upload(file, max_bytes=state.settings.max_upload_bytes)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    metrics.UPLOAD_BYTES.inc(upload.size)
+    return upload
+
+
+def get_cached_slides(state: AppState, pdf_hash: str, detail_level: int,
+                      options: ExtractionOptions = FULL_DOCUMENT) -> Optional[List[Slide]]:
+    """Returns previously generated slides for a PDF, or None if they are missing or stale."""
+    slides_key = slides_cache_key(pdf_hash, detail_level, options)
+    cached_slides = state.slides_cache.get(slides_key)
+    if cached_slides is None:
+        return None
+    image_filenames = [s.image_filename for s in cached_slides if s.image_filename]
+    if not state.image_store.exists(image_filenames):
+        state.slides_cache.delete(slides_key)
+        return None
+    state.image_store.touch(image_filenames)
+    print(f"Slide cache hit for {pdf_hash[:12]} at detail level {detail_level}.")
+    return cached_slides
+
+
+async def build_slide_content(state: AppState, upload: StoredUpload, detail_level: int, report,
+                              options: ExtractionOptions = FULL_DOCUMENT) -> SlideContent:
+    """
+    The extract -> LLM -> slides pipeline. Blocking stages run on their bounded
+    executors, and progress is reported as each stage starts.
+    """
+    report("extracting", 5)
+    cached_slides = get_cached_slides(state, upload.sha256, detail_level, options)
+    if cached_slides is not None:
+        return SlideContent(slides=cached_slides)
+
+    pages, images = await state.extraction_stage.run(get_or_extract_pdf, state, upload.path, upload.sha256, options)
+
+    report("generating", 35)
+    slides = await generate_slides(state, pages, images, detail_level)
+
+    report("finalizing", 95)
+    state.slides_cache.set(slides_cache_key(upload.sha256, detail_level, options), slides)
+    return SlideContent(slides=slides)
+
+
+async def run_slide_content_pipeline(state: AppState, upload: StoredUpload, detail_level: int,
+                                     report, options: ExtractionOptions = FULL_DOCUMENT) -> SlideContent:
+    """The pipeline behind a conversion job. The uploaded file is removed once it finishes."""
+    try:
+        return await build_slide_content(state, upload, detail_level, report, options)
+    finally:
+        upload.remove()
+
+
+async def render_deck(state: AppState, slides: List[Slide], theme_type: str, theme_name: str) -> bytes:
+    """
+    Renders a deck in a render worker process and returns the .pptx file contents.
+    Slides rendered before, and their prepared images, are sent along from the rendered
+    slide cache, so only new or changed slides are laid out.
+    """
+    # Imported here so python-pptx is only loaded once a deck is rendered
+    from .presentation import prepared_image_key, render_presentation, slide_cache_key
+
+    # Resolve the images to files the render worker can read
+    image_store = state.image_store
+    image_paths: Dict[str, str] = {}
+    for slide in slides:
+        if slide.image_filename:
+            path = image_store.local_path(slide.image_filename)
+            if path is not None:
+                image_paths[slide.image_filename] = path
+    image_store.touch(image_paths)
+
+    image_dpi = state.settings.render_image_dpi
+    cached_slides = {}
+    for slide in slides:
+        keys = [slide_cache_key(slide, theme_type, theme_name, image_dpi, slide.image_filename in image_paths)]
+        if slide.image_filename in image_paths:
+            keys.append(prepared_image_key(slide.image_filename, image_dpi))
+        for key in keys:
+            cached = state.rendered_slides_cache.get(key)
+            if cached is not None:
+                cached_slides[key] = cached
+
+    with span("render"):
+        pptx_bytes, rendered = await state.render_stage.run(
+            render_presentation, slides, theme_type, theme_name, image_dpi, image_paths, cached_slides,
+        )
+    for key, rendered_bytes in rendered.items():
+        state.rendered_slides_cache.set(key, rendered_bytes)
+    metrics.DECKS_RENDERED.inc()
+    metrics.DECK_BYTES.inc(len(pptx_bytes))
+    return pptx_bytes
+
+
+async def retry_when_overloaded(run, retries: int):
+    """Awaits `run()`, waiting and retrying up to `retries` times if a stage is full."""
+    for attempt in range(retries + 1):
+        try:
+            return await run()
+        except StageOverloaded as e:
+            if attempt == retries:
+                raise
+            await asyncio.sleep(e.retry_after)
+
+
+# --- API Endpoints ---
+router = APIRouter()
+
+PAGES_DESCRIPTION = (
+    'Only convert these pages: 1-based ranges such as "1-5,8,12-", '
+    'or an outline section such as "toc:Executive Summary".'
+)
+TEXT_ONLY_DESCRIPTION = "Skip image extraction entirely."
+MAX_CHARS_DESCRIPTION = "Stop extracting text once this many characters have been read."
+
+
+@router.post("/api/generate-slide-content", response_model=SlideContent)
+async def generate_slide_content(file: UploadFile = File(...), detail_level: int = 2,
+                                 pages: Optional[str] = Query(None, description=PAGES_DESCRIPTION),
+                                 text_only: bool = Query(False, description=TEXT_ONLY_DESCRIPTION),
+                                 max_chars: Optional[int] = Query(None, ge=1, description=MAX_CHARS_DESCRIPTION),
+                                 state: AppState = Depends(get_state)):
+    options = ExtractionOptions(pages, text_only, max_chars)
+    upload = await receive_pdf(state, file)
+    try:
+        return await build_slide_content(state, upload, detail_level, lambda stage, progress: None, options)
+    except StageOverloaded as e:
+        raise overloaded_error(e)
+    except PageSelectionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        upload.remove()
+
+
+@router.post("/api/generate-slide-content/stream")
+async def stream_slide_content(file: UploadFile = File(...), detail_level: int = 2,
+                               pages: Optional[str] = Query(None, description=PAGES_DESCRIPTION),
+                               text_only: bool = Query(False, description=TEXT_ONLY_DESCRIPTION),
+                               max_chars: Optional[int] = Query(None, ge=1, description=MAX_CHARS_DESCRIPTION),
+                               state: AppState = Depends(get_state)):
+    """
+    Like /api/generate-slide-content, but streams the slides back as newline-delimited
+    JSON while Gemini is still writing them. Each line is one of:
+        {"type": "slide", "index": 0, "slide": {...}}
+        {"type": "error", "detail": "..."}           (a slide that was dropped)
+        {"type": "done", "count": 7}
+    """
+    options = ExtractionOptions(pages, text_only, max_chars)
+    upload = await receive_pdf(state, file)
+    try:
+        cached_slides = get_cached_slides(state, upload.sha256, detail_level, options)
+        if cached_slides is None:
+            pages, images = await state.extraction_stage.run(
+                get_or_extract_pdf, state, upload.path, upload.sha256, options
+            )
+            text = await prepare_slides_text(state, pages, detail_level)
+    except StageOverloaded as e:
+        raise overloaded_error(e)
+    except PageSelectionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        upload.remove()
+
+    def ndjson(message: dict) -> str:
+        return json.dumps(jsonable_encoder(message)) + "\n"
+
+    async def slide_stream():
+        if cached_slides is not None:
+            for index, slide in enumerate(cached_slides):
+                yield ndjson({"type": "slide", "index": index, "slide": slide})
+            yield ndjson({"type": "done", "count": len(cached_slides)})
+            return
+
+        # The Gemini stream is consumed on an LLM worker thread and handed over through a queue
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        end_of_stream = object()
+
+        def emit(item):
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+
+        async def produce():
+            try:
+                await state.llm_stage.run(
+                    stream_slides_with_gemini, state.llm_client, text, images, detail_level, emit
+                )
+            finally:
+                queue.put_nowait(end_of_stream)
+
+        producer = asyncio.create_task(produce())
+        slides = []
+        dropped = 0
+        try:
+            while True:
+                item = await queue.get()
+                if item is end_of_stream:
+                    break
+                if isinstance(item, Slide):
+                    yield ndjson({"type": "slide", "index": len(slides), "slide": item})
+                    slides.append(item)
+                else:
+                    dropped += 1
+                    print(f"Dropping malformed slide from Gemini stream: {item}")
+                    yield ndjson({"type": "error", "detail": str(item)})
+            await producer
+        except Exception as e:
+            print(f"An error occurred during Gemini content streaming: {e}")
+            yield ndjson({"type": "error", "detail": "Failed to generate content from AI.", "fatal": True})
+            return
+        finally:
+            producer.cancel()
+
+        # Only complete results are cached, so a retry can recover dropped slides
+        if slides and not dropped:
+            state.slides_cache.set(slides_cache_key(upload.sha256, detail_level, options), slides)
+        yield ndjson({"type": "done", "count": len(slides)})
+
+    return StreamingResponse(slide_stream(), media_type="application/x-ndjson")
+
+
+@router.post("/api/jobs", status_code=202)
+async def submit_slide_content_job(file: UploadFile = File(...), detail_level: int = Form(2),
+                                   pages: Optional[str] = Form(None, description=PAGES_DESCRIPTION),
+                                   text_only: bool = Form(False, description=TEXT_ONLY_DESCRIPTION),
+                                   max_chars: Optional[int] = Form(None, ge=1, description=MAX_CHARS_DESCRIPTION),
+                                   state: AppState = Depends(get_state)):
+    """
+    Queues a PDF for conversion and returns its job id straight away.
+    Progress is available from /api/jobs/{job_id}/events and the slides
+    from /api/jobs/{job_id}/result once the job has completed.
+    """
+    options = ExtractionOptions(pages, text_only, max_chars)
+    upload = await receive_pdf(state, file)
+    try:
+        job = state.job_manager.submit(
+            lambda report: run_slide_content_pipeline(state, upload, detail_level, report, options)
+        )
+    except JobQueueFull as e:
+        upload.remove()
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "10"})
+    return job.snapshot()
+
+
+def get_job_or_404(state: AppState, job_id: str):
+    job = state.job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/api/jobs/{job_id}")
+async def get_job_status(job_id: str, state: AppState = Depends(get_state)):
+    return get_job_or_404(state, job_id).snapshot()
+
+
+@router.get("/api/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, state: AppState = Depends(get_state)):
+    """Streams the job's status and per-stage progress as server-sent events."""
+    job = get_job_or_404(state, job_id)
+
+    async def event_stream():
+        async for snapshot in state.job_manager.events(job):
+            yield f"data: {json.dumps(snapshot)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 
+@router.get("/api/jobs/{job_id}/result", response_model=SlideContent)
+async def get_job_result(job_id: str, state: AppState = Depends(get_state)):
+    job = get_job_or_404(state, job_id)
+    if job.status == FAILED:
+        raise HTTPException(status_code=500, detail=job.error)
+    if job.status != COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Job is still {job.status}.")
+    return job.result
 
-@app.post("/api/generate-presentation")
-async def generate_presentation_endpoint(presentation_content: PresentationContent):
+
+@router.post("/api/generate-presentation")
+async def generate_presentation_endpoint(presentation_content: PresentationContent,
+                                         state: AppState = Depends(get_state)):
     """
     Receives slide content and a theme, creates a PowerPoint,
     and returns it as a downloadable file.
 
-    Cleans up the images used in the presentation
-    after it has been successfully generated.
+    The images used are kept in the image store and marked as recently used,
+    so the same slides can be rendered again with a different theme.
     """
     try:
-        # 1. Create the presentation in memory
-        pptx_file_stream = create_presentation(
-            slide_data=presentation_content.slides,
-            theme_type=presentation_content.theme_type,
-            theme_name=presentation_content.theme_name
+        # 1. Create the presentation in a render worker process
+        pptx_bytes = await render_deck(
+            state,
+            presentation_content.slides,
+            presentation_content.theme_type,
+            presentation_content.theme_name,
         )
 
-        # 2. After successful creation, clean up the used image files
-        print("Presentation created. Cleaning up used image files...")
-        for slide in presentation_content.slides:
-            if slide.image_filename:
-                image_path = os.path.join("extracted_images", slide.image_filename)
-                if os.path.exists(image_path):
-                    try:
-                        os.remove(image_path)
-                        print(f"Successfully deleted {image_path}")
-                    except OSError as e:
-                        # Log the error but don't fail the request
-                        print(f"Error deleting file {image_path}: {e}")
-
-        # 3. Return the generated presentation to the user
-        return StreamingResponse(
-            pptx_file_stream,
+        # 2. Return the generated presentation to the user. The deck is already in memory,
+        # and streaming a BytesIO would send it line by line, in thousands of tiny chunks.
+        return Response(
+            content=pptx_bytes,
             media_type="application/vnd.openxmlformats-officedocument.presentationml.presentation",
             headers={"Content-Disposition": "attachment; filename=presentation.pptx"}
         )
+    except StageOverloaded as e:
+        raise overloaded_error(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/images/{image_filename}")
-async def get_image(image_filename: str):
-    image_path = os.path.join("extracted_images", image_filename)
-    if os.path.exists(image_path):
-        return FileResponse(image_path)
-    raise HTTPException(status_code=404, detail="Image not found")
+@router.post("/api/batch")
+async def batch_convert(files: List[UploadFile] = File(...), detail_level: int = Form(2),
+                        themes: str = Form("color:corporate_blue"), state: AppState = Depends(get_state)):
+    """
+    Converts many PDFs, each rendered in one or more themes, and streams back a ZIP
+    of the decks in the order they finish. `themes` is a comma-separated list of
+    "type:name" entries, or "all". The archive ends with a manifest.json listing
+    every document and theme, including the ones that failed.
+    """
+    settings = state.settings
+    if len(files) > settings.batch_max_files:
+        raise HTTPException(status_code=400, detail=f"A batch can contain at most {settings.batch_max_files} files.")
+    try:
+        selected_themes = parse_themes(themes, THEMES)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Uploads are saved before streaming starts; invalid files become manifest entries
+    documents = []
+    manifest = []
+    for file in files:
+        try:
+            documents.append((file.filename or "document.pdf", await receive_pdf(state, file)))
+        except HTTPException as e:
+            for theme_type, theme_name in selected_themes:
+                manifest.append({
+                    "document": file.filename, "theme_type": theme_type, "theme_name": theme_name,
+                    "status": "failed", "error": e.detail,
+                })
+
+    async def convert_document(index: int, name: str, upload: StoredUpload, slots: asyncio.Semaphore,
+                               results: asyncio.Queue):
+        """Puts each of the document's decks (or errors) on `results`, then None once it is done."""
+        # The slot is held until every deck has been queued, and the queue is bounded, so
+        # a client that reads slowly pauses conversion instead of letting decks pile up
+        async with slots:
+            error = None
+            try:
+                content = await retry_when_overloaded(
+                    lambda: build_slide_content(state, upload, detail_level, lambda stage, progress: None),
+                    settings.batch_overload_retries,
+                )
+            except Exception as e:
+                error = str(e)
+            finally:
+                upload.remove()
+
+            for theme in selected_themes:
+                if error is not None:
+                    await results.put((name, theme, None, error))
+                    continue
+                try:
+                    pptx_bytes = await retry_when_overloaded(
+                        lambda: render_deck(state, content.slides, theme[0], theme[1]),
+                        settings.batch_overload_retries,
+                    )
+                except Exception as e:
+                    await results.put((name, theme, None, str(e)))
+                    continue
+                await results.put((name, theme, deck_filename(name, theme, index), pptx_bytes))
+        # Not in a finally block: a cancelled task must not wait for room in the queue
+        await results.put(None)
+
+    async def stream_archive():
+        archive = ZipStream()
+        concurrency = max(1, settings.batch_concurrency)
+        slots = asyncio.Semaphore(concurrency)
+        results: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+        tasks = [
+            asyncio.create_task(convert_document(index, name, upload, slots, results))
+            for index, (name, upload) in enumerate(documents)
+        ]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                result = await results.get()
+                if result is None:
+                    remaining -= 1
+                    continue
+                name, (theme_type, theme_name), filename, payload = result
+                item = {"document": name, "theme_type": theme_type, "theme_name": theme_name}
+                if filename is None:
+                    print(f"Batch item {name} ({theme_name}) failed: {payload}")
+                    manifest.append({**item, "status": "failed", "error": payload})
+                    continue
+                manifest.append({**item, "status": "completed", "file": filename})
+                yield archive.add(filename, payload)
+
+            yield archive.add("manifest.json", manifest_json(manifest))
+            yield archive.close()
+        finally:
+            # Stop outstanding work if the client disconnects
+            for task in tasks:
+                task.cancel()
+            for _, upload in documents:
+                upload.remove()
+
+    return StreamingResponse(
+        stream_archive(),
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=presentations.zip"},
+    )
+
+
+# Image names are content hashes, so a name always refers to the same bytes
+IMAGE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def load_thumbnail(image_path: str, width: int) -> bytes:
+    with open(image_path, "rb") as f:
+        return downsample_image(f.read(), width)
+
+
+@router.get("/images/{image_filename}")
+async def get_image(image_filename: str, request: Request,
+                    w: Optional[int] = Query(None, ge=1, description="Maximum width of a resized variant"),
+                    state: AppState = Depends(get_state)):
+    """
+    Serves an extracted image, or with `w` a variant no wider than `w` pixels
+    (rounded up to a supported thumbnail width). Variants are created on first
+    request and kept in a bounded cache. Responses carry a strong ETag.
+    """
+    image_path = state.image_store.local_path(image_filename)
+    if image_path is None or not os.path.exists(image_path):
+        raise HTTPException(status_code=404, detail="Image not found")
+    state.image_store.touch([image_filename])
+
+    image_hash = image_filename.split(".", 1)[0]
+    width = snap_thumbnail_width(w) if w is not None else None
+    etag = f'"{image_hash}-w{width}"' if width else f'"{image_hash}"'
+    headers = {"ETag": etag, "Cache-Control": IMAGE_CACHE_CONTROL}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    if width is None:
+        return FileResponse(image_path, headers=headers)
+
+    cache_key = f"{image_filename}:{width}"
+    thumbnail = state.thumbnail_cache.get(cache_key)
+    if thumbnail is None:
+        try:
+            thumbnail = await state.thumbnail_stage.run(load_thumbnail, image_path, width)
+        except StageOverloaded as e:
+            raise overloaded_error(e)
+        state.thumbnail_cache.set(cache_key, thumbnail)
+    return Response(content=thumbnail, media_type=image_media_type(thumbnail), headers=headers)
+
+
+@router.get("/api/cache/stats")
+async def cache_stats(state: AppState = Depends(get_state)):
+    return {
+        "extraction": state.extraction_cache.stats(),
+        "slides": state.slides_cache.stats(),
+        "summaries": state.summaries_cache.stats(),
+        "images": state.image_store.stats(),
+        "thumbnails": state.thumbnail_cache.stats(),
+        "rendered_slides": state.rendered_slides_cache.stats(),
+    }
+
 
+@router.get("/api/executors/stats")
+async def executor_stats(state: AppState = Depends(get_state)):
+    return {stage.name: stage.stats() for stage in state.stages}
 
-@app.get("/")
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Stage timings, counters and request latencies in the Prometheus text format."""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/")
 async def root():
-    return {"message": "Welcome to the PDF to Presentation API!"}
\ No newline at end of file
+    return {"message": "Welcome to the PDF to Presentation API!"}
+
+
+# --- Application Factory ---
+def create_app(settings: Optional[Settings] = None) -> FastAPI:
+    """
+    Builds the API from `settings`, read from the environment if not given.
+    Executors, caches and clients are created here rather than at import time,
+    and heavy libraries are only imported when first used (or by the warm-up).
+    """
+    settings = settings or Settings.from_env()
+    if not settings.google_api_key:
+        print("ERROR: GOOGLE_API_KEY environment variable not set.")
+
+    app = FastAPI(title="PDF to Presentation API", lifespan=lifespan)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-Profile-Id"],
+    )
+    app.middleware("http")(instrument_requests)
+    app.state.services = AppState(settings)
+    app.include_router(router)
+    return app
+
+
+def __getattr__(name: str):
+    # Keeps `uvicorn pdf_to_presentation.main:app` working: the default app is
+    # created on first access instead of as a side effect of importing this module
+    global app
+    if name == "app":
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,212 @@
+# metrics.py
+# Lightweight in-process instrumentation: counters and histograms rendered in
+# the Prometheus text format, timing spans around pipeline stages, and an opt-in
+# cProfile mode that profiles the blocking work done for a single request.
+#
+# Metrics live in the API process. Work done in worker processes is measured
+# from the API side (or reported back with the results), as each worker has
+# its own copy of this module.
+
+import contextvars
+import cProfile
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+# Covers quick cache hits up to multi-minute LLM calls on long documents
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+    def _samples(self):
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """A monotonically increasing count, such as pages extracted."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._label_values(labels), 0)
+
+    def _samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_number(value)}"
+
+
+class Histogram(_Metric):
+    """Observations bucketed by upper bound, such as stage durations in seconds."""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._counts: Dict[LabelValues, list] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * len(self.buckets))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            return sum(self._counts.get(self._label_values(labels), ()))
+
+    def _samples(self):
+        with self._lock:
+            snapshot = sorted((key, list(counts), self._sums[key]) for key, counts in self._counts.items())
+        for key, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = f'le="{_format_number(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_number(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered.")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Returns every metric in the Prometheus text exposition format."""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+# --- Application Metrics ---
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "pdf2ppt_stage_duration_seconds", "Time spent in each pipeline stage.", ["stage"]
+)
+STAGE_ERRORS = REGISTRY.counter(
+    "pdf2ppt_stage_errors_total", "Pipeline stage calls that raised an exception.", ["stage"]
+)
+EXECUTOR_QUEUE_SECONDS = REGISTRY.histogram(
+    "pdf2ppt_executor_queue_seconds", "Time calls waited for a slot on a bounded executor.", ["executor"]
+)
+EXECUTOR_REJECTIONS = REGISTRY.counter(
+    "pdf2ppt_executor_rejections_total", "Calls rejected because an executor was full.", ["executor"]
+)
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "pdf2ppt_http_request_duration_seconds", "HTTP request latency by route.", ["method", "route", "status"]
+)
+UPLOAD_BYTES = REGISTRY.counter("pdf2ppt_upload_bytes_total", "Bytes of PDF uploads received.")
+PAGES_EXTRACTED = REGISTRY.counter("pdf2ppt_pages_extracted_total", "Pages extracted from PDFs.")
+IMAGES_EXTRACTED = REGISTRY.counter("pdf2ppt_images_extracted_total", "Distinct images extracted from PDFs.")
+PROMPT_TOKENS = REGISTRY.counter(
+    "pdf2ppt_prompt_tokens_total", "Estimated tokens of document text sent to the LLM, by call.", ["call"]
+)
+SLIDES_GENERATED = REGISTRY.counter("pdf2ppt_slides_generated_total", "Slides generated by the LLM.")
+MALFORMED_SLIDES = REGISTRY.counter("pdf2ppt_malformed_slides_total", "Slides from the LLM that failed to parse.")
+DECKS_RENDERED = REGISTRY.counter("pdf2ppt_decks_rendered_total", "Presentations rendered.")
+DECK_BYTES = REGISTRY.counter("pdf2ppt_deck_bytes_total", "Bytes of rendered .pptx files.")
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Times the enclosed block as `stage`, counting it as an error if it raises."""
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage)
+
+
+# --- Profiling ---
+# Set for the duration of a profiled request; holds the path prefix for its profile dumps
+profile_prefix: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("profile_prefix", default=None)
+
+
+def run_profiled(dump_path: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Runs `fn` under cProfile and writes the stats to `dump_path`. Only one profiler
+    can be active per interpreter, so if another is running `fn` runs unprofiled.
+    Module-level so it can be sent to worker processes.
+    """
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        return fn(*args, **kwargs)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        profiler.disable()
+        os.makedirs(os.path.dirname(dump_path) or ".", exist_ok=True)
+        profiler.dump_stats(dump_path)
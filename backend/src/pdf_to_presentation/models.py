@@ -0,0 +1,23 @@
+# models.py
+# Pydantic models shared by the API endpoints and the rendering workers.
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+# --- Models ---
+class Slide(BaseModel):
+    title: str = Field(..., description="The title of the slide (maximum 10 words)")
+    bullets: Optional[List[str]] = Field(None, description="List of bullet points for the slide")
+    text_block: Optional[str] = Field(None, description="A block of text for the slide instead of bullet points")
+    image_filename: Optional[str] = Field(None, description="The filename of the image to be included in the slide")
+
+
+class SlideContent(BaseModel):
+    slides: List[Slide] = Field(..., description="List of slides for the presentation")
+
+
+class PresentationContent(BaseModel):
+    slides: List[Slide] = Field(..., description="List of slides for the presentation")
+    theme_type: Literal["color", "background"] = Field(..., description="The type of theme to apply.")
+    theme_name: str = Field(..., description="The name of the theme to apply (e.g., 'classic_dark', 'blue_gradient').")
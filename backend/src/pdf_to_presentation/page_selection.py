@@ -0,0 +1,74 @@
+# page_selection.py
+# Parses the `pages` option of the slide content endpoints, which limits a
+# conversion to part of a document: either page ranges such as "1-5,8,12-"
+# or an outline section such as "toc:Executive Summary".
+# Kept free of PyMuPDF so the parsing can be tested on its own.
+
+from typing import List, Sequence
+
+TOC_PREFIX = "toc:"
+
+
+class PageSelectionError(ValueError):
+    """Raised when a page selection is malformed or matches no pages."""
+
+
+def parse_page_ranges(spec: str, page_count: int) -> List[int]:
+    """
+    Returns the 0-based page numbers selected by a comma-separated list of
+    1-based, inclusive ranges: "3" (one page), "2-5", "10-" (to the last page)
+    or "-4" (from the first page). Pages are returned in order, without repeats.
+    """
+    selected = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, dash, last = part.partition("-")
+        try:
+            start = int(first) if first.strip() else 1
+            stop = (int(last) if last.strip() else page_count) if dash else start
+        except ValueError:
+            raise PageSelectionError(f"Invalid page range '{part}'.")
+        if start < 1 or stop < start:
+            raise PageSelectionError(f"Invalid page range '{part}'.")
+        if start > page_count:
+            raise PageSelectionError(f"Page {start} is out of range; the document has {page_count} pages.")
+        selected.update(range(start - 1, min(stop, page_count)))
+    if not selected:
+        raise PageSelectionError("The page selection is empty.")
+    return sorted(selected)
+
+
+def section_pages(toc: Sequence[Sequence], title: str, page_count: int) -> List[int]:
+    """
+    Returns the 0-based page numbers of the first outline entry whose title
+    contains `title` (ignoring case). A section runs from its entry's page up to
+    the page before the next entry at the same or a higher level, or to the end
+    of the document. `toc` is in PyMuPDF's get_toc() form: [level, title, page].
+    """
+    wanted = title.strip().lower()
+    if not wanted:
+        raise PageSelectionError("No section title was given.")
+    for index, (level, entry_title, page) in enumerate(toc):
+        if wanted not in entry_title.lower() or page < 1:
+            continue
+        stop = page_count
+        for next_level, _, next_page in toc[index + 1:]:
+            if next_level <= level and next_page >= 1:
+                # Sections that start on the same page still get that page
+                stop = max(page, next_page - 1)
+                break
+        return list(range(page - 1, min(stop, page_count)))
+    raise PageSelectionError(f"No section matching '{title.strip()}' was found in the document outline.")
+
+
+def is_toc_selection(spec: str) -> bool:
+    return spec.strip().lower().startswith(TOC_PREFIX)
+
+
+def select_pages(spec: str, page_count: int, toc: Sequence[Sequence] = ()) -> List[int]:
+    """Resolves a page selection, either ranges or "toc:<section title>", to 0-based page numbers."""
+    if is_toc_selection(spec):
+        return section_pages(toc, spec.strip()[len(TOC_PREFIX):], page_count)
+    return parse_page_ranges(spec, page_count)
@@ -0,0 +1,337 @@
+# pdf_extraction.py
+# Text and image extraction from uploaded PDFs.
+# This lives in its own module so that worker processes can import it without
+# creating the FastAPI app or configuring the Gemini client. PyMuPDF is imported
+# on first use, so importing this module stays cheap for the API process.
+
+import hashlib
+import os
+import tempfile
+import time
+from concurrent.futures import Executor
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Union
+
+if TYPE_CHECKING:
+    import fitz  # PyMuPDF
+
+from .executors import process_pool
+from .image_store import ImageWriter, LocalImageWriter
+from .page_selection import is_toc_selection, select_pages
+from .word_index import WordIndex
+
+# Documents shorter than this are never split, as the cost of starting a worker
+# and re-opening the document outweighs the per-page work.
+MIN_PAGES_PER_SHARD = 8
+
+# Extra space, in PDF points, searched around each image for context text such as captions
+DEFAULT_CONTEXT_MARGIN = 0.0
+
+
+def _open_document(pdf_source: Union[bytes, str]) -> "fitz.Document":
+    """Opens a PDF from a file path (read lazily by PyMuPDF) or from in-memory bytes."""
+    import fitz
+    if isinstance(pdf_source, str):
+        return fitz.open(pdf_source, filetype="pdf")
+    return fitz.open(stream=pdf_source, filetype="pdf")
+
+
+def _encode_image(doc: "fitz.Document", xref: int, smask_xref: int, page_num: int) -> tuple[bytes, str]:
+    """
+    Returns the bytes and file extension of an embedded image.
+
+    JPEG streams without a soft mask are passed through untouched; everything else
+    is decoded to a pixmap and re-encoded as PNG.
+    """
+    import fitz
+
+    if smask_xref == 0:
+        info = doc.extract_image(xref)
+        # Only gray and RGB JPEGs are passed through, as CMYK ones render inconsistently
+        if info and info.get("ext") == "jpeg" and info.get("colorspace") in (1, 3):
+            return info["image"], "jpg"
+
+    # --- START: Definitive Image Processing Logic ---
+    # If there's a soft mask, we need to recombine it with the base image
+    if smask_xref > 0:
+        try:
+            print(f"Recombining transparent image on page {page_num + 1} with its mask.")
+            # Get the base image pixmap
+            base_pix = fitz.Pixmap(doc, xref)
+            # Get the mask pixmap
+            mask_pix = fitz.Pixmap(doc, smask_xref)
+
+            # Create a new pixmap by combining the base and the mask
+            final_pix = fitz.Pixmap(base_pix, mask_pix)
+
+            # If the base was not RGBA, convert it before cleaning up
+            if base_pix.alpha == 0:
+                base_pix = fitz.Pixmap(fitz.csRGB, base_pix)
+
+            # Clean up intermediate pixmaps
+            base_pix = None
+            mask_pix = None
+
+        except Exception as e:
+            print(f"Error combining pixmaps: {e}, falling back to base image.")
+            final_pix = fitz.Pixmap(doc, xref)  # Fallback
+    else:
+        # No mask, just get the image directly
+        final_pix = fitz.Pixmap(doc, xref)
+
+    # Now, convert the final pixmap (which has correct transparency) to bytes
+    image_bytes = final_pix.tobytes("png")
+    final_pix = None  # Clean up
+    # --- END: Definitive Image Processing Logic ---
+    return image_bytes, "png"
+
+
+def _extract_pages(doc: "fitz.Document", page_numbers: Sequence[int], image_writer: ImageWriter,
+                   context_margin: float, timings: Dict[str, float], include_images: bool = True,
+                   max_chars: Optional[int] = None) -> tuple[List[str], List[dict]]:
+    """
+    Extracts the text of each of the given pages of an open document, and their images.
+
+    Each distinct image is extracted once: repeated xrefs (e.g. a logo on every
+    page) are skipped before decoding, and different xrefs with identical content
+    are collapsed by hash. Seconds spent on text and on encoding and storing
+    images are added to `timings` under "text" and "images".
+
+    Without `include_images` no image is decoded at all. With `max_chars`, the text
+    is cut off at that many characters and no further pages are read.
+    """
+    timings.setdefault("text", 0.0)
+    timings.setdefault("images", 0.0)
+    text_parts = []
+    images = []
+    images_by_xref: Dict[int, dict] = {}
+    images_by_hash: Dict[str, dict] = {}
+    chars = 0
+    for page_num in page_numbers:
+        page = doc[page_num]
+        started = time.perf_counter()
+        text = page.get_text()
+        if max_chars is not None and chars + len(text) >= max_chars:
+            text = text[:max_chars - chars]
+        text_parts.append(text)
+        chars += len(text)
+        timings["text"] += time.perf_counter() - started
+        budget_reached = max_chars is not None and chars >= max_chars
+
+        page_images = page.get_images(full=True) if include_images else []
+        if not page_images:
+            if budget_reached:
+                break
+            continue
+        # Index the page's words once and look up each image's context by bbox
+        word_index = WordIndex(page.get_text("words"))
+
+        for img_info in page_images:
+            xref = img_info[0]
+            smask_xref = img_info[1]  # XREF for the soft mask image
+
+            image = images_by_xref.get(xref)
+            if image is None:
+                started = time.perf_counter()
+                image_bytes, image_ext = _encode_image(doc, xref, smask_xref, page_num)
+                image_hash = hashlib.sha256(image_bytes).hexdigest()
+
+                image = images_by_hash.get(image_hash)
+                if image is None:
+                    image_filename = image_writer.write(image_bytes, image_hash, image_ext)
+                    image = {"filename": image_filename, "context": "", "sha256": image_hash}
+                    images_by_hash[image_hash] = image
+                    images.append(image)
+                images_by_xref[xref] = image
+                timings["images"] += time.perf_counter() - started
+
+            # Keep the first non-empty context seen for a repeated image
+            if not image["context"]:
+                img_bbox = page.get_image_bbox(img_info)
+                image["context"] = " ".join(word_index.query(tuple(img_bbox), margin=context_margin))
+
+        # The last page's images are still included, as its text may refer to them
+        if budget_reached:
+            break
+
+    return text_parts, images
+
+
+def _merge_duplicate_images(images: List[dict]) -> List[dict]:
+    """
+    Drops images already extracted by an earlier shard. Images are stored by content,
+    so the duplicates share a file with the first copy and nothing needs deleting.
+    """
+    merged = []
+    seen: Dict[str, dict] = {}
+    for image in images:
+        first = seen.get(image["sha256"])
+        if first is None:
+            seen[image["sha256"]] = image
+            merged.append(image)
+            continue
+        if not first["context"]:
+            first["context"] = image["context"]
+    return merged
+
+
+def _extract_page_shard(pdf_path: str, page_numbers: Sequence[int], image_writer: ImageWriter,
+                        context_margin: float, include_images: bool,
+                        max_chars: Optional[int]) -> tuple[List[str], List[dict], Dict[str, float]]:
+    """Worker entry point: opens the shared PDF file and extracts the given pages."""
+    timings: Dict[str, float] = {}
+    with _open_document(pdf_path) as doc:
+        pages, images = _extract_pages(
+            doc, page_numbers, image_writer, context_margin, timings, include_images, max_chars
+        )
+    return pages, images, timings
+
+
+def _select_page_numbers(doc: "fitz.Document", page_selection: Optional[str]) -> List[int]:
+    """The 0-based pages to extract; the outline is only read for a "toc:" selection."""
+    if page_selection is None:
+        return list(range(doc.page_count))
+    toc = doc.get_toc() if is_toc_selection(page_selection) else ()
+    return select_pages(page_selection, doc.page_count, toc)
+
+
+def _report_extraction(pages: List[str], images: List[dict]) -> None:
+    print(f"Successfully extracted {sum(len(p) for p in pages)} characters from {len(pages)} pages and {len(images)} images.")
+
+
+def shard_page_ranges(page_count: int, workers: int,
+                      min_pages_per_shard: int = MIN_PAGES_PER_SHARD) -> List[tuple[int, int]]:
+    """
+    Splits [0, page_count) into at most `workers` contiguous, near-equal ranges,
+    each covering at least `min_pages_per_shard` pages where possible.
+    """
+    if page_count <= 0:
+        return []
+    shard_count = max(1, min(workers, page_count // max(1, min_pages_per_shard)))
+    base, remainder = divmod(page_count, shard_count)
+
+    ranges = []
+    start = 0
+    for i in range(shard_count):
+        stop = start + base + (1 if i < remainder else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def extract_pages_and_images_from_pdf(pdf_source: Union[bytes, str], workers: int = 1,
+                                      executor: Optional[Executor] = None,
+                                      image_writer: Optional[ImageWriter] = None,
+                                      context_margin: float = DEFAULT_CONTEXT_MARGIN,
+                                      timings: Optional[Dict[str, float]] = None,
+                                      page_selection: Optional[str] = None, include_images: bool = True,
+                                      max_chars: Optional[int] = None) -> tuple[List[str], List[dict]]:
+    """
+    Extracts the text of every page and all embedded images from a PDF, given either as a
+    file path or as bytes. Prefer a path for large uploads: the document is then
+    never held in memory as a whole.
+
+    `page_selection` limits extraction to some pages, either ranges such as "1-5,8"
+    or an outline section such as "toc:Introduction" (see page_selection.py), and
+    raises PageSelectionError if it is invalid. Only the selected pages are read, so
+    a short section of a long document costs about as much as a short document.
+    Without `include_images`, images are not decoded and none are returned. With
+    `max_chars`, extraction stops once that much text has been read; the pages
+    are then extracted as a single shard, in order, so that it can stop early.
+
+    With `workers` > 1 the pages are split into contiguous ranges that are processed
+    in parallel by a process pool (`executor`, or a temporary pool if none is given).
+    Each worker opens the document from the same file, and the results are
+    merged in page order, so the output matches the serial path. When an `executor`
+    is given, even a single range is extracted on it rather than in this process.
+
+    Images are stored through `image_writer` (by default, files under extracted_images)
+    and named by their content hash. The context of each image is the text of the
+    words overlapping its bbox, grown by `context_margin` points so that nearby
+    captions are included.
+
+    If `timings` is given, the seconds spent extracting text and images (summed
+    over all workers) are added to it under "text" and "images".
+    """
+    if image_writer is None:
+        image_writer = LocalImageWriter()
+    if timings is None:
+        timings = {}
+
+    if workers <= 1 and executor is None:
+        with _open_document(pdf_source) as doc:
+            page_numbers = _select_page_numbers(doc, page_selection)
+            pages, images = _extract_pages(
+                doc, page_numbers, image_writer, context_margin, timings, include_images, max_chars
+            )
+        _report_extraction(pages, images)
+        return pages, images
+
+    # Workers need a file to open, so in-memory documents are written to a temporary one
+    tmp_path = None
+    if isinstance(pdf_source, str):
+        pdf_path = pdf_source
+    else:
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp_file:
+            tmp_file.write(pdf_source)
+            pdf_path = tmp_path = tmp_file.name
+
+    own_executor = None
+    try:
+        with _open_document(pdf_path) as doc:
+            page_numbers = _select_page_numbers(doc, page_selection)
+            # A character budget can only stop early if the pages are read in order
+            shard_workers = 1 if max_chars is not None else max(1, workers)
+            page_ranges = shard_page_ranges(len(page_numbers), shard_workers)
+            if executor is None and len(page_ranges) <= 1:
+                pages, images = _extract_pages(
+                    doc, page_numbers, image_writer, context_margin, timings, include_images, max_chars
+                )
+                _report_extraction(pages, images)
+                return pages, images
+
+        if executor is None:
+            executor = own_executor = process_pool(len(page_ranges))
+
+        if len(page_ranges) > 1:
+            print(f"Extracting {len(page_numbers)} pages in {len(page_ranges)} parallel shards.")
+        futures = [
+            executor.submit(
+                _extract_page_shard, pdf_path, page_numbers[start:stop], image_writer, context_margin,
+                include_images, max_chars,
+            )
+            for start, stop in page_ranges
+        ]
+        results = [future.result() for future in futures]
+    finally:
+        if own_executor is not None:
+            own_executor.shutdown()
+        if tmp_path is not None:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    pages = [page for shard_pages, _, _ in results for page in shard_pages]
+    images = _merge_duplicate_images([image for _, shard_images, _ in results for image in shard_images])
+    for _, _, shard_timings in results:
+        for key, seconds in shard_timings.items():
+            timings[key] = timings.get(key, 0.0) + seconds
+    _report_extraction(pages, images)
+    return pages, images
+
+
+def extract_text_and_images_from_pdf(pdf_source: Union[bytes, str], workers: int = 1,
+                                     executor: Optional[Executor] = None,
+                                     image_writer: Optional[ImageWriter] = None,
+                                     context_margin: float = DEFAULT_CONTEXT_MARGIN,
+                                     page_selection: Optional[str] = None, include_images: bool = True,
+                                     max_chars: Optional[int] = None) -> tuple[str, List[dict]]:
+    """
+    Extracts the full text and all embedded images from a PDF.
+    See extract_pages_and_images_from_pdf for the options.
+    """
+    pages, images = extract_pages_and_images_from_pdf(
+        pdf_source, workers=workers, executor=executor, image_writer=image_writer, context_margin=context_margin,
+        page_selection=page_selection, include_images=include_images, max_chars=max_chars,
+    )
+    return "".join(pages), images
@@ -0,0 +1,305 @@
+# presentation.py
+# Builds PowerPoint decks from slide content using python-pptx.
+# Kept free of FastAPI and Gemini imports so it can run in worker processes.
+import functools
+import io
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+from lxml import etree
+from pptx import Presentation
+from pptx.dml.color import RGBColor
+from pptx.enum.text import MSO_AUTO_SIZE
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls, qn
+from pptx.util import Inches, Pt
+
+from .cache import content_hash
+from .image_prep import DEFAULT_TARGET_DPI, prepare_image
+from .image_store import DEFAULT_IMAGE_DIR, shard_path
+from .models import Slide
+from .theme_config import THEMES
+
+
+BACKGROUNDS_DIR = os.path.join(os.path.dirname(__file__), "backgrounds")
+
+# Slide images are placed on the right-hand side at this fixed width
+IMAGE_DISPLAY_WIDTH_INCHES = 7.25
+
+# Indexes into the default template's slide layouts
+BULLETS_LAYOUT_INDEX = 1  # Title and content
+TITLE_ONLY_LAYOUT_INDEX = 5  # For text blocks and title-only slides
+
+
+def find_theme(theme_type: str, theme_name: str) -> Optional[dict]:
+    return THEMES.get((theme_type, theme_name))
+
+
+def set_master_background_image(master, image_path):
+    """Fills the slide master's background with a picture, which every slide then inherits."""
+    _, rId = master.part.get_or_add_image_part(image_path)
+    bg = parse_xml(
+        f'<p:bg {nsdecls("p", "a", "r")}><p:bgPr>'
+        f'<a:blipFill dpi="0" rotWithShape="1"><a:blip r:embed="{rId}"/><a:srcRect/>'
+        f'<a:stretch><a:fillRect/></a:stretch></a:blipFill><a:effectLst/>'
+        f'</p:bgPr></p:bg>'
+    )
+    cSld = master._element.cSld
+    existing_bg = cSld.find(qn("p:bg"))
+    if existing_bg is not None:
+        cSld.remove(existing_bg)
+    cSld.insert(0, bg)
+
+
+@functools.lru_cache(maxsize=None)
+def build_theme_template(theme_type: str, theme_name: str) -> bytes:
+    """
+    Builds an empty, styled deck for a theme (unstyled if it does not exist) and
+    returns it as .pptx bytes. Cached per process; every deck is cloned from it.
+    """
+    prs = Presentation()
+    prs.slide_width = Inches(16)
+    prs.slide_height = Inches(9)
+
+    theme = find_theme(theme_type, theme_name)
+    master = prs.slide_master
+    if theme:
+        if theme_type == "color":
+            fill = master.background.fill
+            fill.solid()
+            fill.fore_color.rgb = RGBColor.from_string(theme["primaryColor"])
+            for shape in master.placeholders:
+                if shape.has_text_frame:
+                    shape.text_frame.paragraphs[0].font.color.rgb = RGBColor.from_string(theme["textColor"])
+        elif theme_type == "background":
+            for shape in master.placeholders:
+                if shape.has_text_frame:
+                    shape.text_frame.paragraphs[0].font.color.rgb = RGBColor.from_string(theme["textColor"])
+
+            # The background lives on the master, so it is stored once per deck
+            image_path = os.path.join(BACKGROUNDS_DIR, theme["image_filename"])
+            if os.path.exists(image_path):
+                set_master_background_image(master, image_path)
+            else:
+                print(f"Warning: Background image not found at {image_path}")
+
+    template_stream = io.BytesIO()
+    prs.save(template_stream)
+    return template_stream.getvalue()
+
+
+def preload_theme_templates() -> None:
+    """Builds the template of every configured theme ahead of the first request."""
+    for theme_type, theme_name in THEMES:
+        build_theme_template(theme_type, theme_name)
+
+
+def calculate_font_size(text_length: int, min_font=14, max_font=28, min_chars=100, max_chars=500) -> int:
+    """Calculates a dynamic font size based on text length."""
+    if text_length < min_chars:
+        return max_font
+    if text_length > max_chars:
+        return min_font
+
+    # Linear interpolation between max and min font size
+    slope = (min_font - max_font) / (max_chars - min_chars)
+    font_size = max_font + slope * (text_length - min_chars)
+
+    return int(font_size)
+
+
+def _build_slide(prs, slide_info: Slide, theme: Optional[dict], theme_type: str,
+                 image_bytes: Optional[bytes]):
+    """Adds one slide to `prs`, laying out its title, body and image from scratch."""
+    has_image = bool(slide_info.image_filename)
+    title_and_content_layout = prs.slide_layouts[BULLETS_LAYOUT_INDEX]
+    title_only_layout = prs.slide_layouts[TITLE_ONLY_LAYOUT_INDEX]
+
+    if slide_info.bullets:
+        slide = prs.slides.add_slide(title_and_content_layout)
+        title_shape = slide.shapes.title
+        body_shape = slide.placeholders[1]
+
+        # Resize body placeholder if there is an image
+        if has_image:
+            body_shape.width = Inches(7.5)
+            body_shape.top = Inches(1.5)
+            body_shape.left = Inches(0.5)
+
+
+        # Populate bullets
+        tf = body_shape.text_frame
+        tf.clear()
+
+        total_chars = sum(len(s) for s in slide_info.bullets)
+        font_size = calculate_font_size(total_chars)
+
+        for bullet_text in slide_info.bullets:
+            p = tf.add_paragraph()
+            p.text = bullet_text
+            p.font.size = Pt(font_size)
+            p.level = 0
+        tf.auto_size = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
+
+    elif slide_info.text_block:
+        slide = prs.slides.add_slide(title_only_layout)
+        title_shape = slide.shapes.title
+
+        # Define dimensions for the text box
+        left = Inches(0.5)
+        top = Inches(1.5)
+        height = Inches(7.0)
+        # Adjust width if there is an image
+        width = Inches(7.5) if has_image else Inches(15)
+
+        # Add and populate the text box
+        txBox = slide.shapes.add_textbox(left, top, width, height)
+        tf = txBox.text_frame
+        p = tf.paragraphs[0]
+        p.text = slide_info.text_block
+
+        font_size = calculate_font_size(len(slide_info.text_block))
+        p.font.size = Pt(font_size)
+
+        tf.auto_size = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
+        tf.word_wrap = True
+
+    else:  # Title only slide
+        slide = prs.slides.add_slide(title_only_layout)
+        title_shape = slide.shapes.title
+
+    # --- Set Title ---
+    if title_shape:
+        title_shape.text = slide_info.title
+        if theme:
+            if theme_type == "color":
+                title_shape.text_frame.paragraphs[0].font.color.rgb = RGBColor.from_string(theme["secondaryColor"])
+            elif theme_type == "background":
+                title_shape.text_frame.paragraphs[0].font.color.rgb = RGBColor.from_string(theme["titleColor"])
+
+    # --- Add Image (if it exists) ---
+    if image_bytes:
+        # Place image on the right side of the slide
+        slide.shapes.add_picture(
+            io.BytesIO(image_bytes), Inches(8.25), Inches(1.5), width=Inches(IMAGE_DISPLAY_WIDTH_INCHES)
+        )
+    return slide
+
+
+def slide_cache_key(slide_info: Slide, theme_type: str, theme_name: str, image_dpi: int,
+                    has_image: bool) -> str:
+    """The key of a slide's shapes in a slide cache (see create_presentation)."""
+    # Image names are content hashes, so the name stands in for the image itself;
+    # whether the image could be loaded is part of the key as it changes the shapes
+    content = json.dumps([
+        slide_info.title, slide_info.bullets, slide_info.text_block, slide_info.image_filename,
+        theme_type, theme_name, image_dpi, has_image,
+    ])
+    return content_hash(content.encode("utf-8"))
+
+
+def prepared_image_key(image_filename: str, image_dpi: int) -> str:
+    """The key of an image prepared for display in a slide cache (see create_presentation)."""
+    return f"image:{image_filename}:{image_dpi}"
+
+
+def _restore_slide(prs, slide_info: Slide, shapes_xml: bytes, image_bytes: Optional[bytes]):
+    """Adds a slide to `prs` whose shapes are copied from a previously rendered slide."""
+    layout_index = BULLETS_LAYOUT_INDEX if slide_info.bullets else TITLE_ONLY_LAYOUT_INDEX
+    slide = prs.slides.add_slide(prs.slide_layouts[layout_index])
+    sp_tree = slide.shapes._spTree
+    cached_tree = parse_xml(shapes_xml)
+    sp_tree.getparent().replace(sp_tree, cached_tree)
+
+    if image_bytes:
+        # The picture's relationship ID belongs to the old slide; point it at this slide's image part
+        _, rId = slide.part.get_or_add_image_part(io.BytesIO(image_bytes))
+        for blip in cached_tree.iter(qn("a:blip")):
+            blip.set(qn("r:embed"), rId)
+    return slide
+
+
+def create_presentation(slide_data: List[Slide], theme_type: str, theme_name: str,
+                        image_dpi: int = DEFAULT_TARGET_DPI,
+                        image_paths: Optional[Dict[str, str]] = None,
+                        slide_cache: Optional[Dict[str, bytes]] = None) -> io.BytesIO:
+    """
+    Creates a PowerPoint presentation from structured data using a predefined theme.
+    This version uses specific layouts for bullets vs. text_blocks and dynamically
+    resizes content placeholders to prevent overlap with images.
+    Images are downsampled to their display size at `image_dpi` before embedding.
+    `image_paths` maps image filenames to files on disk; without it, images are
+    looked up in the default image store directory.
+
+    `slide_cache` maps slide_cache_key() to the shape XML of slides rendered before,
+    and prepared_image_key() to their downsampled images. Slides found there are
+    copied instead of laid out again, and the other slides and images are added to
+    it, so re-exporting an edited deck with the same cache only lays out the changed
+    slides and prepares no image twice.
+    """
+    print(f"Creating presentation with new plan: '{theme_name}' (type: {theme_type})")
+
+    # --- Clone the Themed Template ---
+    theme = find_theme(theme_type, theme_name)
+    if theme:
+        template = build_theme_template(theme_type, theme_name)
+    else:
+        print(f"Warning: Theme '{theme_name}' not found.")
+        template = build_theme_template("", "")  # Unthemed; keeps the cache bounded
+    prs = Presentation(io.BytesIO(template))
+
+    # --- Create Slides ---
+    reused = 0
+    for slide_info in slide_data:
+        image_bytes = None
+        if slide_info.image_filename:
+            if image_paths is None:
+                image_path = shard_path(DEFAULT_IMAGE_DIR, slide_info.image_filename)
+            else:
+                image_path = image_paths.get(slide_info.image_filename)
+            if image_path and os.path.exists(image_path):
+                image_key = prepared_image_key(slide_info.image_filename, image_dpi)
+                image_bytes = slide_cache.get(image_key) if slide_cache is not None else None
+                if image_bytes is None:
+                    image_bytes = prepare_image(image_path, IMAGE_DISPLAY_WIDTH_INCHES, image_dpi)
+                    if image_bytes is not None and slide_cache is not None:
+                        slide_cache[image_key] = image_bytes
+
+        if slide_cache is None:
+            _build_slide(prs, slide_info, theme, theme_type, image_bytes)
+            continue
+
+        cache_key = slide_cache_key(slide_info, theme_type, theme_name, image_dpi, image_bytes is not None)
+        shapes_xml = slide_cache.get(cache_key)
+        if shapes_xml is not None:
+            _restore_slide(prs, slide_info, shapes_xml, image_bytes)
+            reused += 1
+            continue
+
+        slide = _build_slide(prs, slide_info, theme, theme_type, image_bytes)
+        slide_cache[cache_key] = etree.tostring(slide.shapes._spTree)
+
+    if reused:
+        print(f"Reused {reused} of {len(slide_data)} slides from the slide cache.")
+
+    pptx_stream = io.BytesIO()
+    prs.save(pptx_stream)
+    pptx_stream.seek(0)
+    return pptx_stream
+
+
+def render_presentation(slide_data: List[Slide], theme_type: str, theme_name: str,
+                        image_dpi: int = DEFAULT_TARGET_DPI,
+                        image_paths: Optional[Dict[str, str]] = None,
+                        cached_slides: Optional[Dict[str, bytes]] = None) -> Tuple[bytes, Dict[str, bytes]]:
+    """
+    Process-pool entry point: renders a deck and returns the .pptx file contents,
+    along with the slide shapes and prepared images that were not in `cached_slides`. The slide
+    cache is kept by the caller, so reuse does not depend on which worker renders.
+    """
+    cached_slides = cached_slides or {}
+    slide_cache = dict(cached_slides)
+    pptx_stream = create_presentation(slide_data, theme_type, theme_name, image_dpi, image_paths, slide_cache)
+    rendered = {key: shapes_xml for key, shapes_xml in slide_cache.items() if key not in cached_slides}
+    return pptx_stream.getvalue(), rendered
@@ -0,0 +1,144 @@
+# settings.py
+# Every setting the API reads from the environment, gathered in one place so an
+# app can be created with explicit settings (in tests, benchmarks or embedding
+# servers) instead of relying on import-time globals.
+
+import os
+from dataclasses import dataclass
+from typing import Mapping, Optional
+
+MB = 1024 * 1024
+
+
+def _flag(value: str) -> bool:
+    return value.lower() in ("1", "true", "yes")
+
+
+@dataclass(frozen=True)
+class Settings:
+    google_api_key: Optional[str] = None
+
+    # --- Uploads ---
+    max_upload_bytes: int = 200 * MB
+
+    # --- Executors ---
+    extraction_concurrency: int = 2
+    llm_concurrency: int = 8
+    render_concurrency: int = 2
+    thumbnail_concurrency: int = 4
+    stage_max_queue: int = 16
+    stage_queue_timeout: float = 30.0
+    pdf_extraction_workers: int = 1
+    image_context_margin: float = 0.0
+    render_image_dpi: int = 150
+
+    # --- LLM Client ---
+    llm_model: str = "gemini-1.5-flash"
+    llm_requests_per_minute: Optional[float] = None
+    llm_tokens_per_minute: Optional[float] = None
+    llm_max_rate_wait: float = 30.0
+    llm_timeout: float = 120.0
+    llm_max_retries: int = 3
+    llm_hedge_after: Optional[float] = None
+
+    # --- Caching ---
+    cache_dir: str = "cache"
+    cache_max_entries: int = 128
+    cache_max_disk_bytes: int = 256 * MB
+    thumbnail_cache_entries: int = 1024
+    thumbnail_cache_max_bytes: int = 64 * MB
+
+    # --- Image Store ---
+    image_store_dir: str = "extracted_images"
+    image_store_max_bytes: int = 1024 * MB
+    image_ttl_seconds: float = 86400.0
+    image_sweep_interval_seconds: float = 300.0
+
+    # --- Instrumentation ---
+    profiling_enabled: bool = False
+    profile_dir: str = "profiles"
+
+    # --- Background Jobs ---
+    job_workers: int = 2
+    job_max_pending: int = 32
+    job_result_ttl: float = 3600.0
+
+    # --- Batch Conversion ---
+    batch_max_files: int = 50
+    batch_concurrency: int = 2
+    batch_overload_retries: int = 5
+
+    # --- Chunked Summarization ---
+    chunked_summary_threshold_tokens: int = 30000
+    chunk_token_budget: int = 8000
+    chunk_parallelism: int = 4
+    condense_token_budget: int = 16000
+
+    # --- Startup ---
+    warm_up: bool = False
+
+    @classmethod
+    def from_env(cls, environ: Optional[Mapping[str, str]] = None) -> "Settings":
+        """
+        Reads settings from `environ`, or from the process environment (after
+        loading any .env file) if none is given. Unset variables keep their defaults.
+        """
+        if environ is None:
+            from dotenv import load_dotenv
+            load_dotenv()
+            environ = os.environ
+        default = cls()
+
+        def get(name: str, fallback):
+            return environ.get(name, str(fallback))
+
+        def optional_rate(name: str) -> Optional[float]:
+            # 0 (the default) disables the limit
+            return float(environ.get(name, "0")) or None
+
+        return cls(
+            google_api_key=environ.get("GOOGLE_API_KEY") or None,
+            max_upload_bytes=int(get("MAX_UPLOAD_MB", 200)) * MB,
+            extraction_concurrency=int(get("EXTRACTION_CONCURRENCY", default.extraction_concurrency)),
+            llm_concurrency=int(get("LLM_CONCURRENCY", default.llm_concurrency)),
+            render_concurrency=int(get("RENDER_CONCURRENCY", default.render_concurrency)),
+            thumbnail_concurrency=int(get("THUMBNAIL_CONCURRENCY", default.thumbnail_concurrency)),
+            stage_max_queue=int(get("STAGE_MAX_QUEUE", default.stage_max_queue)),
+            stage_queue_timeout=float(get("STAGE_QUEUE_TIMEOUT_SECONDS", default.stage_queue_timeout)),
+            pdf_extraction_workers=int(get("PDF_EXTRACTION_WORKERS", default.pdf_extraction_workers)),
+            image_context_margin=float(get("IMAGE_CONTEXT_MARGIN", default.image_context_margin)),
+            render_image_dpi=int(get("RENDER_IMAGE_DPI", default.render_image_dpi)),
+            llm_model=get("LLM_MODEL", default.llm_model),
+            llm_requests_per_minute=optional_rate("LLM_REQUESTS_PER_MINUTE"),
+            llm_tokens_per_minute=optional_rate("LLM_TOKENS_PER_MINUTE"),
+            llm_max_rate_wait=float(get("LLM_MAX_RATE_WAIT_SECONDS", default.llm_max_rate_wait)),
+            llm_timeout=float(get("LLM_TIMEOUT_SECONDS", default.llm_timeout)),
+            llm_max_retries=int(get("LLM_MAX_RETRIES", default.llm_max_retries)),
+            llm_hedge_after=optional_rate("LLM_HEDGE_AFTER_SECONDS"),
+            cache_dir=get("CACHE_DIR", default.cache_dir),
+            cache_max_entries=int(get("CACHE_MAX_ENTRIES", default.cache_max_entries)),
+            cache_max_disk_bytes=int(get("CACHE_MAX_DISK_MB", 256)) * MB,
+            thumbnail_cache_entries=int(get("THUMBNAIL_CACHE_ENTRIES", default.thumbnail_cache_entries)),
+            thumbnail_cache_max_bytes=int(get("THUMBNAIL_CACHE_MAX_MB", 64)) * MB,
+            image_store_dir=get("IMAGE_STORE_DIR", default.image_store_dir),
+            image_store_max_bytes=int(get("IMAGE_STORE_MAX_MB", 1024)) * MB,
+            image_ttl_seconds=float(get("IMAGE_TTL_SECONDS", default.image_ttl_seconds)),
+            image_sweep_interval_seconds=float(
+                get("IMAGE_SWEEP_INTERVAL_SECONDS", default.image_sweep_interval_seconds)
+            ),
+            profiling_enabled=_flag(environ.get("PROFILING_ENABLED", "")),
+            profile_dir=get("PROFILE_DIR", default.profile_dir),
+            job_workers=int(get("JOB_WORKERS", default.job_workers)),
+            job_max_pending=int(get("JOB_MAX_PENDING", default.job_max_pending)),
+            job_result_ttl=float(get("JOB_RESULT_TTL_SECONDS", default.job_result_ttl)),
+            batch_max_files=int(get("BATCH_MAX_FILES", default.batch_max_files)),
+            batch_concurrency=int(get("BATCH_CONCURRENCY", default.batch_concurrency)),
+            batch_overload_retries=int(get("BATCH_OVERLOAD_RETRIES", default.batch_overload_retries)),
+            chunked_summary_threshold_tokens=int(
+                get("CHUNKED_SUMMARY_THRESHOLD_TOKENS", default.chunked_summary_threshold_tokens)
+            ),
+            chunk_token_budget=int(get("CHUNK_TOKEN_BUDGET", default.chunk_token_budget)),
+            chunk_parallelism=int(get("CHUNK_PARALLELISM", default.chunk_parallelism)),
+            condense_token_budget=int(get("CONDENSE_TOKEN_BUDGET", default.condense_token_budget)),
+            warm_up=_flag(environ.get("WARM_UP", "")),
+        )
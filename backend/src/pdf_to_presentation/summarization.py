@@ -0,0 +1,83 @@
+# summarization.py
+# Helpers for map-reduce summarization of long documents: the text is split into
+# page-aligned chunks under a token budget, each chunk is summarized by its own
+# LLM call (with bounded parallelism), and the summaries feed a final call that
+# produces the slides.
+
+import asyncio
+from typing import Awaitable, Callable, List, TypeVar
+
+T = TypeVar("T")
+
+# A rough but stable estimate; Gemini averages about four characters per token in English text
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _split_oversized(text: str, token_budget: int) -> List[str]:
+    """Splits a single over-budget page on paragraph, then line, then character boundaries."""
+    max_chars = token_budget * CHARS_PER_TOKEN
+    for separator in ("\n\n", "\n"):
+        parts = text.split(separator)
+        if len(parts) > 1:
+            pieces = []
+            current = ""
+            for part in parts:
+                candidate = f"{current}{separator}{part}" if current else part
+                if len(candidate) <= max_chars:
+                    current = candidate
+                    continue
+                if current:
+                    pieces.append(current)
+                current = part
+            if current:
+                pieces.append(current)
+            # Recurse into any piece that is still too long on its own
+            result = []
+            for piece in pieces:
+                result.extend(_split_oversized(piece, token_budget) if len(piece) > max_chars else [piece])
+            return result
+    return [text[i:i + max_chars] for i in range(0, len(text), max_chars)]
+
+
+def chunk_pages(pages: List[str], token_budget: int) -> List[str]:
+    """
+    Groups consecutive pages into chunks of at most `token_budget` estimated tokens.
+    Pages are never reordered, and a page is only split if it exceeds the budget by itself.
+    """
+    chunks = []
+    current: List[str] = []
+    current_tokens = 0
+    for page in pages:
+        if not page.strip():
+            continue
+        page_tokens = estimate_tokens(page)
+        if page_tokens > token_budget:
+            if current:
+                chunks.append("".join(current))
+                current, current_tokens = [], 0
+            chunks.extend(_split_oversized(page, token_budget))
+            continue
+        if current and current_tokens + page_tokens > token_budget:
+            chunks.append("".join(current))
+            current, current_tokens = [], 0
+        current.append(page)
+        current_tokens += page_tokens
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+async def map_chunks(chunks: List[str], summarize: Callable[[str], Awaitable[T]],
+                     max_parallel: int) -> List[T]:
+    """Runs `summarize` over every chunk, at most `max_parallel` at a time, preserving order."""
+    semaphore = asyncio.Semaphore(max(1, max_parallel))
+
+    async def run(chunk: str) -> T:
+        async with semaphore:
+            return await summarize(chunk)
+
+    return list(await asyncio.gather(*(run(chunk) for chunk in chunks)))
@@ -71,4 +71,10 @@ THEME_CONFIG = {
             "textColor": "ffffff",
         },
     ],
-}
\ No newline at end of file
+}
+
+# Themes indexed by (theme_type, name) so lookups do not scan THEME_CONFIG
+THEMES = {
+    **{("color", theme["name"]): theme for theme in THEME_CONFIG["colors"]},
+    **{("background", theme["name"]): theme for theme in THEME_CONFIG["backgrounds"]},
+}
@@ -0,0 +1,65 @@
+# uploads.py
+# Streams uploaded PDFs to disk in fixed-size chunks, hashing them on the way,
+# so that memory use per request does not depend on the size of the document.
+
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+
+from fastapi import UploadFile
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds the configured maximum size."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"File is too large. The maximum upload size is {max_bytes // (1024 * 1024)} MB.")
+        self.max_bytes = max_bytes
+
+
+@dataclass
+class StoredUpload:
+    """An upload saved to a temporary file, along with its content hash and size."""
+    path: str
+    sha256: str
+    size: int
+
+    def remove(self) -> None:
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+async def save_upload(upload: UploadFile, max_bytes: int, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      suffix: str = ".pdf") -> StoredUpload:
+    """
+    Copies `upload` to a named temporary file chunk by chunk, computing its SHA-256
+    as it goes and rejecting it with UploadTooLarge once it exceeds `max_bytes`.
+    The caller owns the returned file and must call `remove()` when done.
+    """
+    hasher = hashlib.sha256()
+    size = 0
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(max_bytes)
+                hasher.update(chunk)
+                f.write(chunk)
+    except BaseException:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        raise
+
+    return StoredUpload(path=path, sha256=hasher.hexdigest(), size=size)
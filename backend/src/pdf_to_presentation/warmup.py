@@ -0,0 +1,32 @@
+# warmup.py
+# Optional warm-up run before a worker accepts traffic. The heavy libraries
+# (PyMuPDF, Pillow, NumPy, python-pptx and the Gemini SDK) are imported lazily to
+# keep cold starts fast; warming up pays for those imports, and for building the
+# theme templates in render workers, before the first request instead of during it.
+
+import importlib
+import time
+from typing import Sequence
+
+HEAVY_MODULES = ("fitz", "PIL.Image", "numpy", "pptx", "google.generativeai")
+
+
+def import_modules(modules: Sequence[str] = HEAVY_MODULES) -> None:
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            print(f"Warm-up could not import {name}: {e}")
+
+
+def warm_up(preload_templates: bool = False) -> float:
+    """
+    Imports the heavy modules and, with `preload_templates`, builds every theme
+    template. Returns the seconds taken. Module-level so it can run in worker processes.
+    """
+    started = time.perf_counter()
+    import_modules()
+    if preload_templates:
+        from .presentation import preload_theme_templates
+        preload_theme_templates()
+    return time.perf_counter() - started
@@ -0,0 +1,93 @@
+# word_index.py
+# A uniform-grid spatial index over the words of a PDF page, used to find the
+# text surrounding each extracted image without scanning every word per image.
+
+import math
+from collections import defaultdict
+from typing import Dict, List, Sequence, Tuple
+
+BBox = Tuple[float, float, float, float]
+
+DEFAULT_CELL_SIZE = 48.0  # In PDF points; roughly a few lines of body text
+
+
+def _intersects(a: BBox, b: BBox) -> bool:
+    """Same semantics as fitz.Rect.intersects: both non-empty with a non-empty overlap."""
+    if a[0] >= a[2] or a[1] >= a[3] or b[0] >= b[2] or b[1] >= b[3]:
+        return False
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+class WordIndex:
+    """
+    Buckets words into square grid cells so that a bounding-box query only has to
+    test the words in the cells it overlaps.
+
+    `words` is the output of `page.get_text("words")`: tuples whose first four
+    items are the word's bbox and whose fifth item is the word text.
+    """
+
+    def __init__(self, words: Sequence[tuple], cell_size: float = DEFAULT_CELL_SIZE):
+        self.cell_size = cell_size
+        self._boxes: List[BBox] = []
+        self._texts: List[str] = []
+        self._cells: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        self._bounds = None  # (min_cx, min_cy, max_cx, max_cy) of occupied cells
+
+        for word in words:
+            box = (float(word[0]), float(word[1]), float(word[2]), float(word[3]))
+            index = len(self._boxes)
+            self._boxes.append(box)
+            self._texts.append(word[4])
+
+            min_cx, min_cy, max_cx, max_cy = self._cell_range(box)
+            for cx in range(min_cx, max_cx + 1):
+                for cy in range(min_cy, max_cy + 1):
+                    self._cells[(cx, cy)].append(index)
+            self._extend_bounds(min_cx, min_cy, max_cx, max_cy)
+
+    def __len__(self) -> int:
+        return len(self._boxes)
+
+    def query(self, bbox: Sequence[float], margin: float = 0.0) -> List[str]:
+        """
+        Returns the text of every word intersecting `bbox` grown by `margin` points
+        on each side, in the order the words appear on the page.
+        """
+        if self._bounds is None:
+            return []
+        box = (bbox[0] - margin, bbox[1] - margin, bbox[2] + margin, bbox[3] + margin)
+        if box[0] >= box[2] or box[1] >= box[3]:
+            return []
+
+        # Clamp to the occupied cells so huge (e.g. infinite) rects stay cheap
+        min_cx, min_cy, max_cx, max_cy = self._cell_range(box)
+        min_cx, min_cy = max(min_cx, self._bounds[0]), max(min_cy, self._bounds[1])
+        max_cx, max_cy = min(max_cx, self._bounds[2]), min(max_cy, self._bounds[3])
+
+        candidates = set()
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                candidates.update(self._cells.get((cx, cy), ()))
+
+        return [self._texts[i] for i in sorted(candidates) if _intersects(self._boxes[i], box)]
+
+    def _cell_range(self, box: BBox) -> Tuple[int, int, int, int]:
+        return (
+            self._cell(box[0]), self._cell(box[1]),
+            self._cell(box[2]), self._cell(box[3]),
+        )
+
+    def _cell(self, value: float) -> int:
+        # Guard against the huge coordinates of fitz's "infinite" rect
+        value = max(min(value, 1e9), -1e9)
+        return math.floor(value / self.cell_size)
+
+    def _extend_bounds(self, min_cx: int, min_cy: int, max_cx: int, max_cy: int) -> None:
+        if self._bounds is None:
+            self._bounds = (min_cx, min_cy, max_cx, max_cy)
+        else:
+            self._bounds = (
+                min(self._bounds[0], min_cx), min(self._bounds[1], min_cy),
+                max(self._bounds[2], max_cx), max(self._bounds[3], max_cy),
+            )
@@ -0,0 +1,65 @@
+import io
+import json
+import unittest
+import zipfile
+
+from pdf_to_presentation.batch import ZipStream, deck_filename, manifest_json, parse_themes
+
+AVAILABLE = [("color", "corporate_blue"), ("color", "modern_teal"), ("background", "blue_gradient")]
+
+
+class TestZipStream(unittest.TestCase):
+
+    def test_streamed_chunks_form_a_valid_archive(self):
+        archive = ZipStream()
+        chunks = [archive.add("first.pptx", b"a" * 5000), archive.add("second.pptx", b"b" * 10), archive.close()]
+
+        self.assertTrue(all(chunks))
+        with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(zf.namelist(), ["first.pptx", "second.pptx"])
+            self.assertEqual(zf.read("second.pptx"), b"b" * 10)
+
+    def test_chunks_are_not_retained(self):
+        archive = ZipStream()
+        first = archive.add("first.pptx", b"a" * 5000)
+        second = archive.add("second.pptx", b"b" * 10)
+
+        self.assertGreater(len(first), 5000)
+        self.assertLess(len(second), 5000)
+
+
+class TestParseThemes(unittest.TestCase):
+
+    def test_all_selects_every_theme(self):
+        self.assertEqual(parse_themes("all", AVAILABLE), AVAILABLE)
+
+    def test_list_is_parsed_in_order_without_duplicates(self):
+        themes = parse_themes("background:blue_gradient, color:corporate_blue,color:corporate_blue", AVAILABLE)
+        self.assertEqual(themes, [("background", "blue_gradient"), ("color", "corporate_blue")])
+
+    def test_unknown_or_empty_selection_is_rejected(self):
+        with self.assertRaises(ValueError):
+            parse_themes("color:no_such_theme", AVAILABLE)
+        with self.assertRaises(ValueError):
+            parse_themes(" , ", AVAILABLE)
+
+
+class TestManifest(unittest.TestCase):
+
+    def test_deck_names_are_safe_and_unique(self):
+        self.assertEqual(deck_filename("Q3 report/v2.pdf", ("color", "modern_teal"), 0), "001_Q3 report_v2_modern_teal.pptx")
+        self.assertNotEqual(
+            deck_filename("a.pdf", ("color", "modern_teal"), 0), deck_filename("a.pdf", ("color", "modern_teal"), 1)
+        )
+
+    def test_manifest_counts_failures(self):
+        manifest = json.loads(manifest_json([
+            {"document": "a.pdf", "status": "completed", "file": "001_a_x.pptx"},
+            {"document": "b.pdf", "status": "failed", "error": "Invalid file type."},
+        ]))
+        self.assertEqual((manifest["total"], manifest["succeeded"], manifest["failed"]), (2, 1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import tempfile
+import unittest
+
+from pdf_to_presentation.cache import LRUCache, content_hash
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_evicts_least_recently_used_entry(self):
+        cache = LRUCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" is now the least recently used entry
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_memory_layer_is_bounded_by_size(self):
+        cache = LRUCache(max_entries=100, max_bytes=1000)
+        for i in range(5):
+            cache.set(f"image-{i}", b"x" * 400)
+
+        self.assertLessEqual(cache.stats()["bytes"], 1000)
+        self.assertIsNone(cache.get("image-0"))
+        self.assertEqual(cache.get("image-4"), b"x" * 400)
+
+    def test_counts_hits_and_misses(self):
+        cache = LRUCache(max_entries=4)
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("missing")
+
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertAlmostEqual(stats["hit_rate"], 0.5)
+
+    def test_entries_survive_a_restart_when_persisted(self):
+        with tempfile.TemporaryDirectory() as directory:
+            LRUCache(max_entries=4, directory=directory).set("slides:abc:2", ["slide"])
+
+            reloaded = LRUCache(max_entries=4, directory=directory)
+            self.assertEqual(reloaded.get("slides:abc:2"), ["slide"])
+
+    def test_disk_layer_is_bounded_by_size(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = LRUCache(max_entries=1, directory=directory, max_disk_bytes=2048)
+            for i in range(10):
+                cache.set(f"key-{i}", b"x" * 600)
+
+            self.assertLessEqual(cache.stats()["disk_bytes"], 2048)
+            self.assertIsNone(cache.get("key-0"))
+            self.assertEqual(cache.get("key-9"), b"x" * 600)
+
+    def test_evicted_and_deleted_keys_are_reported(self):
+        evicted = []
+        cache = LRUCache(max_entries=2, on_evict=evicted.append)
+        for key in ("a", "b", "c"):
+            cache.set(key, 1)
+        cache.delete("c")
+        cache.delete("missing")
+
+        self.assertEqual(evicted, ["a", "c"])
+
+    def test_persisted_keys_are_reported_once_they_leave_the_disk(self):
+        with tempfile.TemporaryDirectory() as directory:
+            evicted = []
+            cache = LRUCache(max_entries=1, directory=directory, max_disk_bytes=1024, on_evict=evicted.append)
+            cache.set("key-0", b"x" * 600)
+            cache.set("key-1", b"x" * 600)
+
+            self.assertEqual(evicted, ["key-0"])
+            cache.clear()
+            self.assertEqual(evicted, ["key-0", "key-1"])
+
+    def test_content_hash_is_stable(self):
+        self.assertEqual(content_hash(b"pdf"), content_hash(b"pdf"))
+        self.assertNotEqual(content_hash(b"pdf"), content_hash(b"other"))
+
+
+if __name__ == '__main__':
+    unittest.main()
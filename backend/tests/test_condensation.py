@@ -0,0 +1,92 @@
+import unittest
+
+from pdf_to_presentation.condensation import (
+    clean_pages,
+    normalize_text,
+    remove_headers_and_footers,
+    score_sentences,
+    select_sentences,
+    split_sentences,
+)
+from pdf_to_presentation.summarization import estimate_tokens
+
+
+def build_page(number: int, body: str) -> str:
+    return f"Quarterly Report | Acme Corp\n{body}\nConfidential - Page {number} of 6\n"
+
+
+BODIES = [
+    "Revenue grew in every region this quarter.",
+    "Operating costs fell after the warehouse consolidation.",
+    "The new product line launched in March.",
+    "Customer churn dropped to its lowest level.",
+    "Hiring slowed as planned in engineering.",
+    "Guidance for next year was raised.",
+]
+
+
+class TestHeadersAndFooters(unittest.TestCase):
+
+    def test_repeated_edge_lines_and_page_numbers_are_removed(self):
+        pages = [build_page(i + 1, body) for i, body in enumerate(BODIES)]
+
+        cleaned = remove_headers_and_footers(pages)
+
+        for page, body in zip(cleaned, BODIES):
+            self.assertNotIn("Quarterly Report", page)
+            self.assertNotIn("Confidential", page)
+            self.assertIn(body, page)
+
+    def test_short_documents_keep_their_lines(self):
+        pages = [build_page(1, BODIES[0]), build_page(2, BODIES[1])]
+        self.assertEqual(remove_headers_and_footers(pages), pages)
+
+    def test_bare_page_numbers_are_removed(self):
+        cleaned = remove_headers_and_footers(["Introduction\nSome text.\n12"])
+        self.assertEqual(cleaned, ["Introduction\nSome text."])
+
+
+class TestNormalizeText(unittest.TestCase):
+
+    def test_hyphenated_line_breaks_are_joined(self):
+        self.assertEqual(normalize_text("the manage-\nment team"), "the management team")
+        self.assertEqual(normalize_text("North-\nAmerica"), "North-\nAmerica")
+
+    def test_whitespace_is_collapsed(self):
+        text = "  Too   many\tspaces here  \n\n\n\nNext\u00adparagraph "
+        self.assertEqual(normalize_text(text), "Too many spaces here\n\nNextparagraph")
+
+
+class TestSentenceSelection(unittest.TestCase):
+
+    def test_sentences_are_split_on_punctuation_and_lines(self):
+        self.assertEqual(
+            split_sentences("Sales rose. Costs fell!\nOutlook\nWhat next? More growth."),
+            ["Sales rose.", "Costs fell!", "Outlook", "What next?", "More growth."],
+        )
+
+    def test_representative_sentences_score_higher(self):
+        sentences = [
+            "Revenue growth drove revenue margins and revenue targets.",
+            "Revenue growth beat targets.",
+            "The office cat enjoys naps.",
+        ]
+        scores = score_sentences(sentences)
+        self.assertGreater(scores[0], scores[2])
+        self.assertGreater(scores[1], scores[2])
+
+    def test_selection_fits_budget_and_keeps_order(self):
+        text = " ".join(f"Revenue point {i} about revenue growth." for i in range(200))
+        condensed = select_sentences(text, token_budget=100)
+
+        self.assertLessEqual(estimate_tokens(condensed), 100)
+        numbers = [int(line.split()[2]) for line in condensed.split("\n")]
+        self.assertEqual(numbers, sorted(numbers))
+
+    def test_clean_pages_keeps_one_entry_per_page(self):
+        pages = [build_page(i + 1, body) for i, body in enumerate(BODIES)]
+        self.assertEqual(len(clean_pages(pages)), len(pages))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from pdf_to_presentation.executors import BoundedStage, StageOverloaded, process_pool
+
+
+class TestBoundedStage(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.release = threading.Event()
+
+    async def asyncTearDown(self):
+        self.release.set()
+        self.executor.shutdown(wait=True)
+
+    def blocked_call(self) -> str:
+        self.release.wait(timeout=5)
+        return "done"
+
+    async def start_blocked_calls(self, stage: BoundedStage, count: int) -> list:
+        tasks = [asyncio.create_task(stage.run(self.blocked_call)) for _ in range(count)]
+        await asyncio.sleep(0.05)
+        return tasks
+
+    async def test_runs_calls_on_the_executor(self):
+        stage = BoundedStage("test", self.executor, max_concurrency=1)
+        self.assertEqual(await stage.run(threading.current_thread), await stage.run(threading.current_thread))
+        self.assertNotEqual(await stage.run(threading.current_thread), threading.current_thread())
+
+    async def test_full_queue_is_rejected_straight_away(self):
+        stage = BoundedStage("test", self.executor, max_concurrency=1, max_queue=1)
+        tasks = await self.start_blocked_calls(stage, 2)
+        self.assertEqual(stage.in_flight, 2)
+
+        with self.assertRaises(StageOverloaded) as raised:
+            await stage.run(self.blocked_call)
+        self.assertEqual(raised.exception.stage, "test")
+        self.assertEqual(stage.rejected, 1)
+
+        self.release.set()
+        self.assertEqual(await asyncio.gather(*tasks), ["done", "done"])
+        self.assertEqual(stage.in_flight, 0)
+
+    async def test_queued_call_is_rejected_after_the_admission_timeout(self):
+        stage = BoundedStage("test", self.executor, max_concurrency=1, max_queue=1, queue_timeout=0.05)
+        tasks = await self.start_blocked_calls(stage, 1)
+
+        with self.assertRaises(StageOverloaded):
+            await stage.run(self.blocked_call)
+        self.assertEqual(stage.rejected, 1)
+        self.assertEqual(stage.in_flight, 1)
+
+        self.release.set()
+        await asyncio.gather(*tasks)
+
+    async def test_slot_is_released_when_the_call_raises(self):
+        stage = BoundedStage("test", self.executor, max_concurrency=1, queue_timeout=1)
+
+        def fail():
+            raise ValueError("bad page")
+
+        with self.assertRaises(ValueError):
+            await stage.run(fail)
+        self.assertEqual(stage.in_flight, 0)
+        self.assertEqual(await stage.run(lambda: "next"), "next")
+
+
+class TestProcessPool(unittest.TestCase):
+
+    def test_workers_are_not_forked(self):
+        pool = process_pool(1)
+        try:
+            self.assertNotEqual(pool._mp_context.get_start_method(), "fork")
+            self.assertEqual(pool.submit(pow, 2, 10).result(timeout=30), 1024)
+        finally:
+            pool.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import io
+import os
+import tempfile
+import unittest
+
+from PIL import Image
+
+from pdf_to_presentation.image_prep import image_media_type, prepare_image, snap_thumbnail_width
+
+
+def _save_image(img: Image.Image, fmt: str) -> str:
+    fd, path = tempfile.mkstemp(suffix=f".{fmt.lower()}")
+    with os.fdopen(fd, "wb") as f:
+        img.save(f, format=fmt)
+    return path
+
+
+class TestPrepareImage(unittest.TestCase):
+
+    def setUp(self):
+        self.paths = []
+
+    def tearDown(self):
+        for path in self.paths:
+            os.remove(path)
+
+    def test_large_photo_is_downsampled_to_display_size(self):
+        channels = [Image.effect_noise((3000, 2000), 64) for _ in range(3)]
+        img = Image.merge("RGB", channels)
+        path = _save_image(img, "PNG")
+        self.paths.append(path)
+
+        prepared = prepare_image(path, display_width_inches=2.0, dpi=100)
+
+        with Image.open(io.BytesIO(prepared)) as result:
+            self.assertEqual(result.size, (200, 133))
+            self.assertEqual(result.format, "JPEG")
+
+    def test_large_grayscale_photo_is_saved_as_jpeg(self):
+        img = Image.effect_noise((3000, 2000), 64)
+        self.assertEqual(img.mode, "L")
+        path = _save_image(img, "PNG")
+        self.paths.append(path)
+
+        prepared = prepare_image(path, display_width_inches=2.0, dpi=100)
+
+        with Image.open(io.BytesIO(prepared)) as result:
+            self.assertEqual(result.size, (200, 133))
+            self.assertEqual(result.format, "JPEG")
+            self.assertEqual(result.mode, "L")
+
+    def test_grayscale_line_art_stays_png(self):
+        img = Image.new("L", (1000, 500), 255)
+        img.paste(0, (200, 100, 800, 400))
+        path = _save_image(img, "PNG")
+        self.paths.append(path)
+
+        prepared = prepare_image(path, display_width_inches=1.0, dpi=100)
+
+        with Image.open(io.BytesIO(prepared)) as result:
+            self.assertEqual(result.format, "PNG")
+
+    def test_transparent_image_stays_png(self):
+        img = Image.new("RGBA", (1000, 500), (255, 0, 0, 128))
+        path = _save_image(img, "PNG")
+        self.paths.append(path)
+
+        prepared = prepare_image(path, display_width_inches=1.0, dpi=100)
+
+        with Image.open(io.BytesIO(prepared)) as result:
+            self.assertEqual(result.format, "PNG")
+            self.assertEqual(result.mode, "RGBA")
+
+    def test_small_image_is_not_made_larger(self):
+        img = Image.new("RGB", (50, 50), (0, 128, 0))
+        path = _save_image(img, "PNG")
+        self.paths.append(path)
+        with open(path, "rb") as f:
+            original = f.read()
+
+        prepared = prepare_image(path, display_width_inches=7.25, dpi=150)
+
+        self.assertLessEqual(len(prepared), len(original))
+
+    def test_missing_file_returns_none(self):
+        self.assertIsNone(prepare_image("does-not-exist.png", 7.25))
+
+
+class TestThumbnails(unittest.TestCase):
+
+    def test_widths_are_rounded_up_to_supported_sizes(self):
+        self.assertEqual(snap_thumbnail_width(1), 64)
+        self.assertEqual(snap_thumbnail_width(200), 256)
+        self.assertEqual(snap_thumbnail_width(256), 256)
+        self.assertEqual(snap_thumbnail_width(5000), 1024)
+
+    def test_media_type_follows_encoding(self):
+        for fmt, media_type in (("PNG", "image/png"), ("JPEG", "image/jpeg")):
+            output = io.BytesIO()
+            Image.new("RGB", (8, 8)).save(output, format=fmt)
+            self.assertEqual(image_media_type(output.getvalue()), media_type)
+
+
+if __name__ == "__main__":
+    unittest.main()
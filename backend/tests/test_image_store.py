@@ -0,0 +1,107 @@
+import hashlib
+import os
+import tempfile
+import time
+import unittest
+
+from pdf_to_presentation.image_store import LocalImageStore, LocalImageWriter, shard_path
+
+
+def write_image(store: LocalImageStore, data: bytes, ext: str = "png") -> str:
+    return store.writer().write(data, hashlib.sha256(data).hexdigest(), ext)
+
+
+class TestLocalImageStore(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_images_are_content_addressed_and_sharded(self):
+        store = LocalImageStore(self.root)
+        first = write_image(store, b"image-bytes")
+        second = write_image(store, b"image-bytes")
+
+        self.assertEqual(first, second)
+        self.assertEqual(first, f"{hashlib.sha256(b'image-bytes').hexdigest()}.png")
+        path = shard_path(self.root, first)
+        self.assertEqual(os.path.relpath(path, self.root).split(os.sep)[:2], [first[0:2], first[2:4]])
+        self.assertTrue(os.path.exists(path))
+
+    def test_unregistered_and_invalid_names_are_not_served(self):
+        store = LocalImageStore(self.root)
+        filename = write_image(store, b"a")
+
+        self.assertIsNone(store.local_path(filename))
+        self.assertIsNone(store.local_path("../secret.png"))
+        store.register([filename], owner="doc")
+        self.assertEqual(store.local_path(filename), shard_path(self.root, filename))
+
+    def test_quota_evicts_least_recently_used_images(self):
+        store = LocalImageStore(self.root, max_bytes=25)
+        a, b, c = (write_image(store, bytes([i]) * 10) for i in range(3))
+        store.register([a], owner="doc-a")
+        store.register([b], owner="doc-b")
+        store.touch([a])
+        store.register([c], owner="doc-c")
+
+        self.assertTrue(store.exists([a, c]))
+        self.assertIsNone(store.local_path(b))
+        self.assertFalse(os.path.exists(shard_path(self.root, b)))
+        self.assertEqual(store.stats()["evictions"], 1)
+
+    def test_newly_registered_images_are_never_evicted(self):
+        store = LocalImageStore(self.root, max_bytes=15)
+        a, b = (write_image(store, bytes([i]) * 10) for i in range(2))
+        store.register([a, b], owner="doc")
+
+        self.assertTrue(store.exists([a, b]))
+
+    def test_release_keeps_images_shared_with_other_documents(self):
+        store = LocalImageStore(self.root)
+        shared = write_image(store, b"logo")
+        own = write_image(store, b"chart")
+        store.register([shared, own], owner="doc-a")
+        store.register([shared], owner="doc-b")
+
+        self.assertEqual(store.release("doc-a"), 1)
+        self.assertTrue(store.exists([shared]))
+        self.assertFalse(store.exists([own]))
+        self.assertEqual(store.owners(shared), ["doc-b"])
+
+    def test_release_leaves_images_loaded_from_disk(self):
+        earlier = write_image(LocalImageStore(self.root), b"earlier")
+        store = LocalImageStore(self.root)
+        own = write_image(store, b"chart")
+        store.register([own], owner="doc")
+
+        self.assertEqual(store.release("doc"), 1)
+        self.assertTrue(store.exists([earlier]))
+        self.assertFalse(store.exists([own]))
+
+    def test_sweep_expires_unused_images(self):
+        store = LocalImageStore(self.root, ttl_seconds=60)
+        old = write_image(store, b"old")
+        fresh = write_image(store, b"fresh")
+        store.register([old, fresh], owner="doc")
+        store._entries[old].last_used = time.time() - 120
+        store._entries.move_to_end(fresh)
+
+        self.assertEqual(store.sweep(), 1)
+        self.assertFalse(store.exists([old]))
+        self.assertTrue(store.exists([fresh]))
+
+    def test_metadata_is_rebuilt_from_disk(self):
+        filename = LocalImageWriter(self.root).write(b"x" * 5, hashlib.sha256(b"x" * 5).hexdigest(), "jpg")
+
+        store = LocalImageStore(self.root)
+
+        self.assertTrue(store.exists([filename]))
+        self.assertEqual(store.stats()["bytes"], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import asyncio
+import unittest
+
+from pdf_to_presentation.jobs import COMPLETED, FAILED, JobManager, JobQueueFull
+
+
+class TestJobManager(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncTearDown(self):
+        await self.manager.shutdown()
+
+    async def test_runs_pipeline_and_streams_progress(self):
+        self.manager = JobManager(workers=1)
+
+        async def pipeline(report):
+            report("extracting", 10)
+            await asyncio.sleep(0)
+            report("generating", 50)
+            return "slides"
+
+        job = self.manager.submit(pipeline)
+        snapshots = [snapshot async for snapshot in self.manager.events(job)]
+
+        self.assertEqual(job.status, COMPLETED)
+        self.assertEqual(job.result, "slides")
+        self.assertEqual(snapshots[-1]["progress"], 100)
+        self.assertIn("generating", [s["stage"] for s in snapshots])
+
+    async def test_progress_can_be_reported_from_worker_threads(self):
+        self.manager = JobManager(workers=1)
+
+        async def pipeline(report):
+            await asyncio.to_thread(report, "extracting", 40)
+            await asyncio.sleep(0)
+            return None
+
+        job = self.manager.submit(pipeline)
+        stages = [s["stage"] async for s in self.manager.events(job)]
+        self.assertIn("extracting", stages)
+
+    async def test_failed_pipeline_records_error(self):
+        self.manager = JobManager(workers=1)
+
+        async def pipeline(report):
+            raise ValueError("bad pdf")
+
+        job = self.manager.submit(pipeline)
+        snapshots = [snapshot async for snapshot in self.manager.events(job)]
+
+        self.assertEqual(job.status, FAILED)
+        self.assertEqual(snapshots[-1]["error"], "bad pdf")
+
+    async def test_rejects_jobs_when_queue_is_full(self):
+        self.manager = JobManager(workers=1, max_pending=1)
+        blocker = asyncio.Event()
+
+        async def pipeline(report):
+            await blocker.wait()
+
+        self.manager.submit(pipeline)
+        await asyncio.sleep(0)  # Let the worker pick up the first job
+        self.manager.submit(pipeline)
+        with self.assertRaises(JobQueueFull):
+            self.manager.submit(pipeline)
+        blocker.set()
+
+
+if __name__ == '__main__':
+    unittest.main()
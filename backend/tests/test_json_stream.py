@@ -0,0 +1,44 @@
+import unittest
+
+from pdf_to_presentation.json_stream import MalformedItem, SlideArrayParser
+
+RESPONSE = """```json
+[
+  {"title": "Intro", "bullets": ["A {braced} point", "Quote \\" inside"]},
+  {"title": "Second", "text_block": "Ends with a brace }"},
+]
+```"""
+
+
+class TestSlideArrayParser(unittest.TestCase):
+
+    def test_yields_each_object_as_soon_as_it_is_complete(self):
+        parser = SlideArrayParser()
+        seen = []
+        for i in range(0, len(RESPONSE), 7):  # Feed the response in small chunks
+            seen.extend(parser.feed(RESPONSE[i:i + 7]))
+
+        self.assertEqual([item["title"] for item in seen], ["Intro", "Second"])
+        self.assertEqual(seen[0]["bullets"], ["A {braced} point", 'Quote " inside'])
+        self.assertTrue(parser.finished)
+
+    def test_first_object_is_available_before_the_array_closes(self):
+        parser = SlideArrayParser()
+        items = parser.feed('[{"title": "One"}, {"title": "Tw')
+
+        self.assertEqual(items, [{"title": "One"}])
+        self.assertFalse(parser.finished)
+
+    def test_repairs_trailing_commas(self):
+        items = SlideArrayParser().feed('[{"title": "One", "bullets": ["a", "b",],}]')
+        self.assertEqual(items, [{"title": "One", "bullets": ["a", "b"]}])
+
+    def test_reports_malformed_objects_without_stopping(self):
+        items = SlideArrayParser().feed('[{"title": One}, {"title": "Two"}]')
+
+        self.assertIsInstance(items[0], MalformedItem)
+        self.assertEqual(items[1], {"title": "Two"})
+
+
+if __name__ == '__main__':
+    unittest.main()
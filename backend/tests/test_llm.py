@@ -0,0 +1,162 @@
+import threading
+import time
+import unittest
+
+from pdf_to_presentation.llm import LLMClient, LLMRateLimited, StubProvider, TokenBucket
+
+
+def echo(prompt: str) -> str:
+    return f"answer to {prompt}"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_refills_at_the_per_minute_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(60, clock=clock)
+
+        self.assertEqual(bucket.try_acquire(60), 0.0)
+        self.assertAlmostEqual(bucket.try_acquire(1), 1.0)
+
+        clock.now = 1.0
+        self.assertEqual(bucket.try_acquire(1), 0.0)
+
+    def test_requests_larger_than_capacity_are_clamped(self):
+        bucket = TokenBucket(10, clock=FakeClock())
+        self.assertEqual(bucket.try_acquire(500), 0.0)
+
+    def test_refund_returns_tokens_up_to_capacity(self):
+        bucket = TokenBucket(10, clock=FakeClock())
+        bucket.try_acquire(10)
+        bucket.refund(20)
+        self.assertEqual(bucket.try_acquire(10), 0.0)
+        self.assertGreater(bucket.try_acquire(1), 0.0)
+
+
+class TestLLMClient(unittest.TestCase):
+
+    def test_generate_returns_the_provider_answer(self):
+        client = LLMClient(StubProvider(echo))
+        self.assertEqual(client.generate("hello"), "answer to hello")
+
+    def test_transient_errors_are_retried_with_backoff(self):
+        provider = StubProvider(echo, failures=2)
+        sleeps = []
+        client = LLMClient(provider, max_retries=3, backoff_base=1.0, sleep=sleeps.append)
+
+        self.assertEqual(client.generate("hello"), "answer to hello")
+        self.assertEqual(provider.calls, 3)
+        self.assertEqual(len(sleeps), 2)
+        self.assertTrue(0 <= sleeps[0] <= 1.0 and 0 <= sleeps[1] <= 2.0)
+
+    def test_gives_up_after_max_retries(self):
+        provider = StubProvider(echo, failures=10)
+        client = LLMClient(provider, max_retries=2, sleep=lambda _: None)
+
+        with self.assertRaises(ConnectionError):
+            client.generate("hello")
+        self.assertEqual(provider.calls, 3)
+
+    def test_permanent_errors_are_not_retried(self):
+        provider = StubProvider(echo, failures=1, error=ValueError("bad prompt"))
+        client = LLMClient(provider, sleep=lambda _: None)
+
+        with self.assertRaises(ValueError):
+            client.generate("hello")
+        self.assertEqual(provider.calls, 1)
+
+    def test_identical_concurrent_prompts_share_one_call(self):
+        provider = StubProvider(echo, latency=0.2)
+        client = LLMClient(provider)
+        results = []
+
+        threads = [threading.Thread(target=lambda: results.append(client.generate("same"))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, ["answer to same"] * 4)
+        self.assertEqual(provider.calls, 1)
+
+    def test_hedged_request_wins_when_the_first_is_slow(self):
+        class SlowFirstProvider(StubProvider):
+            def generate(self, prompt, timeout):
+                call = self._next_call()
+                time.sleep(1.0 if call == 1 else 0.0)
+                return f"call {call}"
+
+        provider = SlowFirstProvider(echo)
+        client = LLMClient(provider, hedge_after=0.05)
+        try:
+            started = time.monotonic()
+            self.assertEqual(client.generate("hello"), "call 2")
+            self.assertLess(time.monotonic() - started, 0.5)
+        finally:
+            client.shutdown()
+
+    def test_hedges_do_not_queue_behind_slow_requests(self):
+        class SlowPrimaryProvider(StubProvider):
+            def __init__(self):
+                super().__init__(echo)
+                self.seen = set()
+
+            def generate(self, prompt, timeout):
+                self._next_call()
+                with self._lock:
+                    first = prompt not in self.seen
+                    self.seen.add(prompt)
+                time.sleep(1.0 if first else 0.0)
+                return echo(prompt)
+
+        client = LLMClient(SlowPrimaryProvider(), hedge_after=0.05, concurrency=2)
+        results = []
+        threads = [threading.Thread(target=lambda p=p: results.append(client.generate(p))) for p in ("a", "b")]
+        try:
+            started = time.monotonic()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertLess(time.monotonic() - started, 0.5)
+            self.assertEqual(sorted(results), ["answer to a", "answer to b"])
+        finally:
+            client.shutdown()
+
+    def test_rate_limit_raises_when_the_wait_is_too_long(self):
+        client = LLMClient(StubProvider(echo), requests_per_minute=1, max_rate_wait=5)
+        client.generate("first")
+
+        with self.assertRaises(LLMRateLimited) as raised:
+            client.generate("second")
+        self.assertGreaterEqual(raised.exception.retry_after, 5)
+
+    def test_rate_limit_waits_for_capacity(self):
+        sleeps = []
+        client = LLMClient(StubProvider(echo), requests_per_minute=60, max_rate_wait=5, sleep=sleeps.append)
+        client._request_bucket = TokenBucket(60, clock=FakeClock())
+        client._request_bucket.try_acquire(60)
+
+        # The fake clock never advances, so each wait is slept and the bucket stays empty
+        with self.assertRaises(LLMRateLimited):
+            client.generate("hello")
+        self.assertTrue(sleeps and all(delay == 1.0 for delay in sleeps))
+
+    def test_stream_retries_before_the_first_chunk(self):
+        provider = StubProvider(echo, failures=1, chunk_size=4)
+        client = LLMClient(provider, sleep=lambda _: None)
+
+        self.assertEqual("".join(client.stream("hi")), "answer to hi")
+        self.assertEqual(provider.calls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
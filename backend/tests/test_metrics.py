@@ -0,0 +1,77 @@
+import os
+import pstats
+import tempfile
+import unittest
+
+from pdf_to_presentation.metrics import Registry, run_profiled, span, STAGE_ERRORS, STAGE_SECONDS
+
+
+class TestRegistry(unittest.TestCase):
+
+    def test_counter_renders_prometheus_text(self):
+        registry = Registry()
+        pages = registry.counter("pages_total", "Pages extracted.")
+        errors = registry.counter("errors_total", "Errors by stage.", ["stage"])
+        pages.inc(3)
+        pages.inc()
+        errors.inc(stage='llm "generate"')
+
+        text = registry.render()
+
+        self.assertIn("# TYPE pages_total counter\npages_total 4\n", text)
+        self.assertIn('errors_total{stage="llm \\"generate\\""} 1', text)
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = Registry()
+        latency = registry.histogram("latency_seconds", "Latency.", ["stage"], buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 5.0):
+            latency.observe(value, stage="render")
+
+        lines = registry.render().splitlines()
+
+        self.assertIn('latency_seconds_bucket{stage="render",le="0.1"} 1', lines)
+        self.assertIn('latency_seconds_bucket{stage="render",le="1"} 3', lines)
+        self.assertIn('latency_seconds_bucket{stage="render",le="+Inf"} 4', lines)
+        self.assertIn('latency_seconds_sum{stage="render"} 6.25', lines)
+        self.assertIn('latency_seconds_count{stage="render"} 4', lines)
+
+    def test_labels_must_match(self):
+        counter = Registry().counter("requests_total", "Requests.", ["method"])
+        with self.assertRaises(ValueError):
+            counter.inc(route="/")
+
+    def test_duplicate_names_are_rejected(self):
+        registry = Registry()
+        registry.counter("requests_total", "Requests.")
+        with self.assertRaises(ValueError):
+            registry.counter("requests_total", "Requests.")
+
+
+class TestSpan(unittest.TestCase):
+
+    def test_span_records_duration_and_errors(self):
+        before = STAGE_SECONDS.count(stage="test_stage")
+        with span("test_stage"):
+            pass
+        with self.assertRaises(RuntimeError):
+            with span("test_stage"):
+                raise RuntimeError("boom")
+
+        self.assertEqual(STAGE_SECONDS.count(stage="test_stage"), before + 2)
+        self.assertEqual(STAGE_ERRORS.value(stage="test_stage"), 1)
+
+
+class TestProfiling(unittest.TestCase):
+
+    def test_run_profiled_dumps_stats(self):
+        with tempfile.TemporaryDirectory() as profile_dir:
+            dump_path = os.path.join(profile_dir, "request-render-1.prof")
+
+            result = run_profiled(dump_path, sorted, [3, 1, 2])
+
+            self.assertEqual(result, [1, 2, 3])
+            self.assertGreater(pstats.Stats(dump_path).total_calls, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+
+from pdf_to_presentation.page_selection import PageSelectionError, parse_page_ranges, section_pages, select_pages
+
+TOC = [
+    [1, "Introduction", 1],
+    [1, "Executive Summary", 3],
+    [2, "Key Findings", 4],
+    [2, "Recommendations", 6],
+    [1, "Appendix", 8],
+]
+
+
+class TestParsePageRanges(unittest.TestCase):
+
+    def test_single_pages_and_ranges(self):
+        self.assertEqual(parse_page_ranges("1-3, 5", page_count=10), [0, 1, 2, 4])
+
+    def test_open_ranges_run_to_the_document_edges(self):
+        self.assertEqual(parse_page_ranges("9-", page_count=10), [8, 9])
+        self.assertEqual(parse_page_ranges("-2", page_count=10), [0, 1])
+
+    def test_overlapping_ranges_are_merged_in_order(self):
+        self.assertEqual(parse_page_ranges("4-5,1,2-4", page_count=10), [0, 1, 2, 3, 4])
+
+    def test_ranges_past_the_end_are_clipped(self):
+        self.assertEqual(parse_page_ranges("8-20", page_count=10), [7, 8, 9])
+
+    def test_invalid_selections_are_rejected(self):
+        for spec in ["abc", "0", "5-2", "1-x", "", " , "]:
+            with self.subTest(spec=spec), self.assertRaises(PageSelectionError):
+                parse_page_ranges(spec, page_count=10)
+
+    def test_start_past_the_end_is_rejected(self):
+        with self.assertRaises(PageSelectionError):
+            parse_page_ranges("11-12", page_count=10)
+
+
+class TestSectionPages(unittest.TestCase):
+
+    def test_section_runs_until_the_next_entry_at_its_level(self):
+        # Nested entries stay inside the section
+        self.assertEqual(section_pages(TOC, "executive summary", page_count=10), [2, 3, 4, 5, 6])
+
+    def test_nested_section_ends_at_its_next_sibling(self):
+        self.assertEqual(section_pages(TOC, "Key Findings", page_count=10), [3, 4])
+
+    def test_last_section_runs_to_the_end(self):
+        self.assertEqual(section_pages(TOC, "Appendix", page_count=10), [7, 8, 9])
+
+    def test_missing_section_is_rejected(self):
+        with self.assertRaises(PageSelectionError):
+            section_pages(TOC, "Glossary", page_count=10)
+
+    def test_select_pages_dispatches_on_the_toc_prefix(self):
+        self.assertEqual(select_pages("TOC: appendix", 10, TOC), [7, 8, 9])
+        self.assertEqual(select_pages("2", 10, TOC), [1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+import io
+import os
+import tempfile
+import unittest
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from pdf_to_presentation.image_store import LocalImageWriter, shard_path
+from pdf_to_presentation.page_selection import PageSelectionError
+from pdf_to_presentation.pdf_extraction import (
+    extract_pages_and_images_from_pdf, extract_text_and_images_from_pdf, shard_page_ranges,
+)
+
+
+def build_text_pdf(page_count: int) -> bytes:
+    """Builds an in-memory PDF with one numbered line of text per page."""
+    with fitz.open() as doc:
+        for i in range(page_count):
+            page = doc.new_page()
+            page.insert_text((72, 72), f"Page number {i + 1}")
+        return doc.tobytes()
+
+
+def build_image_pdf(image_bytes: bytes, page_count: int) -> bytes:
+    """Builds an in-memory PDF that shows the same image on every page."""
+    with fitz.open() as doc:
+        for _ in range(page_count):
+            page = doc.new_page()
+            page.insert_image(fitz.Rect(72, 72, 272, 272), stream=image_bytes)
+        return doc.tobytes()
+
+
+def build_outlined_pdf(page_count: int, toc: list) -> bytes:
+    """Builds a numbered text PDF with the given outline."""
+    with fitz.open(stream=build_text_pdf(page_count), filetype="pdf") as doc:
+        doc.set_toc(toc)
+        return doc.tobytes()
+
+
+def encode_image(image_format: str) -> bytes:
+    stream = io.BytesIO()
+    Image.new("RGB", (64, 64), (200, 40, 40)).save(stream, format=image_format)
+    return stream.getvalue()
+
+
+class TestShardPageRanges(unittest.TestCase):
+
+    def test_ranges_are_contiguous_and_cover_every_page(self):
+        ranges = shard_page_ranges(101, workers=4, min_pages_per_shard=8)
+        self.assertEqual(len(ranges), 4)
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(ranges[-1][1], 101)
+        for (_, stop), (next_start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(stop, next_start)
+
+    def test_small_documents_are_not_split(self):
+        self.assertEqual(shard_page_ranges(5, workers=4, min_pages_per_shard=8), [(0, 5)])
+
+
+class TestParallelExtraction(unittest.TestCase):
+
+    def test_parallel_output_matches_serial_output(self):
+        pdf_content = build_text_pdf(40)
+
+        serial_text, _ = extract_text_and_images_from_pdf(pdf_content, workers=1)
+        parallel_text, _ = extract_text_and_images_from_pdf(pdf_content, workers=4)
+
+        self.assertEqual(parallel_text, serial_text)
+        self.assertLess(serial_text.index("Page number 1\n"), serial_text.index("Page number 40"))
+
+
+class TestImageDeduplication(unittest.TestCase):
+
+    def test_repeated_image_is_extracted_once(self):
+        pdf_content = build_image_pdf(encode_image("PNG"), page_count=3)
+        with tempfile.TemporaryDirectory() as image_dir:
+            _, images = extract_text_and_images_from_pdf(
+                pdf_content, image_writer=LocalImageWriter(image_dir)
+            )
+
+            self.assertEqual(len(images), 1)
+            stored = [name for _, _, files in os.walk(image_dir) for name in files]
+            self.assertEqual(stored, [images[0]["filename"]])
+
+    def test_jpeg_images_are_passed_through(self):
+        jpeg_bytes = encode_image("JPEG")
+        pdf_content = build_image_pdf(jpeg_bytes, page_count=1)
+        with tempfile.TemporaryDirectory() as image_dir:
+            _, images = extract_text_and_images_from_pdf(
+                pdf_content, image_writer=LocalImageWriter(image_dir)
+            )
+
+            self.assertTrue(images[0]["filename"].endswith(".jpg"))
+            with open(shard_path(image_dir, images[0]["filename"]), "rb") as f:
+                self.assertEqual(f.read(), jpeg_bytes)
+
+
+class TestPartialExtraction(unittest.TestCase):
+
+    def test_only_selected_pages_are_extracted(self):
+        pages, _ = extract_pages_and_images_from_pdf(build_text_pdf(10), page_selection="2-3,9")
+        self.assertEqual([page.strip() for page in pages], ["Page number 2", "Page number 3", "Page number 9"])
+
+    def test_selection_matches_with_parallel_workers(self):
+        pdf_content = build_text_pdf(40)
+        serial, _ = extract_pages_and_images_from_pdf(pdf_content, page_selection="5-35")
+        parallel, _ = extract_pages_and_images_from_pdf(pdf_content, workers=4, page_selection="5-35")
+        self.assertEqual(parallel, serial)
+        self.assertEqual(len(serial), 31)
+
+    def test_toc_section_selects_its_pages(self):
+        pdf_content = build_outlined_pdf(6, [[1, "Intro", 1], [1, "Results", 3], [1, "Appendix", 5]])
+        pages, _ = extract_pages_and_images_from_pdf(pdf_content, page_selection="toc:results")
+        self.assertEqual([page.strip() for page in pages], ["Page number 3", "Page number 4"])
+
+    def test_invalid_selection_raises(self):
+        with self.assertRaises(PageSelectionError):
+            extract_pages_and_images_from_pdf(build_text_pdf(3), page_selection="7")
+
+    def test_text_only_skips_images(self):
+        pdf_content = build_image_pdf(encode_image("PNG"), page_count=2)
+        with tempfile.TemporaryDirectory() as image_dir:
+            _, images = extract_text_and_images_from_pdf(
+                pdf_content, image_writer=LocalImageWriter(image_dir), include_images=False
+            )
+            self.assertEqual(images, [])
+            self.assertEqual([name for _, _, files in os.walk(image_dir) for name in files], [])
+
+    def test_character_budget_stops_early(self):
+        pdf_content = build_text_pdf(40)
+        pages, _ = extract_pages_and_images_from_pdf(pdf_content, workers=4, max_chars=30)
+        self.assertEqual(sum(len(page) for page in pages), 30)
+        self.assertLess(len(pages), 40)
+        self.assertTrue(pages[0].startswith("Page number 1"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from pptx import Presentation
+from pptx.enum.shapes import MSO_SHAPE_TYPE
+from PIL import Image
+
+from pdf_to_presentation.models import Slide
+from pdf_to_presentation.presentation import build_theme_template, create_presentation, render_presentation
+
+SLIDES = [
+    Slide(title="Overview", bullets=["First point", "Second point"]),
+    Slide(title="Summary", text_block="A short paragraph."),
+    Slide(title="Questions"),
+]
+
+
+class TestCreatePresentation(unittest.TestCase):
+
+    def test_renders_one_slide_per_entry(self):
+        stream = create_presentation(SLIDES, "color", "corporate_blue")
+        prs = Presentation(stream)
+
+        self.assertEqual(len(prs.slides), 3)
+        self.assertEqual(prs.slides[0].shapes.title.text, "Overview")
+
+    def test_background_theme_is_applied_once_on_the_master(self):
+        stream = create_presentation(SLIDES, "background", "blue_gradient")
+        prs = Presentation(stream)
+
+        master_bg = prs.slide_master._element.cSld.find(
+            "{http://schemas.openxmlformats.org/presentationml/2006/main}bg"
+        )
+        self.assertIsNotNone(master_bg)
+        for slide in prs.slides:
+            pictures = [shape for shape in slide.shapes if shape.shape_type == MSO_SHAPE_TYPE.PICTURE]
+            self.assertEqual(pictures, [])
+
+    def test_templates_are_built_once_per_theme(self):
+        build_theme_template.cache_clear()
+        create_presentation(SLIDES, "color", "modern_teal")
+        create_presentation(SLIDES, "color", "modern_teal")
+
+        self.assertEqual(build_theme_template.cache_info().misses, 1)
+
+    def test_unknown_theme_falls_back_to_an_unstyled_deck(self):
+        prs = Presentation(io.BytesIO(create_presentation(SLIDES, "color", "no_such_theme").getvalue()))
+        self.assertEqual(len(prs.slides), 3)
+
+
+class TestSlideCache(unittest.TestCase):
+
+    def test_rerender_after_edit_reuses_unchanged_slides(self):
+        _, rendered = render_presentation(SLIDES, "color", "corporate_blue")
+        self.assertEqual(len(rendered), 3)
+
+        edited = [SLIDES[0], Slide(title="Summary", text_block="An edited paragraph."), SLIDES[2]]
+        pptx_bytes, newly_rendered = render_presentation(edited, "color", "corporate_blue", cached_slides=rendered)
+        prs = Presentation(io.BytesIO(pptx_bytes))
+
+        self.assertEqual(len(newly_rendered), 1)
+        self.assertEqual([slide.shapes.title.text for slide in prs.slides], ["Overview", "Summary", "Questions"])
+        self.assertIn("An edited paragraph.", [shape.text_frame.text for shape in prs.slides[1].shapes if shape.has_text_frame])
+
+    def test_switching_theme_renders_slides_again(self):
+        _, rendered = render_presentation(SLIDES, "color", "corporate_blue")
+        _, newly_rendered = render_presentation(SLIDES, "color", "modern_teal", cached_slides=rendered)
+
+        self.assertEqual(len(newly_rendered), 3)
+
+    def test_reused_slide_keeps_its_picture(self):
+        fd, image_path = tempfile.mkstemp(suffix=".png")
+        with os.fdopen(fd, "wb") as f:
+            Image.new("RGB", (64, 32), (200, 30, 30)).save(f, format="PNG")
+        self.addCleanup(os.remove, image_path)
+        slides = [Slide(title="Chart", bullets=["Point"], image_filename="chart.png")]
+        slide_cache = {}
+
+        for _ in range(2):
+            prs = Presentation(create_presentation(
+                slides, "color", "corporate_blue", image_paths={"chart.png": image_path}, slide_cache=slide_cache,
+            ))
+            pictures = [shape for shape in prs.slides[0].shapes if shape.shape_type == MSO_SHAPE_TYPE.PICTURE]
+            self.assertEqual(len(pictures), 1)
+            self.assertEqual(pictures[0].image.size, (64, 32))
+
+    def test_reused_slide_does_not_prepare_its_image_again(self):
+        fd, image_path = tempfile.mkstemp(suffix=".png")
+        with os.fdopen(fd, "wb") as f:
+            Image.new("RGB", (64, 32), (200, 30, 30)).save(f, format="PNG")
+        self.addCleanup(os.remove, image_path)
+        slides = [Slide(title="Chart", bullets=["Point"], image_filename="chart.png")]
+        image_paths = {"chart.png": image_path}
+        _, rendered = render_presentation(slides, "color", "corporate_blue", image_paths=image_paths)
+        self.assertEqual(len(rendered), 2)
+
+        with mock.patch("pdf_to_presentation.presentation.prepare_image") as prepare_image:
+            pptx_bytes, newly_rendered = render_presentation(
+                slides, "color", "corporate_blue", image_paths=image_paths, cached_slides=rendered,
+            )
+
+        prepare_image.assert_not_called()
+        self.assertEqual(newly_rendered, {})
+        pictures = [shape for shape in Presentation(io.BytesIO(pptx_bytes)).slides[0].shapes
+                    if shape.shape_type == MSO_SHAPE_TYPE.PICTURE]
+        self.assertEqual(len(pictures), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+
+from pdf_to_presentation.settings import MB, Settings
+
+
+class TestSettings(unittest.TestCase):
+
+    def test_defaults_when_environment_is_empty(self):
+        self.assertEqual(Settings.from_env({}), Settings())
+
+    def test_reads_and_converts_environment_values(self):
+        settings = Settings.from_env({
+            "GOOGLE_API_KEY": "key",
+            "MAX_UPLOAD_MB": "10",
+            "LLM_CONCURRENCY": "3",
+            "STAGE_QUEUE_TIMEOUT_SECONDS": "2.5",
+            "CACHE_DIR": "",
+            "PROFILING_ENABLED": "true",
+            "WARM_UP": "1",
+        })
+
+        self.assertEqual(settings.google_api_key, "key")
+        self.assertEqual(settings.max_upload_bytes, 10 * MB)
+        self.assertEqual(settings.llm_concurrency, 3)
+        self.assertEqual(settings.stage_queue_timeout, 2.5)
+        self.assertEqual(settings.cache_dir, "")
+        self.assertTrue(settings.profiling_enabled)
+        self.assertTrue(settings.warm_up)
+
+    def test_zero_disables_llm_limits_and_hedging(self):
+        settings = Settings.from_env({
+            "LLM_REQUESTS_PER_MINUTE": "0", "LLM_TOKENS_PER_MINUTE": "60000", "LLM_HEDGE_AFTER_SECONDS": "0",
+        })
+
+        self.assertIsNone(settings.llm_requests_per_minute)
+        self.assertEqual(settings.llm_tokens_per_minute, 60000)
+        self.assertIsNone(settings.llm_hedge_after)
+
+
+if __name__ == '__main__':
+    unittest.main()
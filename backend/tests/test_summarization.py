@@ -0,0 +1,48 @@
+import asyncio
+import unittest
+
+from pdf_to_presentation.summarization import chunk_pages, estimate_tokens, map_chunks
+
+
+class TestChunkPages(unittest.TestCase):
+
+    def test_groups_consecutive_pages_under_the_budget(self):
+        pages = ["a" * 400, "b" * 400, "c" * 400, "d" * 400]  # 100 tokens each
+        chunks = chunk_pages(pages, token_budget=250)
+
+        self.assertEqual(chunks, ["a" * 400 + "b" * 400, "c" * 400 + "d" * 400])
+
+    def test_splits_oversized_pages_on_paragraphs(self):
+        page = "\n\n".join(["x" * 300] * 4)
+        chunks = chunk_pages(["intro", page], token_budget=100)
+
+        self.assertEqual(chunks[0], "intro")
+        self.assertTrue(all(estimate_tokens(chunk) <= 100 for chunk in chunks))
+        self.assertEqual("".join(chunks[1:]).count("x"), 1200)
+
+    def test_skips_blank_pages(self):
+        self.assertEqual(chunk_pages(["   \n", "text"], token_budget=100), ["text"])
+
+
+class TestMapChunks(unittest.IsolatedAsyncioTestCase):
+
+    async def test_limits_parallelism_and_preserves_order(self):
+        running = 0
+        peak = 0
+
+        async def summarize(chunk):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return chunk.upper()
+
+        results = await map_chunks(["a", "b", "c", "d", "e"], summarize, max_parallel=2)
+
+        self.assertEqual(results, ["A", "B", "C", "D", "E"])
+        self.assertEqual(peak, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
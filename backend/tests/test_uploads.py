@@ -0,0 +1,33 @@
+import hashlib
+import io
+import os
+import unittest
+
+from fastapi import UploadFile
+
+from pdf_to_presentation.uploads import UploadTooLarge, save_upload
+
+
+class TestSaveUpload(unittest.IsolatedAsyncioTestCase):
+
+    async def test_streams_upload_to_disk_and_hashes_it(self):
+        data = b"%PDF-1.7 " + b"x" * 5000
+        upload = await save_upload(UploadFile(file=io.BytesIO(data), filename="report.pdf"),
+                                   max_bytes=10_000, chunk_size=1024)
+        try:
+            self.assertEqual(upload.size, len(data))
+            self.assertEqual(upload.sha256, hashlib.sha256(data).hexdigest())
+            with open(upload.path, "rb") as f:
+                self.assertEqual(f.read(), data)
+        finally:
+            upload.remove()
+        self.assertFalse(os.path.exists(upload.path))
+
+    async def test_rejects_uploads_over_the_limit(self):
+        upload_file = UploadFile(file=io.BytesIO(b"x" * 4096), filename="huge.pdf")
+        with self.assertRaises(UploadTooLarge):
+            await save_upload(upload_file, max_bytes=1000, chunk_size=512)
+
+
+if __name__ == '__main__':
+    unittest.main()
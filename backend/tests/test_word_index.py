@@ -0,0 +1,42 @@
+import unittest
+
+from pdf_to_presentation.word_index import WordIndex
+
+# (x0, y0, x1, y1, text) tuples, laid out like the output of page.get_text("words")
+WORDS = [
+    (10, 10, 40, 20, "Quarterly"),
+    (45, 10, 80, 20, "Revenue"),
+    (100, 200, 140, 210, "Figure"),
+    (145, 200, 160, 210, "1"),
+    (400, 700, 450, 710, "Footer"),
+]
+
+
+class TestWordIndex(unittest.TestCase):
+
+    def test_returns_words_overlapping_the_bbox_in_page_order(self):
+        index = WordIndex(WORDS, cell_size=32)
+        self.assertEqual(index.query((0, 0, 90, 25)), ["Quarterly", "Revenue"])
+
+    def test_margin_picks_up_nearby_captions(self):
+        index = WordIndex(WORDS, cell_size=32)
+        image_bbox = (100, 100, 200, 195)
+
+        self.assertEqual(index.query(image_bbox), [])
+        self.assertEqual(index.query(image_bbox, margin=10), ["Figure", "1"])
+
+    def test_touching_edges_do_not_count_as_intersecting(self):
+        index = WordIndex(WORDS, cell_size=32)
+        self.assertEqual(index.query((80, 10, 90, 20)), [])
+
+    def test_huge_bbox_matches_every_word(self):
+        index = WordIndex(WORDS, cell_size=32)
+        huge = (-2147483648.0, -2147483648.0, 2147483520.0, 2147483520.0)
+        self.assertEqual(index.query(huge), [w[4] for w in WORDS])
+
+    def test_empty_page(self):
+        self.assertEqual(WordIndex([]).query((0, 0, 100, 100)), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,7 +8,11 @@ import { SlideSidebar } from "@/components/slide-sidebar";
 import { SlideEditor } from "@/components/slide-editor";
 import { ThemeSelector } from "@/components/theme-selector";
 import { PowerPointGenerator } from "@/components/powerpoint-generator";
-import { processPDF, generatePowerPoint } from "@/lib/pdf-processing";
+import {
+  processPDF,
+  processPDFStream,
+  generatePowerPoint,
+} from "@/lib/pdf-processing";
 import type { Slide } from "@/types/slide";
 import type { SelectedTheme } from "@/types/theme";
 import { ModeToggle } from "./components/mode-toggle";
@@ -21,6 +25,7 @@ export default function App() {
     null
   );
   const [isProcessingPDF, setIsProcessingPDF] = useState(false);
+  const [isStreamingSlides, setIsStreamingSlides] = useState(false);
   const [isGeneratingPPT, setIsGeneratingPPT] = useState(false);
   const [showDownloadSuccess, setShowDownloadSuccess] = useState(false);
   const [processingProgress, setProcessingProgress] = useState(0);
@@ -32,20 +37,46 @@ export default function App() {
     async (file: File, detailLevel: number) => {
       if (file.type === "application/pdf") {
         setIsProcessingPDF(true);
+        setIsStreamingSlides(true);
         setProcessingProgress(0);
         setShowDownloadSuccess(false);
+        setSlides([]);
+        setCurrentSlideIndex(0);
+
+        // Show the editor as soon as the first slide arrives; the rest are
+        // appended while Gemini is still writing them.
+        let receivedSlides = 0;
+        const appendSlide = (slide: Slide) => {
+          receivedSlides += 1;
+          setSlides((prev) => [...prev, slide]);
+          if (receivedSlides === 1) {
+            setIsProcessingPDF(false);
+          }
+        };
 
         try {
-          const extractedSlides = await processPDF(
-            file,
-            detailLevel,
-            setProcessingProgress
-          );
-          setSlides(extractedSlides);
-          setCurrentSlideIndex(0);
+          // Slides are already in state through appendSlide, and may have been
+          // edited since, so the returned copy is not written back.
+          await processPDFStream(file, detailLevel, appendSlide);
         } catch (error) {
-          console.error("Error processing PDF:", error);
+          if (receivedSlides > 0) {
+            console.error("Slide stream ended early:", error);
+          } else {
+            // Nothing arrived, so fall back to a background job with progress
+            console.warn("Slide streaming failed, using a job instead:", error);
+            try {
+              const extractedSlides = await processPDF(
+                file,
+                detailLevel,
+                setProcessingProgress
+              );
+              setSlides(extractedSlides);
+            } catch (jobError) {
+              console.error("Error processing PDF:", jobError);
+            }
+          }
         } finally {
+          setIsStreamingSlides(false);
           setTimeout(() => {
             setIsProcessingPDF(false);
             setProcessingProgress(0);
@@ -141,6 +172,10 @@ export default function App() {
       alert("Please select a theme first");
       return;
     }
+    if (isStreamingSlides) {
+      alert("Please wait until all slides have been generated");
+      return;
+    }
 
     setIsGeneratingPPT(true);
     setGenerationProgress(0);
@@ -166,6 +201,7 @@ export default function App() {
     setSelectedTheme(null);
     setShowDownloadSuccess(false);
     setIsProcessingPDF(false);
+    setIsStreamingSlides(false);
     setIsGeneratingPPT(false);
     setProcessingProgress(0);
     setGenerationProgress(0);
@@ -4,7 +4,7 @@ import { useState } from "react";
 import { X, ImageIcon, AlertCircle } from "lucide-react";
 import { Button } from "@/components/ui/button";
 import { Card, CardContent } from "@/components/ui/card";
-import { cn } from "@/lib/utils";
+import { cn, getImageUrl } from "@/lib/utils";
 
 interface SlideImageProps {
   imageFilename?: string;
@@ -24,7 +24,9 @@ export function SlideImage({
     return null;
   }
 
-  const imageUrl = `/images/${imageFilename}`;
+  // The editor panel is at most a few hundred pixels wide, so a resized variant is enough
+  const imageUrl = getImageUrl(imageFilename, 512);
+  const imageSrcSet = `${imageUrl} 1x, ${getImageUrl(imageFilename, 1024)} 2x`;
 
   const handleImageLoad = () => {
     setImageLoading(false);
@@ -75,6 +77,7 @@ export function SlideImage({
           ) : (
             <img
               src={imageUrl || "/placeholder.svg"}
+              srcSet={imageSrcSet}
               alt="Slide image"
               className={cn(
                 "w-full rounded-lg border border-slate-200 dark:border-slate-600 shadow-sm",
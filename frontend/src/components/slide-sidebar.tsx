@@ -1,10 +1,10 @@
 "use client";
 
-import { Plus, Trash2, List, FileText, ImageIcon } from "lucide-react";
+import { Plus, Trash2, List, FileText } from "lucide-react";
 import { Button } from "@/components/ui/button";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Badge } from "@/components/ui/badge";
-import { cn } from "@/lib/utils";
+import { cn, getImageUrl } from "@/lib/utils";
 import type { Slide } from "@/types/slide";
 
 interface SlideSidebarProps {
@@ -111,7 +111,13 @@ export function SlideSidebar({
 
                     {slide.image_filename && (
                       <div className="flex items-center gap-1">
-                        <ImageIcon className="h-3 w-3 text-green-600 dark:text-green-400" />
+                        <img
+                          src={getImageUrl(slide.image_filename, 64)}
+                          srcSet={`${getImageUrl(slide.image_filename, 64)} 1x, ${getImageUrl(slide.image_filename, 128)} 2x`}
+                          alt=""
+                          loading="lazy"
+                          className="h-4 w-6 rounded-sm object-cover border border-slate-200 dark:border-slate-600"
+                        />
                         <span className="text-xs text-green-600 dark:text-green-400">
                           Image
                         </span>
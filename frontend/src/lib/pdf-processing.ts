@@ -66,21 +66,50 @@ const mockProcessPDFResponse = [
   },
 ];
 
+interface JobSnapshot {
+  id: string;
+  status: "queued" | "running" | "completed" | "failed";
+  stage: string | null;
+  progress: number;
+  error: string | null;
+}
+
+// Resolves once the backend job completes, reporting real per-stage progress
+// pushed over server-sent events.
+const waitForJob = (
+  jobId: string,
+  onProgress: (progress: number) => void
+): Promise<void> =>
+  new Promise((resolve, reject) => {
+    const events = new EventSource(`/api/jobs/${jobId}/events`);
+
+    events.onmessage = (event) => {
+      const job: JobSnapshot = JSON.parse(event.data);
+      onProgress(job.progress);
+
+      if (job.status === "completed") {
+        events.close();
+        resolve();
+      } else if (job.status === "failed") {
+        events.close();
+        reject(new Error(job.error ?? "PDF processing failed"));
+      }
+    };
+
+    events.onerror = () => {
+      events.close();
+      reject(new Error("Lost connection to the processing progress stream"));
+    };
+  });
+
 export const processPDF = async (
   file: File,
   detailLevel: number,
   onProgress: (progress: number) => void
 ): Promise<Slide[]> => {
-  let currentProgress = 0;
-  const progressInterval = setInterval(() => {
-    if (currentProgress < 90) {
-      currentProgress += 10;
-      onProgress(currentProgress);
-    }
-  }, 200);
-
   try {
     if (MOCK_PROCESS_PDF) {
+      onProgress(100);
       return mockProcessPDFResponse;
     }
 
@@ -90,20 +119,28 @@ export const processPDF = async (
 
     // Use a relative path. The Vite proxy will handle forwarding this
     // to http://127.0.0.1:8000 during development.
-    const response = await fetch("/api/generate-slide-content", {
+    const submitResponse = await fetch("/api/jobs", {
       method: "POST",
       body: formData,
     });
 
-    if (!response.ok) {
+    if (!submitResponse.ok) {
       throw new Error(
-        `API request failed with status ${response.status}: ${response.statusText}`
+        `API request failed with status ${submitResponse.status}: ${submitResponse.statusText}`
       );
     }
 
-    const extractedSlides: Slide[] = (await response.json()).slides;
+    const job: JobSnapshot = await submitResponse.json();
+    await waitForJob(job.id, onProgress);
 
-    clearInterval(progressInterval);
+    const resultResponse = await fetch(`/api/jobs/${job.id}/result`);
+    if (!resultResponse.ok) {
+      throw new Error(
+        `API request failed with status ${resultResponse.status}: ${resultResponse.statusText}`
+      );
+    }
+
+    const extractedSlides: Slide[] = (await resultResponse.json()).slides;
     onProgress(100);
 
     return extractedSlides;
@@ -111,11 +148,70 @@ export const processPDF = async (
     console.error("Error processing PDF:", error);
     onProgress(0);
     throw error;
-  } finally {
-    clearInterval(progressInterval);
   }
 };
 
+type SlideStreamMessage =
+  | { type: "slide"; index: number; slide: Slide }
+  | { type: "error"; detail: string; fatal?: boolean }
+  | { type: "done"; count: number };
+
+// Streams slides from the backend as Gemini writes them, calling onSlide for
+// each one as soon as it arrives. Resolves with all slides once the stream ends.
+export const processPDFStream = async (
+  file: File,
+  detailLevel: number,
+  onSlide: (slide: Slide, index: number) => void
+): Promise<Slide[]> => {
+  if (MOCK_PROCESS_PDF) {
+    mockProcessPDFResponse.forEach(onSlide);
+    return mockProcessPDFResponse;
+  }
+
+  const formData = new FormData();
+  formData.append("file", file);
+
+  const response = await fetch(
+    `/api/generate-slide-content/stream?detail_level=${detailLevel}`,
+    { method: "POST", body: formData }
+  );
+
+  if (!response.ok || !response.body) {
+    throw new Error(
+      `API request failed with status ${response.status}: ${response.statusText}`
+    );
+  }
+
+  const slides: Slide[] = [];
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffered = "";
+
+  const handleLine = (line: string) => {
+    if (!line.trim()) return;
+    const message: SlideStreamMessage = JSON.parse(line);
+    if (message.type === "slide") {
+      slides.push(message.slide);
+      onSlide(message.slide, message.index);
+    } else if (message.type === "error") {
+      if (message.fatal) throw new Error(message.detail);
+      console.warn("Skipped a slide:", message.detail);
+    }
+  };
+
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffered += decoder.decode(value, { stream: true });
+    const lines = buffered.split("\n");
+    buffered = lines.pop() ?? "";
+    lines.forEach(handleLine);
+  }
+  handleLine(buffered);
+
+  return slides;
+};
+
 export const generatePowerPoint = async (
   slides: Slide[],
   theme: SelectedTheme,
@@ -4,3 +4,9 @@ import { twMerge } from "tailwind-merge"
 export function cn(...inputs: ClassValue[]) {
   return twMerge(clsx(inputs))
 }
+
+// Extracted images are served by the backend; `width` requests a resized variant
+export function getImageUrl(filename: string, width?: number) {
+  const url = `/images/${encodeURIComponent(filename)}`
+  return width ? `${url}?w=${width}` : url
+}